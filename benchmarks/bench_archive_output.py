@@ -0,0 +1,73 @@
+# benchmarks/bench_archive_output.py
+"""Writing many small files: one file each (temp file + rename) vs streaming into a tar archive.
+
+Only the output side is measured; bodies are generated in memory. Point --dir at a
+network share to see the metadata cost that archives avoid.
+
+    python -m benchmarks.bench_archive_output --files 20000 --size 4096
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from src.core.archive_writer import ArchiveWriter
+
+def write_files(output_dir: Path, count: int, body: bytes) -> None:
+    """What download_file does per file in files mode"""
+    for i in range(count):
+        output_path = output_dir / f"file-{i}.pdf"
+        if output_path.exists():
+            continue
+        temp_path = output_path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        if temp_path.stat().st_size == len(body):
+            temp_path.rename(output_path)
+
+async def write_archive(output_dir: Path, count: int, body: bytes, archive_format: str) -> None:
+    writer = ArchiveWriter(output_dir, archive_format)
+    await writer.start()
+
+    async def add(i: int) -> None:
+        name = f"file-{i}.pdf"
+        if writer.reserve(name):
+            buffer = writer.new_buffer()
+            buffer.write(body)
+            await writer.add(name, buffer)
+
+    # Like DOWNLOAD_WORKERS concurrent downloads handing files to the single writer
+    for start in range(0, count, 64):
+        await asyncio.gather(*(add(i) for i in range(start, min(count, start + 64))))
+    await writer.close()
+
+def timed(label: str, func, *args) -> None:
+    start = time.perf_counter()
+    func(*args)
+    print(f"{label:<8} {time.perf_counter() - start:8.2f} s", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive output benchmark")
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--dir", help="Directory to write into (default: a temp dir)")
+    args = parser.parse_args()
+
+    body = b"%PDF-" + bytes(args.size - 5)
+    root = Path(tempfile.mkdtemp(dir=args.dir))
+    try:
+        print(f"{args.files:,} files of {args.size:,} bytes in {root}")
+        for label, run in (
+            ("files", lambda d: write_files(d, args.files, body)),
+            ("tar", lambda d: asyncio.run(write_archive(d, args.files, body, "tar"))),
+            ("zip", lambda d: asyncio.run(write_archive(d, args.files, body, "zip")))
+        ):
+            target = root / label
+            target.mkdir()
+            timed(label, run, target)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
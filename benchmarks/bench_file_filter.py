@@ -0,0 +1,76 @@
+# benchmarks/bench_file_filter.py
+"""Link filtering on a page with many anchors: per-link urlparse checks vs FileFilter.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_file_filter --anchors 100000
+"""
+import argparse
+import time
+from typing import List
+from urllib.parse import urljoin, urlparse
+from src.core.file_filter import FileFilter
+
+BASE_URL = "https://files.example.org/archive/index.html"
+
+def make_hrefs(count: int) -> List[str]:
+    patterns = [
+        "report-{i}.pdf",
+        "/archive/{i}/minutes.PDF",
+        "https://cdn.example.org/files/{i}.docx",
+        "page-{i}.html",
+        "download.php?id={i}",
+        "file-{i}.pdf?download=1",
+        "#section-{i}",
+        "../images/{i}.png"
+    ]
+    return [patterns[i % len(patterns)].format(i=i) for i in range(count)]
+
+def legacy_is_valid_url(url: str) -> bool:
+    result = urlparse(url)
+    return all([
+        result.scheme in ('http', 'https'),
+        result.netloc,
+        not result.path.endswith(('//', '\\')),
+        len(url) < 2048,
+        not any(c in url for c in '<>"{}|\\^[]`')
+    ])
+
+def legacy_filter(hrefs: List[str], file_types: List[str]) -> List[str]:
+    """The per-link loop ScraperService used before FileFilter"""
+    found = []
+    for href in hrefs:
+        if any(href.lower().endswith(ft.lower()) for ft in file_types):
+            absolute_url = urljoin(BASE_URL, href)
+            if legacy_is_valid_url(absolute_url):
+                found.append(absolute_url)
+    return found
+
+def batch_filter(hrefs: List[str], file_types: List[str]) -> List[str]:
+    return list(FileFilter(file_types).filter_links(BASE_URL, hrefs))
+
+def best_of(runs: int, func, *args) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Link filter microbenchmark")
+    parser.add_argument("--anchors", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    hrefs = make_hrefs(args.anchors)
+    for file_types in ([".pdf"], [".pdf", ".docx", ".xlsx", ".pptx", ".zip"]):
+        legacy_time, legacy_found = best_of(args.runs, legacy_filter, hrefs, file_types)
+        batch_time, batch_found = best_of(args.runs, batch_filter, hrefs, file_types)
+        print(f"{args.anchors:,} anchors, {len(file_types)} types: "
+              f"legacy {legacy_time * 1000:.1f} ms ({len(legacy_found):,} files), "
+              f"batch {batch_time * 1000:.1f} ms ({len(batch_found):,} files), "
+              f"{legacy_time / batch_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+# benchmarks/bench_results_store.py
+"""Results table work per update: formatting every row (the old table refresh)
+vs ResultStore sort, filter and one rendered page.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_results_store --rows 50000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from src.core.metadata import FileInfo, format_size
+from src.core.results_store import COLUMNS, ResultStore
+
+def make_results(count: int):
+    rng = random.Random(1)
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        source = f"https://files.example.org/department-{i % 40}/"
+        url = f"{source}report-{rng.randrange(10 ** 9)}-{i}.{('pdf', 'docx', 'xlsx')[i % 3]}"
+        yield url, source, FileInfo(url, rng.randrange(10 ** 8), "application/pdf",
+                                    start + timedelta(minutes=rng.randrange(10 ** 6)))
+
+def legacy_rows(results) -> list:
+    rows = []
+    for url, source, info in results:
+        modified = info.last_modified.strftime("%Y-%m-%d %H:%M") if info.last_modified else ""
+        rows.append([Path(url).name, format_size(info.size), info.content_type or "", modified, source])
+    return rows
+
+def timed(action) -> float:
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Results table store benchmark")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    results = list(make_results(args.rows))
+    store = ResultStore()
+    print(f"add {args.rows:,} rows: {timed(lambda: [store.add(*result) for result in results]):.0f} ms")
+    print(f"legacy: format all rows per refresh: {timed(lambda: legacy_rows(results)):.1f} ms")
+    for column in COLUMNS:
+        def sort_and_page():
+            store.sort(column, descending=True)
+            store.page(0, args.page_size)
+        print(f"sort by {column:<8} + page: {timed(sort_and_page):7.1f} ms")
+    def filter_and_page():
+        store.set_filter(name="report-1", file_type=".pdf", source="https://files.example.org/department-3/")
+        store.page(0, args.page_size)
+    print(f"filter          + page: {timed(filter_and_page):7.1f} ms ({len(store)} rows)")
+    print(f"page only             : {timed(lambda: store.page(0, args.page_size)):7.1f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
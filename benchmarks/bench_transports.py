@@ -0,0 +1,148 @@
+# benchmarks/bench_transports.py
+"""Many small downloads from one host through each HTTP transport and event loop backend.
+
+The servers run in their own processes on loopback: aiohttp.web for
+HTTP/1.1 and, when hypercorn is installed, hypercorn speaking HTTP/1.1 and
+cleartext HTTP/2 (h2c). Each case downloads --files files of --size bytes
+with DownloadManager, --concurrency at a time, into a fresh directory.
+Backends that are not installed (httpx, h2, uvloop, hypercorn) are skipped.
+HTTP/2 over TLS is not measured; on loopback h2c shows the multiplexing
+without the handshake cost.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_transports --files 2000 --size 4096
+"""
+import argparse
+import asyncio
+import importlib.util
+import multiprocessing
+import shutil
+import socket
+import tempfile
+import time
+from pathlib import Path
+from aiohttp import web
+from src.config import AppConfig
+from src.core.backends import LOOP_ASYNCIO, LOOP_UVLOOP, TRANSPORT_AIOHTTP, TRANSPORT_HTTPX, run_async, uvloop
+from src.core.download_manager import DownloadManager
+
+def _body(size: int) -> bytes:
+    return b"%PDF-" + bytes(max(0, size - 5))
+
+def serve_http1(ports, size: int) -> None:
+    body = _body(size)
+
+    async def handle(request):
+        return web.Response(body=body, content_type="application/pdf")
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/files/{name}", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        ports.put(runner.addresses[0][1])
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+def serve_http2(ports, size: int) -> None:
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+    body = _body(size)
+    headers = [(b"content-type", b"application/pdf"), (b"content-length", str(len(body)).encode())]
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.accesslog = config.errorlog = None
+
+    async def main():
+        server = asyncio.ensure_future(serve(app, config))
+        for _ in range(100):  # until it accepts connections
+            try:
+                await asyncio.open_connection("127.0.0.1", port)
+                break
+            except OSError:
+                await asyncio.sleep(0.05)
+        ports.put(port)
+        await server
+
+    asyncio.run(main())
+
+async def download_all(config: AppConfig, base_url: str, count: int, concurrency: int, output_dir: Path) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with DownloadManager(config) as manager:
+        async def fetch(i: int) -> None:
+            async with semaphore:
+                await manager.download_file(f"{base_url}/files/file-{i}.pdf", output_dir)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(fetch(i) for i in range(count)))
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP transport and event loop benchmark")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    ports = context.Queue()
+    servers = {"http/1.1": serve_http1}
+    if importlib.util.find_spec("hypercorn"):
+        servers["hypercorn"] = serve_http2
+    else:
+        print("hypercorn is not installed, skipping the HTTP/2 server")
+
+    clients = [("aiohttp", TRANSPORT_AIOHTTP, False)]
+    if importlib.util.find_spec("httpx"):
+        clients.append(("httpx", TRANSPORT_HTTPX, False))
+        if importlib.util.find_spec("h2"):
+            clients.append(("httpx h2c", TRANSPORT_HTTPX, True))
+    loops = [LOOP_ASYNCIO] + ([LOOP_UVLOOP] if uvloop is not None else [])
+
+    root = Path(tempfile.mkdtemp())
+    print(f"{args.files:,} files of {args.size:,} bytes, {args.concurrency} at a time")
+    print(f"{'server':<10} {'client':<10} {'loop':<8} {'seconds':>8} {'files/s':>9}")
+    try:
+        for server_name, serve in servers.items():
+            process = context.Process(target=serve, args=(ports, args.size), daemon=True)
+            process.start()
+            base_url = f"http://127.0.0.1:{ports.get(timeout=30)}"
+            try:
+                for client_name, transport, prior_knowledge in clients:
+                    if prior_knowledge and server_name == "http/1.1":
+                        continue  # aiohttp.web does not speak HTTP/2
+                    for loop in loops:
+                        config = AppConfig(HTTP_TRANSPORT=transport, HTTP2_PRIOR_KNOWLEDGE=prior_knowledge,
+                                           EVENT_LOOP=loop, DEFAULT_DELAY_MIN=0, DEFAULT_DELAY_MAX=0)
+                        output_dir = root / f"{server_name}-{client_name}-{loop}".replace("/", "")
+                        output_dir.mkdir()
+                        seconds = run_async(download_all(config, base_url, args.files, args.concurrency, output_dir),
+                                            loop)
+                        print(f"{server_name:<10} {client_name:<10} {loop:<8} {seconds:8.2f} "
+                              f"{args.files / seconds:9.0f}", flush=True)
+            finally:
+                process.terminate()
+                process.join()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+# benchmarks/bench_url_store.py
+"""Memory per URL of the seen-URL stores compared with a plain set of strings.
+
+Seconds include URL canonicalization for every store except "raw set".
+
+Run from the repository root:
+
+    python -m benchmarks.bench_url_store --sizes 1000000,10000000
+"""
+import argparse
+import gc
+import sys
+import time
+from src.utils.url_store import CanonicalURLSet, create_url_store
+
+def make_url(i: int) -> str:
+    return f"https://files.example.org/department-{i % 97}/reports/{i // 97}/annual-report-{i}.pdf"
+
+def store_bytes(store) -> int:
+    """Bytes held by the store itself (container plus retained strings)"""
+    if isinstance(store, CanonicalURLSet):
+        store = store._keys
+    if isinstance(store, set):
+        return sys.getsizeof(store) + sum(sys.getsizeof(url) for url in store)
+    return store.nbytes
+
+def measure(kind: str, size: int) -> dict:
+    gc.collect()
+    store = set() if kind == "raw set" else create_url_store(kind, capacity=size)
+    start = time.perf_counter()
+    for i in range(size):
+        store.add(make_url(i))
+    elapsed = time.perf_counter() - start
+    return {"kind": kind, "size": size, "bytes_per_url": store_bytes(store) / size, "seconds": elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Seen-URL store memory benchmark")
+    parser.add_argument("--sizes", default="1000000,10000000",
+                        help="Comma separated URL counts")
+    parser.add_argument("--kinds", default="raw set,set,digest,bloom",
+                        help="Comma separated store kinds")
+    args = parser.parse_args()
+
+    print(f"{'store':<10} {'urls':>12} {'bytes/url':>10} {'seconds':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for kind in args.kinds.split(","):
+            result = measure(kind, size)
+            print(f"{result['kind']:<10} {result['size']:>12,} "
+                  f"{result['bytes_per_url']:>10.1f} {result['seconds']:>9.1f}", flush=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,5 +1,5 @@
 # src/__init__.py
-from .core import BrowserManager, ScraperService, DownloadManager
+from .core import BrowserManager, ScraperService, DownloadManager, DownloadPipeline
 from .ui import WebScraperGUI, start_gui, ProgressPopup
 from .utils import Settings, SettingsManager, setup_logging
 from .config import AppConfig
@@ -8,6 +8,7 @@ __all__ = [
     'BrowserManager',
     'ScraperService',
     'DownloadManager',
+    'DownloadPipeline',
     'WebScraperGUI',
     'start_gui',
     'ProgressPopup',
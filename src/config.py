@@ -1,9 +1,9 @@
 # src/config.py
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 @dataclass
 class AppConfig:
@@ -15,6 +15,57 @@ class AppConfig:
     DOWNLOAD_CHUNK_SIZE: int = 8192
     RETRY_ATTEMPTS: int = 3
     LOG_DIR: Path = Path("logs")
+    LOG_FORMAT: str = "text"  # "text", or "json" for JSON lines with job and url fields
+    LOG_SAMPLE_LIMIT: int = 20  # INFO/DEBUG records per message template per window, 0 = log all
+    LOG_SAMPLE_WINDOW: float = 10.0  # seconds
+    HTTP_TRANSPORT: str = "aiohttp"  # "aiohttp" (HTTP/1.1), or "httpx" (HTTP/2 when h2 is installed)
+    HTTP2_PRIOR_KNOWLEDGE: bool = False  # httpx: speak HTTP/2 to http:// URLs without an upgrade (h2c servers)
+    EVENT_LOOP: str = "asyncio"  # "asyncio", or "uvloop" where it is installed (not on Windows)
+    CONNECT_TIMEOUT: float = 10.0  # seconds; timeouts of 0 are disabled
+    KEEPALIVE_TIMEOUT: float = 60.0  # seconds an idle connection stays pooled for reuse
+    WARMUP_CONNECTIONS: int = 2  # connections opened per discovered host before downloading, 0 = no warm-up
+    FIRST_BYTE_TIMEOUT: float = 30.0  # request sent until response headers
+    READ_IDLE_TIMEOUT: float = 30.0  # longest wait for the next chunk
+    MIN_THROUGHPUT: float = 1024  # bytes/s over THROUGHPUT_WINDOW, 0 = no floor
+    THROUGHPUT_WINDOW: float = 30.0
+    MAX_CONCURRENT_PAGES: int = 4
+    SEARCH_BATCH_SIZE: int = 500
+    PIPELINE_QUEUE_SIZE: int = 100
+    DOWNLOAD_WORKERS: int = 4
+    SHARDS: int = 0  # worker processes a headless job is split across, 0 or 1 = run in this process
+    SHARD_BY: str = "host"  # "host" keeps each site in one shard, "url" spreads start URLs evenly
+    CRAWL_MAX_DEPTH: int = 0  # 0 = only the given pages
+    CHECKPOINT_INTERVAL: float = 30.0
+    SEEN_URL_STORE: str = "digest"  # "set", "digest" or "bloom"
+    SEEN_URL_CAPACITY: int = 1_000_000  # initial Bloom filter size
+    SEEN_URL_ERROR_RATE: float = 0.001  # Bloom filter false positive rate
+    PARSE_WORKERS: int = 0  # parse processes, 0 = one per CPU core
+    PARSE_PROCESS_THRESHOLD: int = 256 * 1024  # pages this size (bytes) or larger are parsed in the pool, 0 = never
+    ROBOTS_TXT: bool = False  # obey robots.txt Disallow rules while discovering, Crawl-delay for every request
+    ROBOTS_MAX_CRAWL_DELAY: float = 10.0  # cap on a site's Crawl-delay, seconds
+    SITEMAP_DISCOVERY: bool = False  # also search the sitemaps listed in each start host's robots.txt
+    AUTOINDEX_FAST_PATH: bool = True  # parse server directory listings without a DOM
+    OUTPUT_LAYOUT: str = "flat"  # "flat", "host", "mirror" or "hash" (ab/cd/ fan-out)
+    OUTPUT_MODE: str = "files"  # "files", or stream into rolling "tar" / "zip" archives
+    ARCHIVE_MAX_BYTES: int = 1024 ** 3  # start a new archive beyond this size
+    ARCHIVE_SPOOL_BYTES: int = 8 * 1024 ** 2  # members up to this size are buffered in memory
+    ARCHIVE_PREFIX: str = "files"  # archives are <prefix>-N.tar/zip with a <prefix>-index.jsonl
+    CONTENT_SNIFFING: bool = True  # abort downloads whose content does not match the file type
+    MAX_PAGE_BYTES: int = 64 * 1024 ** 2  # larger pages are refused, 0 = no limit
+    MEMORY_RETENTION: int = 10_000  # errors, log lines and cached results kept per job, 0 = unbounded
+    MEMORY_BUDGET: int = 0  # RSS bytes above which discovery waits for downloads to catch up, 0 = off
+    MEMORY_TRACE: bool = False  # also measure Python allocations with tracemalloc (slower)
+    RESULTS_PAGE_SIZE: int = 200  # rows rendered at once in the results table
+    LOOP_MONITOR: bool = False  # measure event loop lag and capture the stacks of blocking calls
+    LOOP_LAG_THRESHOLD: float = 0.1  # seconds the loop may be blocked before its stack is captured
+    WATCH_INTERVAL: float = 3600.0  # seconds between polls of a watched source
+    WATCH_JITTER: float = 0.1  # polls are spread by up to this fraction of the interval
+    WATCH_INTERVALS: Dict[str, float] = field(default_factory=dict)  # per source URL overrides of WATCH_INTERVAL
+    WATCH_STATE_FILE: Path = Path("watch.db")  # per-source validators and known files, kept across restarts
+    METADATA_CONCURRENCY: int = 8
+    BANDWIDTH_LIMIT: float = 0  # bytes/s over all downloads, 0 = unlimited
+    PER_HOST_BANDWIDTH_LIMIT: float = 0  # bytes/s per host, 0 = unlimited
+    BANDWIDTH_SCHEDULE: List[Dict[str, Any]] = field(default_factory=list)  # [{"start": "HH:MM", "global": ..., "per_host": ...}]
 
     @classmethod
     def load_from_file(cls, config_path: Path = Path("config.json")) -> 'AppConfig':
@@ -23,7 +74,7 @@ class AppConfig:
             if (config_path.exists()):
                 with open(config_path, encoding='utf-8') as f:
                     config_data = json.load(f)
-                    for key in ['SETTINGS_FILE', 'LOG_DIR']:
+                    for key in ['SETTINGS_FILE', 'LOG_DIR', 'WATCH_STATE_FILE']:
                         if key in config_data:
                             config_data[key] = Path(config_data[key])
                     return cls(**config_data)
@@ -37,7 +88,7 @@ class AppConfig:
             config_path.parent.mkdir(parents=True, exist_ok=True)
             with open(config_path, 'w', encoding='utf-8') as f:
                 config_dict = asdict(self)
-                for key in ['SETTINGS_FILE', 'LOG_DIR']:
+                for key in ['SETTINGS_FILE', 'LOG_DIR', 'WATCH_STATE_FILE']:
                     config_dict[key] = str(config_dict[key])
                 json.dump(config_dict, f, indent=4)
         except Exception as e:
@@ -2,5 +2,7 @@
 from .browser_manager import BrowserManager
 from .scraper_service import ScraperService
 from .download_manager import DownloadManager
+from .frontier import CrawlFrontier
+from .pipeline import DownloadPipeline, PipelineSummary, run_pipeline
 
-__all__ = ['BrowserManager', 'ScraperService', 'DownloadManager']
\ No newline at end of file
+__all__ = ['BrowserManager', 'ScraperService', 'DownloadManager', 'CrawlFrontier', 'DownloadPipeline', 'PipelineSummary', 'run_pipeline']
\ No newline at end of file
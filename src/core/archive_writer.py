@@ -0,0 +1,229 @@
+# src/core/archive_writer.py
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import IO, Dict, Optional, Set, Tuple
+
+OUTPUT_FILES = "files"
+OUTPUT_TAR = "tar"
+OUTPUT_ZIP = "zip"
+
+class ArchiveWriter:
+    """Streams downloaded files into rolling tar or zip archives.
+
+    Each download is buffered in a spooled temporary file (in memory below
+    spool_bytes) and handed to add(). One writer task appends members in
+    order, starting a new archive when the current one would exceed
+    max_bytes. Every member is recorded in a JSON-lines index
+    (<prefix>-index.jsonl) with its archive, offset, size and source URL.
+    Archives from earlier runs are kept, and their members count as present;
+    in memory only (archive, size) is kept per member.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        archive_format: str = OUTPUT_TAR,
+        max_bytes: int = 1024 ** 3,
+        spool_bytes: int = 8 * 1024 ** 2,
+        prefix: str = "files",
+        queue_size: int = 16
+    ):
+        if archive_format not in (OUTPUT_TAR, OUTPUT_ZIP):
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        self.output_dir = output_dir
+        self.archive_format = archive_format
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.prefix = prefix
+        self.logger = logging.getLogger(__name__)
+        self.index: Dict[str, Tuple[str, int]] = {}
+        self.index_path = output_dir / f"{prefix}-index.jsonl"
+        self._reserved: Set[str] = set()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._task: Optional[asyncio.Task] = None
+        self._archive = None
+        self._archive_file: Optional[IO[bytes]] = None
+        self._archive_path: Optional[Path] = None
+        self._index_file: Optional[IO[str]] = None
+        self._next_number = 1
+
+    async def start(self) -> None:
+        """Load the existing index and start the writer task"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+        pattern = re.compile(rf"{re.escape(self.prefix)}-(\d+)\.(?:tar|zip)$")
+        numbers = [int(m.group(1)) for m in (pattern.match(p.name) for p in self.output_dir.iterdir()) if m]
+        self._next_number = max(numbers, default=0) + 1
+        self._index_file = open(self.index_path, 'a', encoding='utf-8')
+        self._task = asyncio.create_task(self._run())
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        archive_sizes: Dict[str, int] = {}
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                archive = entry["archive"]
+                if archive not in archive_sizes:
+                    path = self.output_dir / archive
+                    archive_sizes[archive] = path.stat().st_size if path.exists() else 0
+                if entry["offset"] + entry["size"] > archive_sizes[archive]:
+                    continue  # member lost with the end of its archive, downloaded again
+                self._remember(entry)
+
+    def _remember(self, entry: dict) -> None:
+        self.index[entry["name"]] = (sys.intern(entry["archive"]), entry["size"])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def reserve(self, name: str) -> bool:
+        """Claim a member name; False if it is archived or being downloaded"""
+        if name in self.index or name in self._reserved:
+            return False
+        self._reserved.add(name)
+        return True
+
+    def release(self, name: str) -> None:
+        self._reserved.discard(name)
+
+    def new_buffer(self) -> IO[bytes]:
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+
+    async def add(self, name: str, buffer: IO[bytes], url: str = "") -> dict:
+        """Queue a member and wait until it is written; takes ownership of buffer"""
+        if self._task is None:
+            raise RuntimeError("ArchiveWriter is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((name, buffer, url, future))
+        return await future
+
+    async def _run(self) -> None:
+        closing = False
+        while not closing:
+            batch = []
+            item = await self._queue.get()
+            # Write everything already queued in one thread hop, with one index flush
+            while item is not None:
+                batch.append(item)
+                if self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+            closing = item is None
+            if not batch:
+                continue
+            results = await asyncio.to_thread(self._write_members, batch)
+            for (name, buffer, url, future), result in zip(batch, results):
+                self._reserved.discard(name)
+                if isinstance(result, Exception):
+                    self.logger.error(f"Failed to archive {name}: {result}")
+                    if not future.done():
+                        future.set_exception(result)
+                else:
+                    self._remember(result)
+                    if not future.done():
+                        future.set_result(result)
+        await asyncio.to_thread(self._close_archive)
+        while not self._queue.empty():
+            # Added while close() was waiting for the writer
+            item = self._queue.get_nowait()
+            if item is not None:
+                name, buffer, _, future = item
+                buffer.close()
+                self._reserved.discard(name)
+                if not future.done():
+                    future.set_exception(RuntimeError("ArchiveWriter is closed"))
+
+    def _write_members(self, batch: list) -> list:
+        results = []
+        for name, buffer, url, _ in batch:
+            try:
+                results.append(self._write_member(name, buffer, url))
+            except Exception as e:
+                results.append(e)
+            finally:
+                buffer.close()
+        if self._archive_file is not None:
+            self._sync_archive()
+        # Index lines only once their members are on disk, as reserve() trusts the index
+        for entry in results:
+            if not isinstance(entry, Exception):
+                self._index_file.write(json.dumps(entry) + "\n")
+        self._index_file.flush()
+        return results
+
+    def _write_member(self, name: str, buffer: IO[bytes], url: str) -> dict:
+        size = buffer.seek(0, 2)
+        buffer.seek(0)
+        if self._archive is not None and self._archive_file.tell() + size > self.max_bytes:
+            self._close_archive()
+        if self._archive is None:
+            self._open_archive()
+
+        mtime = time.time()
+        if self.archive_format == OUTPUT_TAR:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(mtime)
+            self._archive.addfile(info, buffer)
+            # addfile leaves the position after the data padded to whole blocks
+            padded = (size + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE * tarfile.BLOCKSIZE
+            offset = self._archive.offset - padded
+        else:
+            info = zipfile.ZipInfo(name, time.localtime(mtime)[:6])
+            with self._archive.open(info, 'w', force_zip64=size > 0x7fffffff) as member:
+                shutil.copyfileobj(buffer, member, 1024 * 1024)
+            offset = info.header_offset
+
+        return {"name": name, "archive": self._archive_path.name, "offset": offset,
+                "size": size, "url": url, "time": int(mtime)}
+
+    def _open_archive(self) -> None:
+        self._archive_path = self.output_dir / f"{self.prefix}-{self._next_number:05d}.{self.archive_format}"
+        self._next_number += 1
+        self._archive_file = open(self._archive_path, 'wb')
+        if self.archive_format == OUTPUT_TAR:
+            self._archive = tarfile.open(fileobj=self._archive_file, mode='w', format=tarfile.PAX_FORMAT)
+        else:
+            self._archive = zipfile.ZipFile(self._archive_file, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        self.logger.info(f"Writing archive {self._archive_path}")
+
+    def _sync_archive(self) -> None:
+        self._archive_file.flush()
+        os.fsync(self._archive_file.fileno())
+
+    def _close_archive(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._sync_archive()
+            self._archive_file.close()
+            self._archive = None
+            self._archive_file = None
+
+    @property
+    def current_path(self) -> Optional[Path]:
+        return self._archive_path
+
+    async def close(self) -> None:
+        """Write queued members, finish the current archive and close the index"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
\ No newline at end of file
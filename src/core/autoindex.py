@@ -0,0 +1,82 @@
+# src/core/autoindex.py
+import html
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+APACHE = "apache"
+NGINX = "nginx"
+LIGHTTPD = "lighttpd"
+
+_INDEX_TITLE = re.compile(rb'<title>\s*Index of ', re.IGNORECASE)
+_LIGHTTPD = re.compile(rb'summary="Directory Listing"|<div class="foot">lighttpd', re.IGNORECASE)
+_APACHE = re.compile(rb'href="\?C=[NMSD];O=[AD]"|<address>Apache', re.IGNORECASE)
+_NGINX = re.compile(rb'<h1>Index of [^<]*</h1>\s*<hr>\s*<pre>', re.IGNORECASE)
+
+# One anchor per entry followed by its row text. Sort links ("?C=N;O=D") are not entries.
+_ENTRY = re.compile(r'<a\s+href="([^"?][^"]*)"[^>]*>[^<]*</a>([^<]*(?:<(?!a\s|/pre>|/table>)[^<]*)*)',
+                    re.IGNORECASE)
+_TAG = re.compile(r'<[^>]*>')
+_DATE = re.compile(
+    r'(?:(\d{4})-(\d{2}|[A-Za-z]{3})-(\d{1,2})|(\d{1,2})-([A-Za-z]{3})-(\d{4}))'  # 2023-01-05, 2023-Jan-05, 05-Jan-2023
+    r'\s+(\d{1,2}):(\d{2})(?::(\d{2}))?'
+    r'(?:\s+(-|\d+(?:\.\d+)?[KMGTP]?)(?![\w.]))?'
+)
+_MONTHS = {name: number for number, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4, "P": 1024 ** 5}
+
+@dataclass
+class ListingEntry:
+    href: str
+    size: Optional[int] = None  # bytes; approximate when the server prints 1.2M style sizes
+    modified: Optional[datetime] = None
+
+    @property
+    def is_dir(self) -> bool:
+        return self.href.endswith('/')
+
+def detect_listing(content: bytes) -> Optional[str]:
+    """Return the server type if the page is an Apache, nginx or lighttpd directory listing"""
+    head, tail = content[:4096], content[-1024:]
+    if _LIGHTTPD.search(head) or _LIGHTTPD.search(tail):
+        return LIGHTTPD
+    if not _INDEX_TITLE.search(head):
+        return None
+    if _APACHE.search(head) or _APACHE.search(tail):
+        return APACHE
+    if _NGINX.search(head):
+        return NGINX
+    return None
+
+def parse_listing(content: bytes, encoding: Optional[str] = None) -> List[ListingEntry]:
+    """Parse a directory listing in one pass, without building a DOM"""
+    text = content.decode(encoding or 'utf-8', errors='replace')
+    entries = []
+    for match in _ENTRY.finditer(text):
+        href = html.unescape(match.group(1))
+        if href in ('../', '..', './', '.'):
+            continue
+        size = modified = None
+        row = _DATE.search(_TAG.sub(' ', match.group(2)).replace('&nbsp;', ' '))
+        if row:
+            modified = _parse_date(row)
+            size = _parse_size(row.group(10))
+        entries.append(ListingEntry(href, None if href.endswith('/') else size, modified))
+    return entries
+
+def _parse_date(row: re.Match) -> Optional[datetime]:
+    year, month, day = row.group(1, 2, 3) if row.group(1) else row.group(6, 5, 4)
+    month = int(month) if month.isdigit() else _MONTHS.get(month.lower(), 0)
+    try:
+        return datetime(int(year), month, int(day), int(row.group(7)), int(row.group(8)), int(row.group(9) or 0))
+    except ValueError:
+        return None
+
+def _parse_size(value: Optional[str]) -> Optional[int]:
+    if not value or value == '-':
+        return None
+    unit = value[-1].upper() if value[-1].isalpha() else ""
+    number = float(value[:-1] if unit else value)
+    return int(number * _UNITS[unit])
\ No newline at end of file
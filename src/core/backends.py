@@ -0,0 +1,142 @@
+# src/core/backends.py
+import asyncio
+import importlib.util
+import logging
+from typing import AsyncIterator, Coroutine, Dict, Optional, TypeVar
+import aiohttp
+from .transfer import client_timeout
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
+TRANSPORT_AIOHTTP = "aiohttp"
+TRANSPORT_HTTPX = "httpx"
+LOOP_ASYNCIO = "asyncio"
+LOOP_UVLOOP = "uvloop"
+
+T = TypeVar('T')
+logger = logging.getLogger(__name__)
+
+class TransportError(aiohttp.ClientError):
+    """A failed request of a non-aiohttp transport; an aiohttp.ClientError so the existing retries apply"""
+    pass
+
+class HttpxResponse:
+    """The part of aiohttp.ClientResponse the services read, over a streamed httpx.Response"""
+
+    def __init__(self, response: 'httpx.Response'):
+        self._response = response
+        self.status = response.status_code
+        self.headers = response.headers  # case-insensitive, like aiohttp's
+        self.url = str(response.url)
+        self.content = self  # body access is content.iter_chunked(n), as in aiohttp
+
+    @property
+    def charset(self) -> Optional[str]:
+        return self._response.charset_encoding
+
+    @property
+    def content_length(self) -> Optional[int]:
+        value = self.headers.get("Content-Length")
+        return int(value) if value and value.isdigit() else None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise TransportError(f"{self.status}, message={self._response.reason_phrase!r}, url={self.url!r}")
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._response.aiter_bytes(size):
+                yield chunk
+        except httpx.HTTPError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+
+    async def __aenter__(self) -> 'HttpxResponse':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self._response.aclose()
+
+class HttpxSession:
+    """aiohttp.ClientSession stand-in on httpx.AsyncClient, for HTTP/2.
+
+    Over HTTP/2 the requests to one host share a single connection as
+    multiplexed streams instead of queueing for one of a few HTTP/1.1
+    connections, which suits many small files from one server. HTTP/2 needs
+    the h2 package; without it httpx speaks HTTP/1.1. Only get(), head(),
+    closed and close() are provided, and responses look like aiohttp's, so
+    the services and their retry handling do not change.
+    """
+
+    def __init__(self, config, headers: Optional[Dict[str, str]] = None, max_connections: int = 100):
+        http2 = importlib.util.find_spec("h2") is not None
+        if not http2:
+            logger.warning("The h2 package is not installed, httpx will use HTTP/1.1")
+        self.http2 = http2
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            http1=not (http2 and config.HTTP2_PRIOR_KNOWLEDGE),
+            http2=http2,
+            # like client_timeout(): only connecting is bounded here, the services time the rest
+            timeout=httpx.Timeout(None, connect=config.CONNECT_TIMEOUT or None),
+            limits=httpx.Limits(max_connections=max_connections),
+            follow_redirects=True
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, allow_redirects: bool = True) -> HttpxResponse:
+        return await self._send("GET", url, headers, allow_redirects)
+
+    async def head(self, url: str, headers: Optional[Dict[str, str]] = None, allow_redirects: bool = False) -> HttpxResponse:
+        return await self._send("HEAD", url, headers, allow_redirects)
+
+    async def _send(self, method: str, url: str, headers: Optional[Dict[str, str]], allow_redirects: bool) -> HttpxResponse:
+        request = self._client.build_request(method, url, headers=headers)
+        try:
+            return HttpxResponse(await self._client.send(request, stream=True, follow_redirects=allow_redirects))
+        except httpx.HTTPError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+def uses_aiohttp(config) -> bool:
+    """Whether create_session() will return an aiohttp session for config"""
+    return config.HTTP_TRANSPORT != TRANSPORT_HTTPX or httpx is None
+
+def create_session(
+    config,
+    headers: Optional[Dict[str, str]] = None,
+    connector: Optional[aiohttp.BaseConnector] = None,
+    max_connections: int = 100
+):
+    """A client session of the HTTP_TRANSPORT backend; connector only applies to aiohttp"""
+    transport = config.HTTP_TRANSPORT
+    if transport == TRANSPORT_HTTPX:
+        if httpx is not None:
+            return HttpxSession(config, headers, max_connections)
+        logger.warning("httpx is not installed, using the aiohttp transport")
+    elif transport != TRANSPORT_AIOHTTP:
+        raise ValueError(f"Unknown HTTP transport: {transport}")
+    return aiohttp.ClientSession(timeout=client_timeout(config), headers=headers, connector=connector)
+
+def run_async(main: Coroutine[None, None, T], event_loop: str = LOOP_ASYNCIO) -> T:
+    """asyncio.run() on the EVENT_LOOP implementation"""
+    if event_loop == LOOP_UVLOOP:
+        if uvloop is not None:
+            return uvloop.run(main)
+        logger.warning("uvloop is not installed, using the asyncio event loop")
+    elif event_loop != LOOP_ASYNCIO:
+        main.close()
+        raise ValueError(f"Unknown event loop: {event_loop}")
+    return asyncio.run(main)
\ No newline at end of file
@@ -0,0 +1,101 @@
+# src/core/bandwidth.py
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..config import AppConfig
+
+class TokenBucket:
+    """Byte-rate token bucket; a rate of 0 means unlimited"""
+
+    def __init__(self, rate: float = 0):
+        self.rate = 0.0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the rate, allowing at most one second of burst"""
+        self._refill()
+        self.rate = max(0.0, float(rate or 0))
+        self.tokens = min(self.tokens, self.rate)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, count: int) -> float:
+        """Take tokens for count bytes and return how long to wait to repay any debt"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        self.tokens -= count
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+class BandwidthLimiter:
+    """Global and per-host download bandwidth limits, adjustable at runtime"""
+
+    def __init__(
+        self,
+        global_rate: float = 0,
+        per_host_rate: float = 0,
+        schedule: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_host_rate = float(per_host_rate or 0)
+        self.host_buckets: Dict[str, TokenBucket] = {}
+        self.schedule = sorted(schedule or [], key=lambda entry: entry["start"])
+        self._active_entry: Optional[Dict[str, Any]] = None
+        self._schedule_checked = 0.0
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> 'BandwidthLimiter':
+        return cls(config.BANDWIDTH_LIMIT, config.PER_HOST_BANDWIDTH_LIMIT, config.BANDWIDTH_SCHEDULE)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.global_bucket.rate or self.per_host_rate or self.schedule)
+
+    def set_limits(self, global_rate: Optional[float] = None, per_host_rate: Optional[float] = None) -> None:
+        """Change limits immediately; None leaves a limit unchanged"""
+        if global_rate is not None:
+            self.global_bucket.set_rate(global_rate)
+        if per_host_rate is not None:
+            self.per_host_rate = float(per_host_rate)
+            for bucket in self.host_buckets.values():
+                bucket.set_rate(self.per_host_rate)
+        self.logger.info(
+            f"Bandwidth limits: global {self.global_bucket.rate:.0f} B/s, "
+            f"per host {self.per_host_rate:.0f} B/s"
+        )
+
+    def _apply_schedule(self) -> None:
+        """Switch limits when a new schedule entry ("HH:MM" start) becomes active"""
+        now = time.monotonic()
+        if not self.schedule or now - self._schedule_checked < 1:
+            return
+        self._schedule_checked = now
+        current = datetime.now().strftime("%H:%M")
+        started = [entry for entry in self.schedule if entry["start"] <= current]
+        entry = started[-1] if started else self.schedule[-1]
+        if entry is not self._active_entry:
+            self._active_entry = entry
+            self.set_limits(entry.get("global"), entry.get("per_host"))
+
+    async def throttle(self, host: str, count: int) -> None:
+        """Wait as long as needed to keep count bytes from host within the limits"""
+        if not self.enabled:
+            return
+        self._apply_schedule()
+        delay = self.global_bucket.reserve(count)
+        if self.per_host_rate:
+            bucket = self.host_buckets.get(host)
+            if bucket is None:
+                bucket = self.host_buckets[host] = TokenBucket(self.per_host_rate)
+            delay = max(delay, bucket.reserve(count))
+        if delay > 0:
+            await asyncio.sleep(delay)
\ No newline at end of file
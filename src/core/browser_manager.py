@@ -2,23 +2,56 @@ import logging
 import platform
 import winreg
 import time
-from typing import Optional
+from typing import Dict, Optional
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import NoSuchWindowException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 from ..utils.exceptions import BrowserConnectionError
 from ..config import AppConfig
 
+# Maps every link's resolved href (and its decoded form) to the first anchor with it
+INDEX_ANCHORS_SCRIPT = """
+const index = new Map();
+for (const anchor of document.querySelectorAll('a[href]')) {
+    let decoded = anchor.href;
+    try { decoded = decodeURI(anchor.href); } catch (e) {}
+    for (const key of [anchor.href, decoded]) {
+        if (!index.has(key)) index.set(key, anchor);
+    }
+}
+window.__scraperAnchors = index;
+return document.querySelectorAll('a[href]').length;
+"""
+
+# Returns null when the page lost its index (navigated or reloaded), else whether the link was found
+HIGHLIGHT_SCRIPT = """
+const index = window.__scraperAnchors;
+if (!index) return null;
+let anchor = index.get(arguments[0]);
+if (!anchor) {
+    try { anchor = index.get(decodeURI(arguments[0])); } catch (e) {}
+}
+if (!anchor) return false;
+const previous = window.__scraperHighlighted;
+if (previous) previous.style.outline = previous.dataset.scraperOutline || '';
+anchor.dataset.scraperOutline = anchor.style.outline;
+anchor.style.outline = '3px solid red';
+anchor.scrollIntoView({block: 'center'});
+window.__scraperHighlighted = anchor;
+return true;
+"""
+
 class BrowserManager:
     def __init__(self, config: AppConfig):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.driver: Optional[WebDriver] = None
         self.browser_type = self._detect_default_browser()
+        self._pages: Dict[str, str] = {}  # source page URL -> window handle of its loaded tab
 
     def _detect_default_browser(self) -> str:
         """Detect system default browser"""
@@ -91,8 +124,51 @@ class BrowserManager:
                     )
         return self.driver
 
+    def show_link(self, page_url: str, link_url: str) -> bool:
+        """Highlight and scroll to the link to link_url on page_url; False if the page has no such link.
+
+        Each source page is loaded once into its own tab and its links indexed by
+        href in a single script call; later calls switch to the tab and look the
+        link up by exact URL without reloading.
+        """
+        driver = self.get_driver()
+        handle = self._pages.get(page_url)
+        if handle is not None:
+            try:
+                driver.switch_to.window(handle)
+            except NoSuchWindowException:
+                handle = None
+                driver = self._leave_closed_window(driver)
+        if handle is None:
+            if self._pages:
+                driver.switch_to.new_window('tab')
+            self._load_page(driver, page_url)
+
+        found = driver.execute_script(HIGHLIGHT_SCRIPT, link_url)
+        if found is None:  # the user navigated away or reloaded
+            self._load_page(driver, page_url)
+            found = driver.execute_script(HIGHLIGHT_SCRIPT, link_url)
+        return bool(found)
+
+    def _leave_closed_window(self, driver: WebDriver) -> WebDriver:
+        """Forget the tabs the user closed and switch to one still open, or start a new browser"""
+        live = driver.window_handles
+        self._pages = {url: handle for url, handle in self._pages.items() if handle in live}
+        if live:
+            driver.switch_to.window(live[-1])
+            return driver
+        self.cleanup()
+        return self.get_driver()
+
+    def _load_page(self, driver: WebDriver, page_url: str) -> None:
+        driver.get(page_url)
+        links = driver.execute_script(INDEX_ANCHORS_SCRIPT)
+        self._pages[page_url] = driver.current_window_handle
+        self.logger.debug("Indexed %s links on %s", links, page_url)
+
     def cleanup(self) -> None:
         """Clean up browser resources with proper error handling"""
+        self._pages.clear()
         if self.driver:
             try:
                 self.driver.quit()
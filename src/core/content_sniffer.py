@@ -0,0 +1,119 @@
+# src/core/content_sniffer.py
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+_ZIP = (b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08')
+_OLE = (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',)
+_RIFF = (b'RIFF',)
+_ISO_MEDIA = (b'ftyp',)  # at offset 4
+_GZIP = (b'\x1f\x8b',)
+_MATROSKA = (b'\x1a\x45\xdf\xa3',)
+# Frame sync of an MPEG Layer III frame (files without an ID3 tag): MPEG-1, 2 and 2.5,
+# each with and without CRC
+_MP3_FRAMES = tuple(bytes((0xff, second)) for second in (0xfb, 0xfa, 0xf3, 0xf2, 0xe3, 0xe2))
+
+# suffix -> (offset, accepted prefixes at that offset)
+MAGIC: Dict[str, Tuple[int, Tuple[bytes, ...]]] = {
+    ".pdf": (0, (b'%PDF-',)),
+    ".zip": (0, _ZIP), ".docx": (0, _ZIP), ".xlsx": (0, _ZIP), ".pptx": (0, _ZIP),
+    ".odt": (0, _ZIP), ".ods": (0, _ZIP), ".odp": (0, _ZIP), ".epub": (0, _ZIP),
+    ".doc": (0, _OLE), ".xls": (0, _OLE), ".ppt": (0, _OLE),
+    ".rtf": (0, (b'{\\rtf',)),
+    ".gz": (0, _GZIP), ".tgz": (0, _GZIP), ".tar.gz": (0, _GZIP),
+    ".bz2": (0, (b'BZh',)), ".tar.bz2": (0, (b'BZh',)),
+    ".xz": (0, (b'\xfd7zXZ\x00',)), ".tar.xz": (0, (b'\xfd7zXZ\x00',)),
+    ".7z": (0, (b"7z\xbc\xaf'\x1c",)),
+    ".rar": (0, (b'Rar!\x1a\x07',)),
+    ".tar": (257, (b'ustar',)),
+    ".png": (0, (b'\x89PNG\r\n\x1a\n',)),
+    ".jpg": (0, (b'\xff\xd8\xff',)), ".jpeg": (0, (b'\xff\xd8\xff',)),
+    ".gif": (0, (b'GIF87a', b'GIF89a')),
+    ".bmp": (0, (b'BM',)),
+    ".tif": (0, (b'II*\x00', b'MM\x00*')), ".tiff": (0, (b'II*\x00', b'MM\x00*')),
+    ".webp": (0, _RIFF), ".wav": (0, _RIFF), ".avi": (0, _RIFF),
+    ".mp3": (0, (b'ID3',) + _MP3_FRAMES),
+    ".flac": (0, (b'fLaC',)),
+    ".ogg": (0, (b'OggS',)),
+    ".mp4": (4, _ISO_MEDIA), ".m4a": (4, _ISO_MEDIA), ".mov": (4, _ISO_MEDIA),
+    ".mkv": (0, _MATROSKA), ".webm": (0, _MATROSKA),
+    ".sqlite": (0, (b'SQLite format 3\x00',)),
+    ".parquet": (0, (b'PAR1',)),
+}
+# Readers accept a PDF header anywhere in the first kilobyte
+_PDF_WINDOW = 1024
+_HTML_TYPES = ("text/html", "application/xhtml+xml")
+_HTML_SUFFIXES = (".html", ".htm", ".xhtml", ".shtml", ".php", ".asp", ".aspx", ".jsp")
+_HTML_STARTS = (b'<!doctype html', b'<html', b'<head', b'<body')
+
+def expected_suffix(url: str) -> str:
+    """Lowercase suffix of the URL path, including two-part suffixes such as .tar.gz"""
+    name = unquote(urlparse(url).path.rsplit('/', 1)[-1]).lower()
+    parts = name.split('.')
+    if len(parts) > 2 and f".{parts[-2]}.{parts[-1]}" in MAGIC:
+        return f".{parts[-2]}.{parts[-1]}"
+    return f".{parts[-1]}" if len(parts) > 1 else ""
+
+class ContentSniffer:
+    """Checks that a response looks like the file type its URL promises.
+
+    Feed body chunks until done is True, then call finish at the end of the
+    body. Both return a reason string on a mismatch and None otherwise.
+    """
+
+    def __init__(self, url: str, content_type: Optional[str] = None, content_encoding: Optional[str] = None):
+        self.suffix = expected_suffix(url)
+        self.offset, self.signatures = MAGIC.get(self.suffix, (0, ()))
+        if self.signatures is _GZIP and (content_encoding or 'identity').strip().lower() != 'identity':
+            # A .gz sent as Content-Encoding: gzip arrives already unpacked, so only error pages are caught
+            self.signatures = ()
+        media_type = (content_type or '').split(';')[0].strip().lower()
+        self.html_type = media_type if media_type in _HTML_TYPES else None
+        if self.suffix == ".pdf":
+            self.needed = _PDF_WINDOW
+        elif self.signatures:
+            self.needed = self.offset + max(len(signature) for signature in self.signatures)
+        else:
+            self.needed = 64
+        self.head = b''
+        self.done = self.suffix in _HTML_SUFFIXES
+
+    def check_headers(self) -> Optional[str]:
+        """Reject before reading the body when only the header can tell"""
+        if self.html_type and not self.signatures and not self.done:
+            # Text formats have no signature, and error pages are what servers send as HTML
+            self.done = True
+            return f"server sent {self.html_type} for a {self.suffix or 'file'} URL"
+        return None
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        if self.done:
+            return None
+        self.head += chunk[:self.needed - len(self.head)]
+        if self.suffix == ".pdf":
+            if b'%PDF-' in self.head:
+                self.done = True
+                return None
+            if self.head.lstrip()[:1] == b'<':
+                # Markup before any PDF header: an HTML or XML error page, no need to wait for 1 KB
+                return self.finish()
+        if len(self.head) < self.needed:
+            return None
+        return self.finish()
+
+    def finish(self) -> Optional[str]:
+        """Check whatever was received; call at the end of short bodies"""
+        if self.done:
+            return None
+        self.done = True
+        if self.suffix == ".pdf":
+            matched = b'%PDF-' in self.head
+        elif self.signatures:
+            window = self.head[self.offset:]
+            matched = any(window.startswith(signature) for signature in self.signatures)
+        else:
+            matched = not self.head.lstrip().lower().startswith(_HTML_STARTS)
+        if matched:
+            return None
+        if self.html_type or self.head.lstrip().lower().startswith(_HTML_STARTS):
+            return f"server sent an HTML page for a {self.suffix or 'file'} URL"
+        return f"content does not match {self.suffix}"
\ No newline at end of file
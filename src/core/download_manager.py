@@ -1,49 +1,193 @@
 # src/core/download_manager.py
 import aiohttp
 import asyncio
+import itertools
 import logging
+import os
 import random
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Callable
-from urllib.parse import unquote
-from ..utils.exceptions import log_and_raise, DownloaderError, DownloadTimeout
+from typing import Dict, Iterable, List, Optional, Callable, Set, Tuple
+from urllib.parse import urlparse
+from ..utils.exceptions import log_and_raise, DownloaderError, DownloadTimeout, ContentMismatchError
 from ..config import AppConfig
+from ..utils.memory import BoundedDict
+from ..utils.url_store import DigestKeySet
+from .metadata import FileInfo
+from .bandwidth import BandwidthLimiter
+from .content_sniffer import ContentSniffer
+from .transfer import ThroughputMonitor, iter_body, open_response
+from .backends import create_session, uses_aiohttp
+from .robots import MAX_ROBOTS_BYTES, RobotsCache
+from .warmup import CachingResolver, ConnectionWarmer
+from .archive_writer import OUTPUT_FILES, ArchiveWriter
+from .output_layout import SCAN_DEPTHS, TEMP_SUFFIX, relative_path, scan_output_dir
 
 class DownloadManager:
     SUCCESS_MESSAGE = "Successfully downloaded"
     SKIP_MESSAGE = "already exists, skipping..."
+    MISMATCH_MESSAGE = "is not the expected file type, skipped"
+    ORDER_LISTED = "listed"
+    ORDER_SMALLEST = "smallest"
+    ORDER_LARGEST = "largest"
+    MAX_CONNECTIONS = 10  # open connections over all hosts
 
     def __init__(self, config: AppConfig):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self._cache: Dict[str, Path] = {}
+        self._cache: Dict[str, Path] = BoundedDict(config.MEMORY_RETENTION)
+        self.metadata: Dict[str, FileInfo] = {}
+        self._metadata_semaphore = asyncio.Semaphore(max(1, config.METADATA_CONCURRENCY))
+        self.bandwidth = BandwidthLimiter.from_config(config)
         self._session: Optional[aiohttp.ClientSession] = None
-        self.timeout = aiohttp.ClientTimeout(total=30, connect=10)
         self.connector = None
+        self.resolver: Optional[CachingResolver] = None
+        self.warmer = ConnectionWarmer(config.WARMUP_CONNECTIONS)
+        # With ROBOTS_TXT, Crawl-delay spaces downloads too; share the ScraperService's
+        # cache so discovery and downloads to a host keep one schedule
+        self.robots = RobotsCache(config.USER_AGENT, self._fetch_robots, config.ROBOTS_MAX_CRAWL_DELAY)
+        self.archive: Optional[ArchiveWriter] = None
+        self._output_scans: Dict[Path, DigestKeySet] = {}
+        self._scan_lock = asyncio.Lock()
+        self._reserved: Set[str] = set()  # output paths being written, like ArchiveWriter.reserve()
+        self._temp_ids = itertools.count(1)
 
     async def ensure_session(self) -> None:
         """Ensure session is active with lazy connector initialization"""
         if not self._session or self._session.closed:
-            if not self.connector:
+            if not self.connector and uses_aiohttp(self.config):
+                self.resolver = CachingResolver(ttl=300)
                 self.connector = aiohttp.TCPConnector(
-                    limit=10,
+                    limit=self.MAX_CONNECTIONS,
                     ttl_dns_cache=300,
-                    use_dns_cache=True
+                    use_dns_cache=True,
+                    resolver=self.resolver,
+                    keepalive_timeout=self.config.KEEPALIVE_TIMEOUT
                 )
-            self._session = aiohttp.ClientSession(
-                timeout=self.timeout,
-                connector=self.connector
-            )
+            self._session = create_session(self.config, connector=self.connector,
+                                           max_connections=self.MAX_CONNECTIONS)
+
+    async def fetch_metadata(self, url: str) -> FileInfo:
+        """Fetch file metadata with a HEAD request"""
+        await self.ensure_session()
+        try:
+            response = await open_response(self._session.head(url, allow_redirects=True), self.config.FIRST_BYTE_TIMEOUT)
+            async with response:
+                response.raise_for_status()
+                info = FileInfo.from_headers(url, response.headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning("HEAD request failed for %s: %s", url, e, extra={"url": url})
+            info = FileInfo(url)
+        self.metadata[url] = info
+        return info
+
+    async def warm_up(self, urls: Iterable[str]) -> None:
+        """Resolve the hosts of urls and open keep-alive connections to them ahead of their downloads"""
+        await self.ensure_session()
+        await self.warmer.warm(urls, self._open_connection, self.resolver)
+
+    async def _open_connection(self, url: str) -> None:
+        """One HEAD request whose connection is returned to the pool; its headers are kept as metadata"""
+        if self.config.ROBOTS_TXT:
+            await self.robots.wait(url)
+        response = await open_response(self._session.head(url), self.config.FIRST_BYTE_TIMEOUT)
+        async with response:
+            if response.status < 300 and url not in self.metadata:
+                self.metadata[url] = FileInfo.from_headers(url, response.headers)
+
+    async def _fetch_robots(self, robots_url: str) -> Tuple[int, str]:
+        await self.ensure_session()
+        response = await open_response(self._session.get(robots_url), self.config.FIRST_BYTE_TIMEOUT)
+        async with response:
+            if response.status >= 400:
+                return response.status, ""
+            body = bytearray()
+            async for chunk in iter_body(response, 65536, self.config.READ_IDLE_TIMEOUT):
+                body += chunk
+                if len(body) >= MAX_ROBOTS_BYTES:
+                    break
+            return response.status, body.decode('utf-8', errors='replace')
+
+    async def prefetch_metadata(
+        self,
+        urls: Iterable[str],
+        on_result: Optional[Callable[[FileInfo], None]] = None,
+        refresh: bool = False
+    ) -> Dict[str, FileInfo]:
+        """Fetch metadata for many files concurrently, reusing cached results unless refresh is set"""
+        async def fetch(url: str) -> None:
+            async with self._metadata_semaphore:
+                info = await self.fetch_metadata(url)
+            if on_result:
+                on_result(info)
+
+        pending = [url for url in dict.fromkeys(urls) if refresh or url not in self.metadata]
+        await asyncio.gather(*(fetch(url) for url in pending))
+        return self.metadata
+
+    def filter_files(
+        self,
+        files: List[str],
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None
+    ) -> List[str]:
+        """Filter files by prefetched size and modification date, keeping unknowns"""
+        def keep(url: str) -> bool:
+            info = self.metadata.get(url)
+            if not info:
+                return True
+            if info.size is not None:
+                if min_size is not None and info.size < min_size:
+                    return False
+                if max_size is not None and info.size > max_size:
+                    return False
+            if info.last_modified is not None:
+                modified = info.last_modified.replace(tzinfo=None)
+                if modified_after is not None and modified < modified_after.replace(tzinfo=None):
+                    return False
+                if modified_before is not None and modified > modified_before.replace(tzinfo=None):
+                    return False
+            return True
+
+        return [url for url in files if keep(url)]
+
+    def order_files(self, files: List[str], order: str = ORDER_LISTED) -> List[str]:
+        """Order files by prefetched size; files of unknown size go last"""
+        if order not in (self.ORDER_SMALLEST, self.ORDER_LARGEST):
+            return list(files)
+        known = [url for url in files if self._size_of(url) is not None]
+        unknown = [url for url in files if self._size_of(url) is None]
+        known.sort(key=self._size_of, reverse=order == self.ORDER_LARGEST)
+        return known + unknown
+
+    def total_bytes(self, files: Iterable[str]) -> Optional[int]:
+        """Total size of files if every size is known"""
+        sizes = [self._size_of(url) for url in files]
+        if any(size is None for size in sizes):
+            return None
+        return sum(sizes)
+
+    def _size_of(self, url: str) -> Optional[int]:
+        info = self.metadata.get(url)
+        return info.size if info else None
 
     async def _validate_download(self, path: Path, expected_size: int) -> bool:
         """Validate downloaded file size"""
         if not path.exists():
             return False
         if expected_size and path.stat().st_size != expected_size:
-            self.logger.error(f"Size mismatch for {path}")
+            self.logger.error("Size mismatch for %s", path)
             return False
         return True
 
+    @staticmethod
+    def _check_content(reason: Optional[str], filename: str) -> None:
+        if reason:
+            raise ContentMismatchError(f"{filename}: {reason}")
+
     async def _notify_progress(self, message: str, progress_callback: Optional[Callable[[str], None]]) -> None:
         """Notify progress if callback is provided"""
         if progress_callback:
@@ -53,60 +197,164 @@ class DownloadManager:
         self,
         url: str, 
         output_dir: Path,
-        progress_callback: Optional[Callable[[str], None]] = None
+        progress_callback: Optional[Callable[[str], None]] = None,
+        byte_callback: Optional[Callable[..., None]] = None,
+        replace: bool = False
     ) -> Path:
-        """Download single file with comprehensive error handling"""
-        filename = unquote(Path(url).name)
-        output_path = output_dir / filename
-        temp_path = output_path.with_suffix('.tmp')
-
-        if url in self._cache or output_path.exists():
-            self.logger.info(f"{filename} {self.SKIP_MESSAGE}")
-            self._cache[url] = output_path
+        """Download single file with comprehensive error handling.
+
+        An existing file is skipped unless replace is set, in which case it is
+        downloaded again and overwritten. Archive output always keeps the first copy.
+        """
+        relative = relative_path(url, self.config.OUTPUT_LAYOUT)
+        filename = relative.rsplit('/', 1)[-1]
+        output_path = output_dir / relative
+        archive = await self._archive_for(output_dir)
+
+        if archive is not None:
+            exists = url in self._cache or not archive.reserve(relative)
+            entry = archive.index.get(relative)
+            if entry:
+                output_path = output_dir / entry[0]
+        else:
+            existing = await self._existing_files(output_dir)
+            # A concurrent download already writes this path (same basename in the flat
+            # layout); as with archive members, the first one keeps it
+            exists = relative in self._reserved or (not replace and (url in self._cache or relative in existing))
+            if not exists:
+                self._reserved.add(relative)
+
+        if exists:
+            self.logger.info("%s %s", filename, self.SKIP_MESSAGE, extra={"url": url})
+            output_path = self._cache.setdefault(url, output_path)
+            if byte_callback:
+                skipped_size = self._size_of(url)
+                if skipped_size is None and archive is not None:
+                    skipped_size = entry[1] if entry else None
+                elif skipped_size is None and output_path.is_file():
+                    skipped_size = output_path.stat().st_size
+                byte_callback(skipped_size or 0, skipped=True)
             await self._notify_progress(f"{filename} {self.SKIP_MESSAGE}", progress_callback)
             return output_path
 
+        try:
+            result = await self._transfer(url, relative, output_dir, output_path, archive,
+                                          progress_callback, byte_callback, replace)
+            if archive is None:
+                existing.add(relative)
+            return result
+        finally:
+            if archive is not None:
+                archive.release(relative)
+            else:
+                self._reserved.discard(relative)
+
+    async def _transfer(
+        self,
+        url: str,
+        relative: str,
+        output_dir: Path,
+        output_path: Path,
+        archive: Optional[ArchiveWriter],
+        progress_callback: Optional[Callable[[str], None]],
+        byte_callback: Optional[Callable[..., None]],
+        replace: bool = False
+    ) -> Path:
+        """Fetch url with retries into output_path, or into the archive when one is open"""
+        filename = relative.rsplit('/', 1)[-1]
         await self.ensure_session()
         chunk_size = min(self.config.DOWNLOAD_CHUNK_SIZE * 2, 81920)
+        host = urlparse(url).netloc
         
         for attempt in range(self.config.RETRY_ATTEMPTS):
+            downloaded = 0
+            temp_path = self._temp_path(output_path)
             try:
                 await self._add_delay()
                 if not self._session:
                     raise DownloaderError("No active session")
+                if self.config.ROBOTS_TXT:
+                    await self.robots.wait(url)
 
-                async with self._session.get(url) as response:
+                requested = time.perf_counter()
+                response = await open_response(self._session.get(url), self.config.FIRST_BYTE_TIMEOUT)
+                self.warmer.record_first_byte(url, time.perf_counter() - requested)
+                async with response:
                     response.raise_for_status()
-                    total_size = int(response.headers.get('content-length', 0))
+                    encoding = response.headers.get('Content-Encoding')
+                    # The length of an encoded body is that before the client decoded it
+                    total_size = 0 if encoding else int(response.headers.get('content-length', 0))
+                    sniffer = None
+                    if self.config.CONTENT_SNIFFING:
+                        sniffer = ContentSniffer(url, response.headers.get('Content-Type'), encoding)
+                        self._check_content(sniffer.check_headers(), filename)
                     
-                    output_dir.mkdir(parents=True, exist_ok=True)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
                     
                     if progress_callback:
                         await progress_callback(f"Starting download of {filename}")
                     
-                    with open(temp_path, 'wb') as f:
-                        downloaded = 0
-                        async for chunk in response.content.iter_chunked(chunk_size):
-                            if downloaded == 0:  # First chunk timeout
-                                await asyncio.wait_for(asyncio.sleep(0), timeout=10)
-                            f.write(chunk)
+                    monitor = ThroughputMonitor(self.config.MIN_THROUGHPUT, self.config.THROUGHPUT_WINDOW)
+                    # Archive members are buffered (in memory when small) for the archive writer
+                    sink = archive.new_buffer() if archive is not None else open(temp_path, 'wb')
+                    published = True
+                    try:
+                        async for chunk in iter_body(response, chunk_size, self.config.READ_IDLE_TIMEOUT, monitor):
+                            if sniffer and not sniffer.done:
+                                # Abort mislabelled responses before the rest of the body arrives
+                                self._check_content(sniffer.feed(chunk), filename)
+                            sink.write(chunk)
                             downloaded += len(chunk)
+                            if byte_callback:
+                                byte_callback(len(chunk))
+                            await self.bandwidth.throttle(host, len(chunk))
+                        if sniffer:
+                            self._check_content(sniffer.finish(), filename)
 
-                    if await self._validate_download(temp_path, total_size):
-                        temp_path.rename(output_path)
-                        self._cache[url] = output_path
-                        self.logger.info(f"Successfully downloaded {filename}")
-                        if progress_callback:
-                            await progress_callback(f"{filename} {self.SUCCESS_MESSAGE}")
+                        if archive is not None:
+                            if total_size and sink.tell() != total_size:
+                                raise DownloaderError(f"Download validation failed for {filename}")
+                            buffer, sink = sink, None
+                            entry = await archive.add(relative, buffer, url)
+                            output_path = output_dir / entry["archive"]
+                        else:
+                            sink.close()
+                            if not await self._validate_download(temp_path, total_size):
+                                temp_path.unlink(missing_ok=True)
+                                raise DownloaderError(f"Download validation failed for {filename}")
+                            published = self._publish(temp_path, output_path, replace)
+                    finally:
+                        if sink is not None:
+                            sink.close()
+
+                    self._cache[url] = output_path
+                    if not published:
+                        # Another process (e.g. a shard) finished the same path first
+                        self.logger.info("%s %s", filename, self.SKIP_MESSAGE, extra={"url": url})
+                        if byte_callback:
+                            byte_callback(-downloaded)
+                            byte_callback(downloaded, skipped=True)
+                        await self._notify_progress(f"{filename} {self.SKIP_MESSAGE}", progress_callback)
                         return output_path
-                    else:
-                        temp_path.unlink(missing_ok=True)
-                        raise DownloaderError(f"Download validation failed for {filename}")
+                    self.logger.info("Successfully downloaded %s", filename, extra={"url": url})
+                    if progress_callback:
+                        await progress_callback(f"{filename} {self.SUCCESS_MESSAGE}")
+                    return output_path
 
             except DownloadTimeout:
                 raise
+            except ContentMismatchError as e:
+                temp_path.unlink(missing_ok=True)
+                if byte_callback and downloaded:
+                    byte_callback(-downloaded)
+                self.logger.warning("Not retrying %s: %s", url, e, extra={"url": url})
+                if progress_callback:
+                    await progress_callback(f"{filename} {self.MISMATCH_MESSAGE}")
+                raise
             except Exception as e:
-                self.logger.error(f"Download attempt {attempt + 1} failed for {url}: {e}")
+                if byte_callback and downloaded:
+                    byte_callback(-downloaded)
+                self.logger.error("Download attempt %d failed for %s: %s", attempt + 1, url, e, extra={"url": url})
                 if attempt == self.config.RETRY_ATTEMPTS - 1:
                     log_and_raise(self.logger, f"Failed to download {filename}", DownloaderError, e)
                 await asyncio.sleep(1 * (attempt + 1))
@@ -114,25 +362,100 @@ class DownloadManager:
 
         log_and_raise(self.logger, f"All download attempts failed for {filename}", DownloaderError)
 
+    def _temp_path(self, output_path: Path) -> Path:
+        """A temp file next to output_path that no other attempt, here or in another process, uses"""
+        return output_path.with_name(f"{output_path.name}.{os.getpid()}-{next(self._temp_ids)}{TEMP_SUFFIX}")
+
+    @staticmethod
+    def _publish(temp_path: Path, output_path: Path, replace: bool) -> bool:
+        """Move a finished download into place; False if output_path exists and replace is not set.
+
+        A hard link fails when the target exists, so of several processes writing one
+        path the first keeps it. Filesystems without hard links fall back to a rename.
+        """
+        if not replace:
+            try:
+                os.link(temp_path, output_path)
+            except FileExistsError:
+                temp_path.unlink(missing_ok=True)
+                return False
+            except OSError:
+                pass
+            else:
+                temp_path.unlink()
+                return True
+        temp_path.replace(output_path)
+        return True
+
+    async def _existing_files(self, output_dir: Path) -> DigestKeySet:
+        """Files already in output_dir, scanned once per job instead of a stat per file.
+
+        Paths are kept as 64-bit digests, about 16 bytes per file. The scan only goes
+        as deep as the layout puts files and runs in a thread, so a large output
+        folder does not stall the event loop.
+        """
+        existing = self._output_scans.get(output_dir)
+        if existing is None:
+            async with self._scan_lock:  # concurrent first downloads share one scan
+                existing = self._output_scans.get(output_dir)
+                if existing is None:
+                    depth = SCAN_DEPTHS.get(self.config.OUTPUT_LAYOUT)
+                    existing = await asyncio.to_thread(scan_output_dir, output_dir, DigestKeySet(), depth)
+                    self._output_scans[output_dir] = existing
+        return existing
+
+    def reset_output_scan(self) -> None:
+        """Forget scanned output directories so the next job scans again"""
+        self._output_scans.clear()
+
+    async def _archive_for(self, output_dir: Path) -> Optional[ArchiveWriter]:
+        """The archive writer for output_dir in tar/zip output mode, None in files mode"""
+        if self.config.OUTPUT_MODE == OUTPUT_FILES:
+            return None
+        if self.archive is not None and self.archive.output_dir != output_dir:
+            await self.close_archive()
+        if self.archive is None:
+            self.archive = ArchiveWriter(
+                output_dir,
+                self.config.OUTPUT_MODE,
+                self.config.ARCHIVE_MAX_BYTES,
+                self.config.ARCHIVE_SPOOL_BYTES,
+                self.config.ARCHIVE_PREFIX
+            )
+            await self.archive.start()
+        return self.archive
+
+    async def close_archive(self) -> None:
+        """Finish the current archive so it is complete on disk"""
+        if self.archive is not None:
+            archive, self.archive = self.archive, None
+            await archive.close()
+
     async def download_files(
         self,
         files: List[str],
         output_dir: Path,
-        progress_callback: Optional[Callable[[str], None]] = None
+        progress_callback: Optional[Callable[[str], None]] = None,
+        byte_callback: Optional[Callable[..., None]] = None
     ) -> List[Path]:
         """Download multiple files concurrently with progress updates"""
         await self.ensure_session()
         
         self.logger.info(f"Starting download of {len(files)} files to {output_dir}")
+        self.reset_output_scan()
+        await self.warm_up(files)
         results = []
         for url in files:
             try:
-                result = await self.download_file(url, output_dir, progress_callback)
+                result = await self.download_file(url, output_dir, progress_callback, byte_callback)
                 results.append(result)
+            except ContentMismatchError:
+                continue  # already reported with MISMATCH_MESSAGE
             except Exception as e:
-                self.logger.error(f"Error downloading file {url}: {e}")
+                self.logger.error("Error downloading file %s: %s", url, e, extra={"url": url})
                 if progress_callback:
                     await progress_callback(f"Error downloading file {url}: {e}")
+        await self.close_archive()
         
         return results
 
@@ -143,8 +466,24 @@ class DownloadManager:
 
     async def cleanup(self) -> None:
         """Clean up resources"""
+        try:
+            await self.close_archive()
+        except Exception as e:
+            self.logger.error(f"Error closing archive: {e}")
         if self._session and not self._session.closed:
             try:
                 await self._session.close()
             except Exception as e:
-                self.logger.error(f"Error closing session: {e}")
\ No newline at end of file
+                self.logger.error(f"Error closing session: {e}")
+        if self.resolver is not None:
+            resolver, self.resolver = self.resolver, None
+            await resolver.close()
+
+    async def __aenter__(self):
+        """Async context manager entry"""
+        await self.ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.cleanup()
\ No newline at end of file
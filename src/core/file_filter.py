@@ -0,0 +1,127 @@
+# src/core/file_filter.py
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Iterator, List, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+TYPE_GROUPS = {
+    "documents": (".pdf", ".doc", ".docx", ".odt", ".rtf", ".txt", ".md", ".epub",
+                  ".xls", ".xlsx", ".ods", ".csv", ".ppt", ".pptx", ".odp"),
+    "archives": (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".gz", ".bz2",
+                 ".xz", ".7z", ".rar"),
+    "images": (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".svg", ".webp"),
+    "audio": (".mp3", ".wav", ".flac", ".ogg", ".m4a", ".aac"),
+    "video": (".mp4", ".mkv", ".avi", ".mov", ".webm", ".wmv"),
+    "data": (".json", ".xml", ".csv", ".tsv", ".parquet", ".sqlite", ".db")
+}
+
+_INVALID_URL_CHARS = re.compile(r'[<>"{}|\\^\[\]`]')
+_URL_PARTS = re.compile(r'https?://([^/?#]+)([^?#]*)', re.IGNORECASE)
+
+def is_valid_url(url: str) -> bool:
+    """Regex equivalent of the urlparse-based URL validation"""
+    if len(url) >= 2048 or _INVALID_URL_CHARS.search(url):
+        return False
+    match = _URL_PARTS.match(url)
+    return bool(match) and not match.group(2).endswith(('//', '\\'))
+
+def link_path(href: str) -> str:
+    """Path part of an absolute or relative link, without host, query and fragment"""
+    path = href.partition('#')[0].partition('?')[0]
+    if '//' in path:  # a scheme or host to split off ("http://files.pdf" has no path)
+        try:
+            return urlsplit(path).path
+        except ValueError:
+            return ''
+    return path
+
+def parse_file_types(text: str) -> List[str]:
+    """Split a file type field such as '.pdf, archives' into entries"""
+    return [part.strip() for part in re.split(r'[,;\s]+', text or "") if part.strip()]
+
+class FileFilter:
+    """File type matcher built once per search.
+
+    File types may be suffixes (".pdf" or "pdf") or group names from TYPE_GROUPS.
+    Matching looks at the end of the link's path only, so query strings and fragments
+    ("report.pdf?download=1") do not hide the type, and neither a query
+    ("get.php?file=a.pdf") nor a host name ("http://files.pdf") fakes one.
+    """
+
+    def __init__(self, file_types: Iterable[str]):
+        suffixes = set()
+        for file_type in file_types:
+            file_type = file_type.strip().lower()
+            if not file_type:
+                continue
+            if file_type in TYPE_GROUPS:
+                suffixes.update(TYPE_GROUPS[file_type])
+            else:
+                suffixes.add(file_type if file_type.startswith('.') else f".{file_type}")
+        self.suffixes: FrozenSet[str] = frozenset(suffixes)
+        # One anchored pattern for the path: a non-empty file name ending in a wanted suffix
+        alternatives = '|'.join(re.escape(suffix) for suffix in sorted(self.suffixes, key=len, reverse=True))
+        self._match = re.compile(rf'.*[^/](?:{alternatives})\Z', re.IGNORECASE | re.DOTALL).match \
+            if self.suffixes else None
+
+    @classmethod
+    def for_types(cls, file_types: Iterable[str]) -> 'FileFilter':
+        """Shared filter instance for a set of file types"""
+        return _cached_filter(tuple(file_types))
+
+    def matches(self, href: str) -> bool:
+        """True if the link's path ends with one of the wanted suffixes"""
+        return self._match is not None and self._match(link_path(href)) is not None
+
+    def filter_links(self, base_url: str, hrefs: Iterable[str]) -> Iterator[str]:
+        """Yield absolute, valid, fragment-free URLs of matching links"""
+        join = _Joiner(base_url)
+        match = self._match
+        if match is None:
+            return
+        for href in hrefs:
+            href = href.strip()
+            if match(link_path(href)) is None:
+                continue
+            try:
+                absolute_url = join(href)
+                if '#' in absolute_url:
+                    absolute_url, _ = urldefrag(absolute_url)
+            except ValueError:
+                continue
+            if is_valid_url(absolute_url):
+                yield absolute_url
+
+class _Joiner:
+    """urljoin against one base URL, with string concatenation for plain relative links"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        try:
+            parts = urlsplit(base_url)
+        except ValueError:
+            parts = None
+        if (parts and parts.scheme in ('http', 'https') and parts.netloc
+                and '//' not in parts.path and '/.' not in parts.path):
+            self.scheme = parts.scheme
+            self.origin = f"{parts.scheme}://{parts.netloc}"
+            self.directory = self.origin + (parts.path[:parts.path.rfind('/') + 1] or '/')
+        else:
+            self.origin = None
+
+    def __call__(self, href: str) -> str:
+        if href.startswith(('http://', 'https://')):
+            return href if '/.' not in href else urljoin(self.base_url, href)
+        if href.startswith('//'):
+            return urljoin(self.base_url, href) if self.origin is None else f"{self.scheme}:{href}"
+        # Dot segments, empty segments, other schemes, query-only and empty links need the full algorithm
+        if (self.origin is None or not href or href[0] in '.?#' or '/.' in href or '//' in href
+                or ':' in href.split('/', 1)[0]):
+            return urljoin(self.base_url, href)
+        if href[0] == '/':
+            return self.origin + href
+        return self.directory + href
+
+@lru_cache(maxsize=32)
+def _cached_filter(file_types: Tuple[str, ...]) -> FileFilter:
+    return FileFilter(file_types)
\ No newline at end of file
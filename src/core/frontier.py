@@ -0,0 +1,157 @@
+# src/core/frontier.py
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated REAL,
+    sitemap INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS files (
+    url TEXT PRIMARY KEY,
+    source TEXT,
+    downloaded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pages_status ON pages (status);
+CREATE INDEX IF NOT EXISTS files_downloaded ON files (downloaded);
+"""
+
+class CrawlFrontier:
+    """On-disk crawl state (pending pages, visited pages, discovered files) for resumable jobs"""
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path: Path, checkpoint_interval: float = 30.0):
+        self.path = Path(path)
+        self.checkpoint_interval = checkpoint_interval
+        self.logger = logging.getLogger(__name__)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(pages)")]
+        if "sitemap" not in columns:  # frontier written before sitemaps were flagged
+            self._db.execute("ALTER TABLE pages ADD COLUMN sitemap INTEGER NOT NULL DEFAULT 0")
+        self._db.commit()
+        self._last_checkpoint = time.monotonic()
+
+    def save_job(self, job: Dict[str, Any]) -> None:
+        """Store the job parameters needed to resume"""
+        self._db.execute(
+            "INSERT OR REPLACE INTO job (key, value) VALUES ('job', ?)", (json.dumps(job),)
+        )
+        self.checkpoint()
+
+    def load_job(self) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT value FROM job WHERE key = 'job'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def seed(self, urls: List[str], sitemaps: Iterable[str] = ()) -> None:
+        """Add start pages unless the job already knows them; those in sitemaps are sitemaps"""
+        sitemaps = set(sitemaps)
+        self._db.executemany(
+            "INSERT OR IGNORE INTO pages (url, depth, status, sitemap) VALUES (?, 0, ?, ?)",
+            [(url, self.PENDING, url in sitemaps) for url in urls]
+        )
+
+    def pending_pages(self) -> List[Tuple[str, int]]:
+        """Pages still to fetch, including ones that failed last time"""
+        return self._db.execute(
+            "SELECT url, depth FROM pages WHERE status != ? ORDER BY depth", (self.DONE,)
+        ).fetchall()
+
+    def known_pages(self) -> Iterator[str]:
+        for (url,) in self._db.execute("SELECT url FROM pages"):
+            yield url
+
+    def known_sitemaps(self) -> Iterator[str]:
+        """Pages recorded as sitemaps, whatever their URL looks like"""
+        for (url,) in self._db.execute("SELECT url FROM pages WHERE sitemap = 1"):
+            yield url
+
+    def known_files(self) -> Iterator[str]:
+        for (url,) in self._db.execute("SELECT url FROM files"):
+            yield url
+
+    def record_page(
+        self,
+        url: str,
+        files: List[str],
+        new_pages: List[str],
+        depth: int,
+        error: Optional[Exception] = None,
+        sitemaps: Iterable[str] = ()
+    ) -> None:
+        """Record a processed page with the files and child pages it yielded; child sitemaps are flagged"""
+        sitemaps = set(sitemaps)
+        self._db.executemany(
+            "INSERT OR IGNORE INTO files (url, source) VALUES (?, ?)",
+            [(file_url, url) for file_url in files]
+        )
+        self._db.executemany(
+            "INSERT OR IGNORE INTO pages (url, depth, status, sitemap) VALUES (?, ?, ?, ?)",
+            [(page_url, depth + 1, self.PENDING, page_url in sitemaps) for page_url in new_pages]
+        )
+        self._db.execute(
+            "UPDATE pages SET status = ?, error = ?, updated = ? WHERE url = ?",
+            (self.FAILED if error else self.DONE, str(error) if error else None, time.time(), url)
+        )
+        self.maybe_checkpoint()
+
+    def record_files(self, url: str, files: List[str]) -> None:
+        """Record files found so far on a page that is still being read, such as a large sitemap"""
+        self._db.executemany(
+            "INSERT OR IGNORE INTO files (url, source) VALUES (?, ?)",
+            [(file_url, url) for file_url in files]
+        )
+        self.maybe_checkpoint()
+
+    def pending_downloads(self) -> List[Tuple[str, str]]:
+        """Discovered (file_url, source_page) pairs not downloaded yet"""
+        return self._db.execute("SELECT url, source FROM files WHERE downloaded = 0").fetchall()
+
+    def mark_downloaded(self, url: str) -> None:
+        self._db.execute("UPDATE files SET downloaded = 1 WHERE url = ?", (url,))
+        self.maybe_checkpoint()
+
+    def stats(self) -> Dict[str, int]:
+        """Page counts by status plus discovered and downloaded file counts"""
+        stats = dict(self._db.execute("SELECT status, COUNT(*) FROM pages GROUP BY status").fetchall())
+        files, downloaded = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(downloaded), 0) FROM files"
+        ).fetchone()
+        stats.update(files=files, downloaded=downloaded)
+        return stats
+
+    def maybe_checkpoint(self) -> None:
+        """Commit if the checkpoint interval has passed"""
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Commit pending changes to disk"""
+        self._db.commit()
+        self._last_checkpoint = time.monotonic()
+        self.logger.debug("Checkpoint written to %s", self.path)
+
+    def close(self) -> None:
+        try:
+            self.checkpoint()
+        finally:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
\ No newline at end of file
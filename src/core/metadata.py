@@ -0,0 +1,57 @@
+# src/core/metadata.py
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import List, Mapping, Optional
+
+@dataclass
+class FileInfo:
+    url: str
+    size: Optional[int] = None
+    content_type: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    accept_ranges: bool = False
+    etag: Optional[str] = None
+
+    @classmethod
+    def from_headers(cls, url: str, headers: Mapping[str, str]) -> 'FileInfo':
+        """Build file info from HEAD response headers"""
+        size = headers.get('Content-Length')
+        content_type = headers.get('Content-Type')
+        return cls(
+            url=url,
+            size=int(size) if size and size.isdigit() else None,
+            content_type=content_type.split(';')[0].strip() if content_type else None,
+            last_modified=parse_http_date(headers.get('Last-Modified')),
+            accept_ranges=headers.get('Accept-Ranges', '').lower() == 'bytes',
+            etag=headers.get('ETag')
+        )
+
+@dataclass
+class PageSnapshot:
+    """A page's matching files with the validators for the next conditional request"""
+    files: List[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None  # Last-Modified header, sent back verbatim
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an HTTP date header, returning None when missing or malformed"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+def format_size(size: Optional[int]) -> str:
+    """Format a byte count for display"""
+    if size is None:
+        return ""
+    if size < 1024:
+        return f"{size} B"
+    value = float(size)
+    for unit in ("KB", "MB", "GB", "TB"):
+        value /= 1024
+        if value < 1024:
+            break
+    return f"{value:.1f} {unit}"
\ No newline at end of file
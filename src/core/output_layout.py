@@ -0,0 +1,102 @@
+# src/core/output_layout.py
+import os
+import re
+from hashlib import sha1
+from pathlib import Path, PurePosixPath
+from typing import Optional, Set
+from urllib.parse import unquote, urlsplit
+from ..utils.url_utils import canonicalize_url
+
+LAYOUT_FLAT = "flat"  # every file in output_dir under its URL basename (same basename = same file)
+LAYOUT_HOST = "host"  # <host>/<name>-<hash><ext>
+LAYOUT_MIRROR = "mirror"  # <host>/<url path>, with a hash suffix for URLs with a query
+LAYOUT_HASH = "hash"  # ab/cd/<name>-<hash><ext>, spreads huge jobs over 65536 directories
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_HOST, LAYOUT_MIRROR, LAYOUT_HASH)
+
+# Directory levels under output_dir that can hold files of each layout; mirror has no limit
+SCAN_DEPTHS = {LAYOUT_FLAT: 0, LAYOUT_HOST: 1, LAYOUT_HASH: 2}
+
+TEMP_SUFFIX = ".tmp"
+
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_RESERVED_NAMES = {"con", "prn", "aux", "nul", *(f"com{i}" for i in range(1, 10)), *(f"lpt{i}" for i in range(1, 10))}
+
+def url_digest(url: str) -> str:
+    return sha1(canonicalize_url(url).encode('utf-8')).hexdigest()
+
+def safe_segment(segment: str) -> str:
+    """Make one path segment safe on Windows and POSIX filesystems"""
+    segment = _UNSAFE_CHARS.sub('_', segment).rstrip(' .')
+    if not segment or segment in ('.', '..'):
+        return '_'
+    if segment.split('.')[0].lower() in _RESERVED_NAMES:
+        return f"_{segment}"
+    return segment
+
+def _with_digest(name: str, digest: str) -> str:
+    stem, dot, suffix = name.partition('.')
+    return f"{stem}-{digest[:8]}{dot}{suffix}"
+
+def relative_path(url: str, layout: str = LAYOUT_FLAT) -> str:
+    """Deterministic output path of url, relative to the output directory, with '/' separators.
+
+    The flat layout keeps the URL basename, so the same name from two places is
+    one file. The host and hash layouts add a digest of the canonical URL to the
+    name, so two different URLs never share a path. Mirror keeps the URL path and can only
+    collide for URLs that differ just in characters replaced for the filesystem.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown output layout: {layout}")
+
+    parts = urlsplit(url)
+    if layout == LAYOUT_FLAT:
+        # The URL basename, made a safe file name; a query gets its own digest so
+        # get.pdf?id=1 and get.pdf?id=2 are two files, as in the mirror layout
+        basename = parts.path.rsplit('/', 1)[-1]
+        name = safe_segment(unquote(basename)) if basename else "index.html"
+        if parts.query:
+            name = _with_digest(name, sha1('&'.join(sorted(parts.query.split('&'))).encode('utf-8')).hexdigest())
+        return name
+    segments = [safe_segment(unquote(segment)) for segment in parts.path.split('/') if segment]
+    if segments and not parts.path.endswith('/'):
+        directories, name = segments[:-1], segments[-1]
+    else:
+        directories, name = segments, "index.html"
+    digest = url_digest(url)
+    host = safe_segment((parts.hostname or "") + (f"_{parts.port}" if parts.port else ""))
+
+    if layout == LAYOUT_MIRROR:
+        # The path itself is unique; only the query needs folding into the name
+        if parts.query:
+            name = _with_digest(name, digest)
+        return str(PurePosixPath(host, *directories, name))
+    if layout == LAYOUT_HOST:
+        return str(PurePosixPath(host, _with_digest(name, digest)))
+    return str(PurePosixPath(digest[:2], digest[2:4], _with_digest(name, digest)))
+
+def scan_output_dir(output_dir: Path, found: Optional[Set[str]] = None, max_depth: Optional[int] = None) -> Set[str]:
+    """Relative paths of all finished files under output_dir, from one recursive scan.
+
+    Uses the file type from the directory entries, so no file is stat'ed. Paths are
+    added to found when given, which may be any set-like store with add().
+    Subdirectories deeper than max_depth levels are not entered; SCAN_DEPTHS has
+    the depth of each layout, so a flat output folder such as ~ is not walked.
+    """
+    if found is None:
+        found = set()
+    pending = [("", output_dir, 0)]
+    while pending:
+        prefix, directory, depth = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                relative = f"{prefix}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if max_depth is None or depth < max_depth:
+                        pending.append((f"{relative}/", entry.path, depth + 1))
+                elif not entry.name.endswith(TEMP_SUFFIX):
+                    found.add(relative)
+    return found
\ No newline at end of file
@@ -0,0 +1,67 @@
+# src/core/parse_executor.py
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, TypeVar
+from bs4 import BeautifulSoup, SoupStrainer
+from .autoindex import ListingEntry, parse_listing
+
+_ANCHORS = SoupStrainer('a', href=True)
+T = TypeVar('T')
+
+def extract_hrefs(content: bytes, encoding: Optional[str] = None) -> List[str]:
+    """Parse a page and return the href of every anchor.
+
+    Runs in worker processes, so it only takes and returns plain bytes and strings.
+    """
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding, parse_only=_ANCHORS)
+    return [link['href'] for link in soup.find_all('a', href=True)]
+
+class ParseExecutor:
+    """Extracts links from pages, sending large pages to a process pool.
+
+    Pages smaller than `threshold` bytes are parsed inline, where the cost of
+    pickling the page to another process would outweigh the parse. A threshold
+    of 0 disables the pool.
+    """
+
+    def __init__(self, workers: int = 0, threshold: int = 256 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.logger = logging.getLogger(__name__)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config) -> 'ParseExecutor':
+        return cls(config.PARSE_WORKERS, config.PARSE_PROCESS_THRESHOLD)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    async def extract_hrefs(self, content: bytes, encoding: Optional[str] = None) -> List[str]:
+        return await self._run(extract_hrefs, content, encoding)
+
+    async def parse_listing(self, content: bytes, encoding: Optional[str] = None) -> List[ListingEntry]:
+        return await self._run(parse_listing, content, encoding)
+
+    async def _run(self, parse: Callable[[bytes, Optional[str]], T], content: bytes, encoding: Optional[str]) -> T:
+        if not self.enabled or len(content) < self.threshold:
+            return parse(content, encoding)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, parse, content, encoding)
+        except BrokenProcessPool as e:
+            self.logger.warning(f"Parse pool failed, parsing inline from now on: {e}")
+            self.shutdown()
+            self.threshold = 0
+            return parse(content, encoding)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
\ No newline at end of file
@@ -0,0 +1,219 @@
+# src/core/pipeline.py
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+from ..config import AppConfig
+from .browser_manager import BrowserManager
+from .scraper_service import ScraperService
+from .download_manager import DownloadManager
+from .frontier import CrawlFrontier
+from ..utils.exceptions import ContentMismatchError
+from ..utils.logging_setup import log_fields
+from ..utils.loop_monitor import LoopLagMonitor
+from ..utils.memory import BoundedList, MemoryGauge
+from .metadata import format_size
+from .warmup import WarmupReport
+
+@dataclass
+class PipelineSummary:
+    pages: int = 0
+    failed_pages: int = 0
+    discovered: int = 0
+    downloaded: int = 0
+    skipped: int = 0
+    failed: int = 0
+    mismatched: int = 0  # wrong content type, e.g. an HTML login page for a .pdf URL
+    discovery_time: float = 0.0
+    total_time: float = 0.0
+    peak_memory: Optional[int] = None  # peak RSS in bytes
+    traced_peak: Optional[int] = None  # peak Python allocations, with MEMORY_TRACE
+    loop_report: str = ""  # lag histogram and blocking stacks, with LOOP_MONITOR
+    shards: int = 0  # worker processes of a sharded job
+    warmup: Optional[WarmupReport] = None  # DNS and connection warm-up, with WARMUP_CONNECTIONS
+    errors: List[str] = field(default_factory=list)
+
+    def format(self) -> str:
+        """Human readable one-job summary"""
+        lines = [
+            f"Pages searched: {self.pages} ({self.failed_pages} failed)",
+            f"Files discovered: {self.discovered} in {self.discovery_time:.1f}s",
+            f"Downloaded: {self.downloaded}, skipped: {self.skipped}, failed: {self.failed}, "
+            f"wrong content type: {self.mismatched}",
+            f"Total time: {self.total_time:.1f}s"
+        ]
+        if self.shards:
+            lines.insert(0, f"Shards: {self.shards}")
+        if self.warmup and self.warmup.hosts:
+            lines.append(self.warmup.format())
+        if self.peak_memory:
+            memory = f"Peak memory: {format_size(self.peak_memory)}"
+            if self.traced_peak:
+                memory += f" ({format_size(self.traced_peak)} Python objects)"
+            lines.append(memory)
+        if self.loop_report:
+            lines.append(self.loop_report)
+        dropped = getattr(self.errors, "dropped", 0)
+        if dropped:
+            lines.append(f"  ... {dropped} earlier errors not shown")
+        lines.extend(f"  {error}" for error in self.errors)
+        return "\n".join(lines)
+
+class DownloadPipeline:
+    """Discover and download in one job, linked by a bounded queue"""
+    _DONE = object()
+
+    def __init__(self, config: AppConfig, scraper_service: ScraperService, download_manager: DownloadManager):
+        self.config = config
+        self.scraper_service = scraper_service
+        self.download_manager = download_manager
+        download_manager.robots = scraper_service.robots  # one Crawl-delay schedule per host
+        self.logger = logging.getLogger(__name__)
+
+    async def run(
+        self,
+        urls: List[str],
+        file_types: List[str],
+        output_dir: Path,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        frontier: Optional[CrawlFrontier] = None
+    ) -> PipelineSummary:
+        """Run discovery and downloads concurrently and return the combined summary.
+
+        With a frontier the job is checkpointed: files found by an earlier run that were
+        not downloaded yet are queued first, and finished downloads are recorded.
+        """
+        summary = PipelineSummary(errors=BoundedList(self.config.MEMORY_RETENTION))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.config.PIPELINE_QUEUE_SIZE))
+        workers = max(1, self.config.DOWNLOAD_WORKERS)
+        gauge = MemoryGauge(self.config.MEMORY_TRACE)
+        gauge.start()
+        start = time.perf_counter()
+        warmups: Set[asyncio.Task] = set()
+
+        def warm_up(file_urls: List[str]) -> None:
+            # Runs alongside the queue so new hosts are connected before their files come up
+            if self.config.WARMUP_CONNECTIONS > 0 and file_urls:
+                task = asyncio.ensure_future(self.download_manager.warm_up(file_urls))
+                warmups.add(task)
+                task.add_done_callback(warmups.discard)
+
+        def on_error(page_url: str, error: Exception) -> None:
+            summary.failed_pages += 1
+            summary.errors.append(f"{page_url}: {error}")
+
+        async def discover() -> None:
+            try:
+                if frontier:
+                    pending = [file_url for file_url, _ in frontier.pending_downloads()]
+                    warm_up(pending)
+                    for file_url in pending:
+                        summary.discovered += 1
+                        await queue.put(file_url)
+                async for batch in self.scraper_service.iter_file_batches(
+                    urls, file_types, on_error, self.config.CRAWL_MAX_DEPTH, frontier
+                ):
+                    warm_up([file_url for file_url, _ in batch])
+                    for file_url, _ in batch:
+                        summary.discovered += 1
+                        # Directory listings already gave size and date, as a HEAD request would
+                        info = self.scraper_service.take_file_info(file_url)
+                        if info:
+                            self.download_manager.metadata[file_url] = info
+                        # Blocks while downloads fall behind, which pauses page fetching
+                        await queue.put(file_url)
+                    await self._wait_for_memory(gauge, queue)
+            finally:
+                summary.pages = self.scraper_service.pages_visited
+                summary.discovery_time = time.perf_counter() - start
+                for _ in range(workers):
+                    await queue.put(self._DONE)
+
+        async def track(message: str) -> None:
+            if self.download_manager.SUCCESS_MESSAGE in message:
+                summary.downloaded += 1
+            elif self.download_manager.SKIP_MESSAGE in message:
+                summary.skipped += 1
+            if progress_callback:
+                await progress_callback(message)
+
+        async def download() -> None:
+            while True:
+                file_url = await queue.get()
+                if file_url is self._DONE:
+                    return
+                try:
+                    await self.download_manager.download_file(file_url, output_dir, track)
+                    if frontier:
+                        frontier.mark_downloaded(file_url)
+                except ContentMismatchError as e:
+                    summary.mismatched += 1
+                    summary.errors.append(f"{file_url}: {e}")
+                except Exception as e:
+                    summary.failed += 1
+                    summary.errors.append(f"{file_url}: {e}")
+                    self.logger.error("Error downloading file %s: %s", file_url, e, extra={"url": file_url})
+                finally:
+                    self.download_manager.metadata.pop(file_url, None)  # not needed again in this job
+
+        with log_fields(job=uuid.uuid4().hex[:12]):  # tags every record of this job, e.g. in JSON logs
+            self.logger.info("Starting pipeline for %d pages with %d download workers", len(urls), workers)
+            await self.download_manager.ensure_session()
+            self.download_manager.reset_output_scan()
+            self.download_manager.warmer.reset()
+            monitor = LoopLagMonitor(threshold=self.config.LOOP_LAG_THRESHOLD) if self.config.LOOP_MONITOR else None
+            if monitor:
+                monitor.start()
+            tasks = [asyncio.ensure_future(discover())] + [asyncio.ensure_future(download()) for _ in range(workers)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # After a failure the other workers are stopped before the archive and sessions close
+                for task in tasks + list(warmups):
+                    task.cancel()
+                await asyncio.gather(*tasks, *warmups, return_exceptions=True)
+                summary.warmup = self.download_manager.warmer.report
+                await self.download_manager.close_archive()
+                if monitor:
+                    await monitor.stop()
+                    summary.loop_report = monitor.format()
+        summary.total_time = time.perf_counter() - start
+        memory = gauge.snapshot()
+        gauge.stop()
+        summary.peak_memory = memory["peak_rss"]
+        summary.traced_peak = memory.get("traced_peak")
+        if frontier:
+            frontier.checkpoint()
+        return summary
+
+    async def _wait_for_memory(self, gauge: MemoryGauge, queue: asyncio.Queue) -> None:
+        """Hold discovery while RSS is over MEMORY_BUDGET and downloads still have work queued"""
+        budget = self.config.MEMORY_BUDGET
+        if not budget:
+            return
+        rss = gauge.sample()
+        if rss is None or rss <= budget or queue.empty():
+            return
+        self.logger.warning("Memory %s over budget %s, pausing discovery", format_size(rss), format_size(budget))
+        while not queue.empty():
+            await asyncio.sleep(0.1)
+            rss = gauge.sample()
+            if rss is None or rss <= budget:
+                break
+
+async def run_pipeline(
+    config: AppConfig,
+    urls: List[str],
+    file_types: List[str],
+    output_dir: Path,
+    progress_callback: Optional[Callable[[str], None]] = None,
+    frontier: Optional[CrawlFrontier] = None
+) -> PipelineSummary:
+    """Run a headless discover-and-download job"""
+    async with ScraperService(config, BrowserManager(config)) as scraper_service, \
+            DownloadManager(config) as download_manager:
+        pipeline = DownloadPipeline(config, scraper_service, download_manager)
+        return await pipeline.run(urls, file_types, output_dir, progress_callback, frontier)
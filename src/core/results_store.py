@@ -0,0 +1,175 @@
+# src/core/results_store.py
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+from .content_sniffer import expected_suffix
+from .metadata import FileInfo, format_size
+
+SORT_NAME = "name"
+SORT_SIZE = "size"
+SORT_TYPE = "type"
+SORT_MODIFIED = "modified"
+SORT_SOURCE = "source"
+COLUMNS = (SORT_NAME, SORT_SIZE, SORT_TYPE, SORT_MODIFIED, SORT_SOURCE)  # table column order
+
+class ResultStore:
+    """Column-oriented store of search results behind the paged results table.
+
+    Rows are only appended, one list per column. The visible order is a list of
+    row ids rebuilt from the columns when the sort or filter changes, so a page
+    of rows can be rendered without touching the tens of thousands of others.
+    Rows added to an unsorted view are appended to it directly.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.urls: List[str] = []
+        self.source_pages: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._folded: List[str] = []  # lowercase names for filtering and sorting
+        self._suffixes: List[str] = []
+        self._types: List[str] = []  # content type, or the suffix until HEAD metadata arrives
+        self._sizes: List[int] = []  # -1 = unknown
+        self._modified: List[float] = []  # POSIX timestamp, 0 = unknown
+        self._sources: List[int] = []
+        self._info: List[Optional[FileInfo]] = []
+        self._source_ids: Dict[str, int] = {}
+        self.suffixes: Set[str] = set()
+        self.sort_key: Optional[str] = None
+        self.descending = False
+        self.name_filter = ""
+        self.type_filter = ""
+        self.source_filter = ""
+        self._view: List[int] = []
+        self._stale = False
+
+    def add(self, url: str, source: str = "", info: Optional[FileInfo] = None) -> bool:
+        """Append a result; False if url is already listed"""
+        if url in self._rows:
+            return False
+        row = self._rows[url] = len(self.urls)
+        name = Path(url).name
+        suffix = expected_suffix(url)
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self.source_pages)
+            self.source_pages.append(source)
+        self.urls.append(url)
+        self._names.append(name)
+        self._folded.append(name.lower())
+        self._suffixes.append(suffix)
+        self._types.append(suffix)
+        self._sizes.append(-1)
+        self._modified.append(0.0)
+        self._sources.append(source_id)
+        self._info.append(None)
+        self.suffixes.add(suffix)
+        if info:
+            self.set_info(info)
+        if self.sort_key is None and not self._stale:
+            if self._matches(row):
+                self._view.append(row)
+        else:
+            self._stale = True
+        return True
+
+    def set_info(self, info: FileInfo) -> None:
+        """Attach HEAD or listing metadata to a listed file"""
+        row = self._rows.get(info.url)
+        if row is None:
+            return
+        self._info[row] = info
+        self._sizes[row] = info.size if info.size is not None else -1
+        self._modified[row] = info.last_modified.timestamp() if info.last_modified else 0.0
+        self._types[row] = info.content_type or self._suffixes[row]
+        if self.sort_key in (SORT_SIZE, SORT_TYPE, SORT_MODIFIED):
+            self._stale = True
+
+    def sort(self, key: Optional[str], descending: bool = False) -> None:
+        """Sort the view by a column, or restore discovery order with None"""
+        if key is not None and key not in COLUMNS:
+            raise ValueError(f"Unknown sort column: {key}")
+        self.sort_key = key
+        self.descending = descending
+        self._stale = True
+
+    def set_filter(self, name: str = "", file_type: str = "", source: str = "") -> None:
+        """Show only rows whose name contains name, with the given suffix and source page"""
+        self.name_filter = name.strip().lower()
+        self.type_filter = file_type
+        self.source_filter = source
+        self._stale = True
+
+    def refresh(self) -> bool:
+        """Rebuild the view if the sort or filter made it stale; True if it changed"""
+        if not self._stale:
+            return False
+        rows = range(len(self.urls))
+        if self.name_filter or self.type_filter or self.source_filter:
+            rows = [row for row in rows if self._matches(row)]
+        key = self._sort_column()
+        self._view = sorted(rows, key=key, reverse=self.descending) if key else list(rows)
+        self._stale = False
+        return True
+
+    def _sort_column(self) -> Optional[Callable[[int], object]]:
+        if self.sort_key == SORT_NAME:
+            return self._folded.__getitem__
+        if self.sort_key == SORT_SIZE:
+            return self._sizes.__getitem__
+        if self.sort_key == SORT_TYPE:
+            return self._types.__getitem__
+        if self.sort_key == SORT_MODIFIED:
+            return self._modified.__getitem__
+        if self.sort_key == SORT_SOURCE:
+            return lambda row: self.source_pages[self._sources[row]]
+        return None
+
+    def _matches(self, row: int) -> bool:
+        if self.name_filter and self.name_filter not in self._folded[row]:
+            return False
+        if self.type_filter and self._suffixes[row] != self.type_filter:
+            return False
+        if self.source_filter and self.source_pages[self._sources[row]] != self.source_filter:
+            return False
+        return True
+
+    @property
+    def total(self) -> int:
+        return len(self.urls)
+
+    def __len__(self) -> int:
+        """Number of rows in the current view"""
+        self.refresh()
+        return len(self._view)
+
+    def url_at(self, position: int) -> str:
+        """URL of the row at position in the current view"""
+        self.refresh()
+        return self.urls[self._view[position]]
+
+    def visible_urls(self) -> List[str]:
+        self.refresh()
+        return [self.urls[row] for row in self._view]
+
+    def source_of(self, url: str) -> Optional[str]:
+        row = self._rows.get(url)
+        return self.source_pages[self._sources[row]] if row is not None else None
+
+    def page(self, start: int, count: int) -> List[List[str]]:
+        """Table rows for count view positions from start; only these are formatted"""
+        self.refresh()
+        rows = []
+        for row in self._view[start:start + count]:
+            info = self._info[row]
+            modified = info.last_modified.strftime("%Y-%m-%d %H:%M") if info and info.last_modified else ""
+            rows.append([
+                self._names[row],
+                format_size(info.size) if info else "",
+                (info.content_type or "") if info else "",
+                modified,
+                self.source_pages[self._sources[row]]
+            ])
+        return rows
\ No newline at end of file
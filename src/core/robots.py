@@ -0,0 +1,88 @@
+# src/core/robots.py
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+MAX_ROBOTS_BYTES = 500 * 1024  # RFC 9309: at least 500 KiB must be parsed, the rest may be ignored
+
+# Returns (status, body) for a robots.txt URL; raises for network errors
+RobotsFetcher = Callable[[str], Awaitable[Tuple[int, str]]]
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+class RobotsCache:
+    """robots.txt rules fetched once per host and shared by all requests to it.
+
+    Follows RFC 9309 for unavailable files: a 4xx means no restrictions, a 5xx
+    means everything is disallowed. A host that cannot be reached at all is
+    treated as unrestricted, so the page fetch itself reports the error.
+    Crawl-delay is applied by wait(), capped at max_delay seconds.
+    """
+
+    def __init__(self, user_agent: str, fetch: RobotsFetcher, max_delay: float = 10.0):
+        self.user_agent = user_agent
+        self.fetch = fetch
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(__name__)
+        self._policies: Dict[str, RobotFileParser] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_slot: Dict[str, float] = {}  # origin -> monotonic time of its next allowed request
+
+    async def policy(self, url: str) -> RobotFileParser:
+        origin = origin_of(url)
+        policy = self._policies.get(origin)
+        if policy is None:
+            lock = self._locks.setdefault(origin, asyncio.Lock())
+            async with lock:
+                policy = self._policies.get(origin)
+                if policy is None:
+                    policy = self._policies[origin] = await self._load(origin)
+                    self._locks.pop(origin, None)
+        return policy
+
+    async def _load(self, origin: str) -> RobotFileParser:
+        robots_url = f"{origin}/robots.txt"
+        policy = RobotFileParser(robots_url)
+        try:
+            status, body = await self.fetch(robots_url)
+        except Exception as e:
+            self.logger.warning("Could not fetch %s, crawling without restrictions: %s", robots_url, e)
+            policy.allow_all = True
+            return policy
+        if 200 <= status < 300:
+            policy.parse(body[:MAX_ROBOTS_BYTES].splitlines())
+        elif status >= 500:
+            self.logger.warning("%s returned %d, treating the host as disallowed", robots_url, status)
+            policy.disallow_all = True
+        else:
+            policy.allow_all = True
+        return policy
+
+    async def allowed(self, url: str) -> bool:
+        return (await self.policy(url)).can_fetch(self.user_agent, url)
+
+    async def crawl_delay(self, url: str) -> float:
+        # urllib.robotparser only reads whole seconds; fractional delays are ignored
+        delay = (await self.policy(url)).crawl_delay(self.user_agent)
+        return min(float(delay or 0), self.max_delay)
+
+    async def sitemaps(self, url: str) -> List[str]:
+        """Sitemap URLs the host's robots.txt lists"""
+        return (await self.policy(url)).site_maps() or []
+
+    async def wait(self, url: str) -> None:
+        """Sleep until the host's Crawl-delay allows another request"""
+        delay = await self.crawl_delay(url)
+        if not delay:
+            return
+        origin = origin_of(url)
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(origin, now))
+        self._next_slot[origin] = slot + delay  # reserve the slot before sleeping
+        if slot > now:
+            await asyncio.sleep(slot - now)
\ No newline at end of file
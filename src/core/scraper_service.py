@@ -1,29 +1,53 @@
 import aiohttp
 import asyncio
 import logging
-from typing import List, Set, Optional
-from urllib.parse import urljoin, urlparse
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar, Union
+from urllib.parse import urldefrag, urljoin, urlparse
 from bs4 import BeautifulSoup
-from ..utils.exceptions import log_and_raise, WebScraperError, ScraperError, URLError, ParsingError
+from xml.etree.ElementTree import ParseError
+from ..utils.exceptions import log_and_raise, WebScraperError, ScraperError, URLError, ParsingError, PageTooLargeError
+from ..utils.url_store import URLStore, create_url_store
 from ..config import AppConfig
 from .browser_manager import BrowserManager
+from .frontier import CrawlFrontier
+from .file_filter import FileFilter, is_valid_url
+from .parse_executor import ParseExecutor
+from .autoindex import detect_listing
+from .metadata import FileInfo, PageSnapshot, format_size
+from .robots import RobotsCache
+from .sitemap import SitemapEntry, SitemapParser, is_sitemap_url
+from .transfer import iter_body, open_response
+from .backends import create_session
+
+T = TypeVar('T')
 
 class ScraperService:
+    PAGE_SUFFIXES = ('.html', '.htm', '.shtml', '.php', '.asp', '.aspx', '.jsp', '.cgi')
+
     def __init__(self, config: AppConfig, browser_manager: BrowserManager):
         self.config = config
         self.browser_manager = browser_manager
         self.logger = logging.getLogger(__name__)
-        self.seen_urls: Set[str] = set()
+        self.seen_urls: URLStore = self._create_url_store()
+        self.seen_pages: URLStore = self._create_url_store()
+        self.pages_visited = 0
+        self.file_info: Dict[str, FileInfo] = {}  # metadata read from directory listings
+        self._crawl_scopes: List[str] = []
+        self.parser = ParseExecutor.from_config(config)
         self._session: Optional[aiohttp.ClientSession] = None
-        self.timeout = aiohttp.ClientTimeout(total=30, connect=10)
+        self.robots = RobotsCache(config.USER_AGENT, self._fetch_robots, config.ROBOTS_MAX_CRAWL_DELAY)
+
+    def _create_url_store(self) -> URLStore:
+        return create_url_store(
+            self.config.SEEN_URL_STORE,
+            self.config.SEEN_URL_CAPACITY,
+            self.config.SEEN_URL_ERROR_RATE
+        )
 
     async def ensure_session(self) -> None:
         """Ensure session is active"""
         if not self._session or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                timeout=self.timeout,
-                headers=self._get_headers()
-            )
+            self._session = create_session(self.config, self._get_headers())
 
     def _get_headers(self) -> dict:
         """Get request headers"""
@@ -40,49 +64,363 @@ class ScraperService:
     def _is_valid_url(self, url: str) -> bool:
         """Validate URL with improved checks"""
         try:
-            result = urlparse(url)
-            return all([
-                result.scheme in ('http', 'https'),
-                result.netloc,
-                not result.path.endswith(('//', '\\')),
-                len(url) < 2048,  # Common URL length limit
-                not any(c in url for c in '<>"{}|\\^[]`')  # Invalid URL characters
-            ])
+            return is_valid_url(url)
         except Exception as e:
-            self.logger.warning(f"URL validation failed for {url}: {e}")
+            self.logger.warning("URL validation failed for %s: %s", url, e, extra={"url": url})
             return False
 
     async def fetch_files(self, url: str, file_types: List[str]) -> List[str]:
         """Fetch files with comprehensive error handling"""
-        self.logger.info(f"Fetching files from {url}")
+        self.logger.info("Fetching files from %s", url, extra={"url": url})
         self.seen_urls.clear()
-        
+        self.file_info.clear()
+        return await self._fetch_page_files(url, file_types)
+
+    async def fetch_many(
+        self,
+        urls: List[str],
+        file_types: List[str],
+        on_page: Optional[Callable[[str, List[str], Optional[Exception]], Awaitable[None]]] = None,
+        max_depth: int = 0,
+        frontier: Optional[CrawlFrontier] = None,
+        keep_results: bool = True
+    ) -> Dict[str, List[str]]:
+        """Fetch files from several pages concurrently, de-duplicated across pages.
+
+        With max_depth > 0 pages under the start URLs are crawled as well. A frontier
+        makes the crawl resumable: completed pages and known files are not fetched again.
+        Streaming callers pass keep_results=False so per-page results are not accumulated.
+
+        Sitemaps are streamed instead of parsed as pages; their files are reported in
+        batches of SEARCH_BATCH_SIZE, so on_page may be called several times for one
+        sitemap. The <sitemap> entries of an index and, with SITEMAP_DISCOVERY, the
+        sitemaps listed in each start host's robots.txt are searched as sitemaps
+        whatever their URL; other URLs are taken for sitemaps by is_sitemap_url.
+        """
+        sitemaps: Set[str] = set()
+        if self.config.SITEMAP_DISCOVERY:
+            urls, sitemaps = await self._with_sitemaps(urls)
+        self.logger.info("Fetching files from %d pages (depth %d)", len(urls), max_depth)
+        self.seen_urls.clear()
+        self.seen_pages.clear()
+        self.file_info.clear()
+        self.pages_visited = 0
+        self._crawl_scopes = [self._crawl_scope(url) for url in urls]
+        results: Dict[str, List[str]] = {}
+        failures: List[Exception] = []
+        queue: asyncio.Queue = asyncio.Queue()
+
+        if frontier:
+            frontier.seed(urls, sitemaps)
+            self.seen_urls.update(frontier.known_files())
+            self.seen_pages.update(frontier.known_pages())
+            sitemaps.update(frontier.known_sitemaps())
+            start_pages = [(url, depth, url in sitemaps) for url, depth in frontier.pending_pages()]
+        else:
+            start_pages = [(url, 0, url in sitemaps) for url in dict.fromkeys(urls)]
+            self.seen_pages.update(url for url, _, _ in start_pages)
+
+        for page in start_pages:
+            queue.put_nowait(page)
+
+        async def allowed(files: List[str]) -> List[str]:
+            if not self.config.ROBOTS_TXT:
+                return files
+            return [file_url for file_url in files if await self.robots.allowed(file_url)]
+
+        async def report(page_url: str, files: List[str]) -> None:
+            """Hand over a batch of a sitemap's files before the whole sitemap is read"""
+            files = await allowed(files)
+            if frontier:
+                frontier.record_files(page_url, files)
+            if keep_results:
+                results.setdefault(page_url, []).extend(files)
+            if on_page:
+                await on_page(page_url, files, None)
+
+        async def process(page_url: str, depth: int, sitemap: bool) -> None:
+            error = None
+            pages: List[str] = []
+            child_sitemaps: List[str] = []
+            try:
+                if sitemap or is_sitemap_url(page_url):
+                    files, pages, child_sitemaps = await self._fetch_sitemap(
+                        page_url, file_types, depth < max_depth, report
+                    )
+                elif depth < max_depth:
+                    files, pages = await self._fetch_page_links(page_url, file_types)
+                else:
+                    files = await self._fetch_page_files(page_url, file_types)
+                files = await allowed(files)
+            except WebScraperError as e:
+                self.logger.warning("Skipping %s: %s", page_url, e, extra={"url": page_url})
+                files, error = [], e
+
+            self.pages_visited += 1
+            new_sitemaps = [p for p in child_sitemaps if self.seen_pages.add(p)]
+            new_pages = [p for p in pages if self.seen_pages.add(p)]
+            for p in new_sitemaps:
+                queue.put_nowait((p, depth + 1, True))
+            for p in new_pages:
+                queue.put_nowait((p, depth + 1, False))
+            if frontier:
+                frontier.record_page(page_url, files, new_sitemaps + new_pages, depth, error, new_sitemaps)
+            if keep_results:
+                results.setdefault(page_url, []).extend(files)
+            # Report before taking the next page so a slow consumer slows down fetching
+            if on_page:
+                await on_page(page_url, files, error)
+
+        async def worker() -> None:
+            while True:
+                page_url, depth, sitemap = await queue.get()
+                try:
+                    await process(page_url, depth, sitemap)
+                except Exception as e:
+                    failures.append(e)
+                finally:
+                    queue.task_done()
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max(1, self.config.MAX_CONCURRENT_PAGES))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if frontier:
+                frontier.checkpoint()
+
+        if failures:
+            raise failures[0]
+        ordered = {url: results[url] for url in urls if url in results}
+        ordered.update(results)
+        return ordered
+
+    async def _with_sitemaps(self, urls: List[str]) -> Tuple[List[str], Set[str]]:
+        """The start URLs followed by the sitemaps their hosts' robots.txt files list, and those sitemaps"""
+        await self.ensure_session()
+        found: List[str] = []
+        for url in urls:
+            if self._is_valid_url(url):
+                found.extend(sitemap for sitemap in await self.robots.sitemaps(url) if self._is_valid_url(sitemap))
+        return list(dict.fromkeys(urls + found)), set(found)
+
+    def _crawl_scope(self, url: str) -> str:
+        """URL prefix a crawl starting at url may not leave"""
+        base, _, _ = url.partition('?')
+        return base[:base.rfind('/') + 1] if urlparse(base).path else base + '/'
+
+    def _is_crawlable(self, url: str) -> bool:
+        path = urlparse(url).path
+        name = path.rsplit('/', 1)[-1]
+        if '.' in name and not name.lower().endswith(self.PAGE_SUFFIXES):
+            return False
+        return any(url.startswith(scope) for scope in self._crawl_scopes)
+
+    async def iter_file_batches(
+        self,
+        urls: List[str],
+        file_types: List[str],
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+        max_depth: int = 0,
+        frontier: Optional[CrawlFrontier] = None
+    ) -> AsyncIterator[List[Tuple[str, str]]]:
+        """Yield (file_url, source_page) batches as soon as each page is parsed"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.config.SEARCH_BATCH_SIZE))
+        finished = object()
+        failure: List[Exception] = []
+
+        async def on_page(page_url: str, files: List[str], error: Optional[Exception]) -> None:
+            if error and on_error:
+                on_error(page_url, error)
+            for file_url in files:
+                await queue.put((file_url, page_url))
+
+        async def produce() -> None:
+            try:
+                await self.fetch_many(urls, file_types, on_page, max_depth, frontier, keep_results=False)
+            except Exception as e:
+                failure.append(e)
+            await queue.put(finished)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                batch = []
+                while item is not finished:
+                    batch.append(item)
+                    if len(batch) >= self.config.SEARCH_BATCH_SIZE or queue.empty():
+                        break
+                    item = queue.get_nowait()
+                if batch:
+                    yield batch
+                if item is finished:
+                    break
+            if failure:
+                raise failure[0]
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    async def iter_files(
+        self,
+        urls: List[str],
+        file_types: List[str],
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+        max_depth: int = 0,
+        frontier: Optional[CrawlFrontier] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (file_url, source_page) pairs as they are discovered"""
+        async for batch in self.iter_file_batches(urls, file_types, on_error, max_depth, frontier):
+            for item in batch:
+                yield item
+
+    async def _fetch_page_files(self, url: str, file_types: List[str]) -> List[str]:
+        """Fetch one page and extract files not seen earlier in this search"""
+        hrefs, _ = await self._fetch_links(url, file_types)
+        files = self._extract_files(hrefs, url, file_types)
+        self.logger.info("Found %d files on %s", len(files), url, extra={"url": url})
+        return files
+
+    async def _fetch_page_links(self, url: str, file_types: List[str]) -> Tuple[List[str], List[str]]:
+        """Fetch one page and extract new files plus crawlable page links"""
+        hrefs, subdirectories = await self._fetch_links(url, file_types)
+        files = self._extract_files(hrefs, url, file_types)
+        self.logger.info("Found %d files on %s", len(files), url, extra={"url": url})
+        # In a directory listing every other entry is a file, so only subdirectories are crawled
+        pages = self._extract_pages(subdirectories if subdirectories is not None else hrefs, url, file_types)
+        return files, pages
+
+    async def _fetch_links(self, url: str, file_types: List[str]) -> Tuple[List[str], Optional[List[str]]]:
+        """Fetch one page with retries and return its link targets, plus subdirectories for listings"""
+        async def parse(response: aiohttp.ClientResponse) -> Tuple[List[str], Optional[List[str]]]:
+            content = await self._read_page(url, response)
+            try:
+                return await self._parse_links(url, content, response.charset, file_types)
+            except Exception as e:
+                raise ParsingError(f"Failed to parse HTML from {url}", e)
+
+        return await self._fetch(url, parse)
+
+    async def fetch_if_changed(
+        self,
+        url: str,
+        file_types: List[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Optional[PageSnapshot]:
+        """Fetch all matching files of one page, or None if a conditional request shows it unchanged.
+
+        Unlike a search, files already found on other pages are included.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async def parse(response: aiohttp.ClientResponse) -> Optional[PageSnapshot]:
+            if response.status == 304:
+                return None
+            content = await self._read_page(url, response)
+            try:
+                hrefs, _ = await self._parse_links(url, content, response.charset, file_types)
+            except Exception as e:
+                raise ParsingError(f"Failed to parse HTML from {url}", e)
+            files = FileFilter.for_types(file_types).filter_links(url, self._hrefs(hrefs))
+            return PageSnapshot(list(dict.fromkeys(files)), response.headers.get("ETag"),
+                                response.headers.get("Last-Modified"))
+
+        return await self._fetch(url, parse, headers)
+
+    async def _fetch_sitemap(
+        self,
+        url: str,
+        file_types: List[str],
+        crawl_pages: bool,
+        report: Callable[[str, List[str]], Awaitable[None]]
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """Stream a sitemap or sitemap index, handing matching files to report in batches.
+
+        Returns the files of the last batch, with crawl_pages the in-scope pages
+        the sitemap lists, and the nested sitemaps of an index.
+        """
+        file_filter = FileFilter.for_types(file_types)
+        batch_size = max(1, self.config.SEARCH_BATCH_SIZE)
+
+        async def stream(response: aiohttp.ClientResponse) -> Tuple[List[str], List[str], List[str]]:
+            parser = SitemapParser()
+            files: List[str] = []
+            pages: List[str] = []
+            sitemaps: List[str] = []
+
+            def add(entries: List[SitemapEntry]) -> None:
+                for entry in entries:
+                    loc = entry.loc
+                    if entry.is_index:
+                        if self._is_valid_url(loc):
+                            sitemaps.append(loc)
+                    elif file_filter.matches(loc):
+                        if self._is_valid_url(loc) and self.seen_urls.add(loc):
+                            files.append(loc)
+                            if entry.lastmod:
+                                self.file_info[loc] = FileInfo(loc, last_modified=entry.lastmod)
+                    elif crawl_pages and self._is_valid_url(loc) and self._is_crawlable(loc):
+                        pages.append(loc)
+
+            try:
+                async for chunk in iter_body(response, 65536, self.config.READ_IDLE_TIMEOUT):
+                    add(parser.feed(chunk))
+                    if len(files) >= batch_size:
+                        await report(url, files)
+                        files = []
+                add(parser.close())
+            except Exception as e:
+                if files:  # already marked seen, so a retry would not find them again
+                    await report(url, files)
+                if isinstance(e, ParseError):
+                    raise ParsingError(f"Failed to parse sitemap {url}", e)
+                raise
+            self.logger.info("Read sitemap %s", url, extra={"url": url})
+            return files, pages, sitemaps
+
+        return await self._fetch(url, stream)
+
+    async def _fetch(
+        self,
+        url: str,
+        handle: Callable[[aiohttp.ClientResponse], Awaitable[T]],
+        headers: Optional[Dict[str, str]] = None
+    ) -> T:
+        """GET url with retries, honouring robots.txt with ROBOTS_TXT, and pass the response to handle"""
         try:
             if not self._is_valid_url(url):
                 raise URLError(f"Invalid URL format: {url}")
 
             await self.ensure_session()
-            
+            if self.config.ROBOTS_TXT:
+                if not await self.robots.allowed(url):
+                    raise URLError(f"Disallowed by robots.txt: {url}")
+                await self.robots.wait(url)
+
             for attempt in range(self.config.RETRY_ATTEMPTS):
                 try:
-                    async with self._session.get(url) as response:
+                    request = self._session.get(url, headers=headers) if headers else self._session.get(url)
+                    response = await open_response(request, self.config.FIRST_BYTE_TIMEOUT)
+                    async with response:
                         response.raise_for_status()
-                        content = await response.text()
-                        
-                        try:
-                            soup = BeautifulSoup(content, 'html.parser', from_encoding=response.charset)
-                        except Exception as e:
-                            raise ParsingError(f"Failed to parse HTML from {url}", e)
-
-                        files = self._extract_files(soup, url, file_types)
-                        self.logger.info(f"Found {len(files)} files")
-                        return files
+                        return await handle(response)
 
                 except aiohttp.ClientError as e:
                     delay = min(2 ** attempt, 30)  # Exponential backoff, max 30s
                     self.logger.warning(
-                        f"Attempt {attempt + 1}/{self.config.RETRY_ATTEMPTS} "
-                        f"failed, retrying in {delay}s: {e}"
+                        "Attempt %d/%d failed, retrying in %ds: %s",
+                        attempt + 1, self.config.RETRY_ATTEMPTS, delay, e, extra={"url": url}
                     )
                     if attempt == self.config.RETRY_ATTEMPTS - 1:
                         log_and_raise(self.logger, f"Failed to fetch URL {url}", URLError, e)
@@ -91,8 +429,8 @@ class ScraperService:
                 except asyncio.TimeoutError as e:
                     delay = min(2 ** attempt, 30)
                     self.logger.warning(
-                        f"Timeout on attempt {attempt + 1}/{self.config.RETRY_ATTEMPTS}, "
-                        f"retrying in {delay}s: {e}"
+                        "Timeout on attempt %d/%d, retrying in %ds: %s",
+                        attempt + 1, self.config.RETRY_ATTEMPTS, delay, e, extra={"url": url}
                     )
                     if attempt == self.config.RETRY_ATTEMPTS - 1:
                         log_and_raise(self.logger, f"Timeout fetching URL {url}", URLError, e)
@@ -103,40 +441,91 @@ class ScraperService:
         except Exception as e:
             log_and_raise(self.logger, f"Unexpected error scraping {url}", ScraperError, e)
 
-    def _extract_files(self, soup: BeautifulSoup, base_url: str, file_types: List[str]) -> List[str]:
+    async def _fetch_robots(self, robots_url: str) -> Tuple[int, str]:
+        response = await open_response(self._session.get(robots_url), self.config.FIRST_BYTE_TIMEOUT)
+        async with response:
+            if response.status >= 400:
+                return response.status, ""
+            return response.status, (await self._read_page(robots_url, response)).decode('utf-8', errors='replace')
+
+    def take_file_info(self, file_url: str) -> Optional[FileInfo]:
+        """Hand over listing metadata for a discovered file; each entry is returned once"""
+        return self.file_info.pop(file_url, None)
+
+    async def _read_page(self, url: str, response: aiohttp.ClientResponse) -> bytes:
+        """Read a page body, refusing pages over MAX_PAGE_BYTES before they are buffered"""
+        limit = self.config.MAX_PAGE_BYTES
+        if limit and (response.content_length or 0) > limit:
+            raise PageTooLargeError(f"Page {url} is {format_size(response.content_length)}, "
+                                    f"over the {format_size(limit)} limit")
+        chunks = []
+        received = 0
+        async for chunk in iter_body(response, 65536, self.config.READ_IDLE_TIMEOUT):
+            received += len(chunk)
+            if limit and received > limit:
+                raise PageTooLargeError(f"Page {url} is over the {format_size(limit)} limit")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def _parse_links(
+        self,
+        url: str,
+        content: bytes,
+        encoding: Optional[str],
+        file_types: List[str]
+    ) -> Tuple[List[str], Optional[List[str]]]:
+        """Parse a page, using the linear-time parser for Apache/nginx/lighttpd listings.
+
+        Sizes and dates from a listing are kept in file_info so HEAD requests can be skipped.
+        """
+        if not self.config.AUTOINDEX_FAST_PATH or not detect_listing(content):
+            return await self.parser.extract_hrefs(content, encoding), None
+
+        entries = await self.parser.parse_listing(content, encoding)
+        file_filter = FileFilter.for_types(file_types)
+        for entry in entries:
+            if not entry.is_dir and file_filter.matches(entry.href):
+                file_url = urljoin(url, entry.href)
+                if file_url not in self.seen_urls:
+                    self.file_info[file_url] = FileInfo(file_url, entry.size, last_modified=entry.modified)
+        return [entry.href for entry in entries], [entry.href for entry in entries if entry.is_dir]
+
+    @staticmethod
+    def _hrefs(links: Union[BeautifulSoup, List[str]]) -> List[str]:
+        if isinstance(links, BeautifulSoup):
+            return [link['href'] for link in links.find_all('a', href=True)]
+        return links
+
+    def _extract_files(self, links: Union[BeautifulSoup, List[str]], base_url: str, file_types: List[str]) -> List[str]:
         """Extract files with validation"""
         valid_files = []
-        seen_this_page = set()
+        file_filter = FileFilter.for_types(file_types)
         
         try:
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link['href']
-                if any(href.lower().endswith(ft.lower()) for ft in file_types):
-                    try:
-                        absolute_url = urljoin(base_url, href)
-                        if (self._is_valid_url(absolute_url) and 
-                            absolute_url not in self.seen_urls and
-                            absolute_url not in seen_this_page):
-                            
-                            self.seen_urls.add(absolute_url)
-                            seen_this_page.add(absolute_url)
-                            valid_files.append(absolute_url)
-                            
-                    except Exception as e:
-                        self.logger.warning(
-                            f"Error processing URL {href}: {e}",
-                            exc_info=self.logger.isEnabledFor(logging.DEBUG)
-                        )
-                        continue
+            for absolute_url in file_filter.filter_links(base_url, self._hrefs(links)):
+                if self.seen_urls.add(absolute_url):
+                    valid_files.append(absolute_url)
 
         except Exception as e:
             raise ParsingError(f"Error extracting files from HTML", e)
 
         return valid_files
 
+    def _extract_pages(self, links: Union[BeautifulSoup, List[str]], base_url: str, file_types: List[str]) -> List[str]:
+        """Extract links to pages inside the crawl scope"""
+        pages = []
+        file_filter = FileFilter.for_types(file_types)
+        for href in self._hrefs(links):
+            if file_filter.matches(href):
+                continue
+            page_url, _ = urldefrag(urljoin(base_url, href))
+            if page_url != base_url and self._is_valid_url(page_url) and self._is_crawlable(page_url):
+                pages.append(page_url)
+        return list(dict.fromkeys(pages))
+
     async def cleanup(self) -> None:
         """Clean up resources"""
+        self.parser.shutdown()
         if self._session and not self._session.closed:
             try:
                 await self._session.close()
@@ -0,0 +1,268 @@
+# src/core/sharding.py
+import dataclasses
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+from ..config import AppConfig
+from ..utils.logging_setup import forward_logging, log_fields
+from ..utils.memory import BoundedList
+from .backends import run_async
+from .download_manager import DownloadManager
+from .pipeline import PipelineSummary, run_pipeline
+from .warmup import WarmupReport
+
+SHARD_BY_HOST = "host"
+SHARD_BY_URL = "url"
+
+STATE_STARTING = "starting"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+def shard_urls(urls: List[str], shards: int, by: str = SHARD_BY_HOST) -> List[List[str]]:
+    """Split start URLs into at most `shards` non-empty groups.
+
+    By host, every URL of a site lands in the same group, so robots.txt,
+    Crawl-delay and per-host limits still see all of its traffic; hosts are
+    placed largest first on the least loaded group. By URL, the URLs are dealt
+    out round-robin.
+    """
+    urls = list(dict.fromkeys(urls))
+    shards = max(1, min(shards, len(urls)))
+    if by == SHARD_BY_URL:
+        groups = [urls[index::shards] for index in range(shards)]
+    elif by == SHARD_BY_HOST:
+        hosts: Dict[str, List[str]] = {}
+        for url in urls:
+            hosts.setdefault((urlsplit(url).hostname or "").lower(), []).append(url)
+        groups = [[] for _ in range(shards)]
+        for host_urls in sorted(hosts.values(), key=len, reverse=True):
+            min(groups, key=len).extend(host_urls)
+    else:
+        raise ValueError(f"Unknown shard key: {by}")
+    return [group for group in groups if group]
+
+def shard_config(config: AppConfig, index: int, shards: int) -> AppConfig:
+    """The configuration of one shard process, with shared budgets divided between the shards"""
+    def divide(rate):
+        return rate / shards if rate else rate
+
+    schedule = [
+        {**entry, **{key: divide(entry[key]) for key in ("global", "per_host")
+                     if key in entry and (key == "global" or config.SHARD_BY == SHARD_BY_URL)}}
+        for entry in config.BANDWIDTH_SCHEDULE
+    ]
+    return dataclasses.replace(
+        config,
+        SHARDS=0,
+        # one parse pool per process; together they should not exceed the cores
+        PARSE_WORKERS=config.PARSE_WORKERS or max(1, (os.cpu_count() or 1) // shards),
+        BANDWIDTH_LIMIT=divide(config.BANDWIDTH_LIMIT),
+        # by host every site is in a single shard, so its limit applies unchanged
+        PER_HOST_BANDWIDTH_LIMIT=(divide(config.PER_HOST_BANDWIDTH_LIMIT) if config.SHARD_BY == SHARD_BY_URL
+                                  else config.PER_HOST_BANDWIDTH_LIMIT),
+        BANDWIDTH_SCHEDULE=schedule,
+        # shards must not append to the same archive or index
+        ARCHIVE_PREFIX=f"{config.ARCHIVE_PREFIX}-shard{index}",
+        MEMORY_BUDGET=config.MEMORY_BUDGET // shards
+    )
+
+def run_shard(
+    index: int,
+    config: AppConfig,
+    urls: List[str],
+    file_types: List[str],
+    output_dir: Path,
+    channel
+) -> None:
+    """Entry point of a shard process: run the pipeline, reporting logs, progress and the summary over channel"""
+    forward_logging(lambda record: channel.put(("log", index, record)), config.LOG_LEVEL,
+                    config.LOG_SAMPLE_LIMIT, config.LOG_SAMPLE_WINDOW)
+    channel.put(("started", index, os.getpid()))
+
+    async def progress(message: str) -> None:
+        channel.put(("progress", index, message))
+
+    try:
+        with log_fields(shard=index):
+            summary = run_async(run_pipeline(config, urls, file_types, output_dir, progress), config.EVENT_LOOP)
+    except BaseException as e:
+        channel.put(("failed", index, f"{type(e).__name__}: {e}"))
+    else:
+        channel.put(("done", index, summary))
+
+@dataclass
+class ShardProgress:
+    index: int
+    urls: int
+    pid: Optional[int] = None
+    state: str = STATE_STARTING
+    downloaded: int = 0
+    skipped: int = 0
+    error: Optional[str] = None
+
+@dataclass
+class ShardedProgress:
+    """Live view of all shards, merged from their progress messages"""
+    shards: List[ShardProgress]
+    last_message: str = ""
+
+    @property
+    def downloaded(self) -> int:
+        return sum(shard.downloaded for shard in self.shards)
+
+    @property
+    def skipped(self) -> int:
+        return sum(shard.skipped for shard in self.shards)
+
+    def format(self) -> str:
+        states = [shard.state for shard in self.shards]
+        return (f"Shards: {states.count(STATE_RUNNING)} running, {states.count(STATE_DONE)} done, "
+                f"{states.count(STATE_FAILED)} failed; downloaded: {self.downloaded}, skipped: {self.skipped}")
+
+def merge_summaries(summaries: List[PipelineSummary], retention: int = 10_000) -> PipelineSummary:
+    """One summary for a sharded job: counts and memory are summed, discovery time is the slowest shard's"""
+    merged = PipelineSummary(shards=len(summaries), errors=BoundedList(retention))
+    for index, summary in enumerate(summaries):
+        for name in ("pages", "failed_pages", "discovered", "downloaded", "skipped", "failed", "mismatched"):
+            setattr(merged, name, getattr(merged, name) + getattr(summary, name))
+        merged.discovery_time = max(merged.discovery_time, summary.discovery_time)
+        merged.total_time = max(merged.total_time, summary.total_time)
+        if summary.warmup:
+            if merged.warmup is None:
+                merged.warmup = WarmupReport()
+            merged.warmup.add(summary.warmup)
+        if summary.peak_memory:
+            merged.peak_memory = (merged.peak_memory or 0) + summary.peak_memory
+        if summary.traced_peak:
+            merged.traced_peak = (merged.traced_peak or 0) + summary.traced_peak
+        if summary.loop_report:
+            report = f"Shard {index}:\n{summary.loop_report}"
+            merged.loop_report = f"{merged.loop_report}\n{report}" if merged.loop_report else report
+        merged.errors.dropped += getattr(summary.errors, "dropped", 0)
+        merged.errors.extend(summary.errors)
+    return merged
+
+class ShardedRunner:
+    """Runs one headless job across several processes, each with its own event loop.
+
+    One asyncio process is limited to a single core for TLS, decompression and
+    parsing. Here the start URLs are split by host or URL over SHARDS worker
+    processes. Each one runs the whole pipeline for its part and sends its log
+    records, download progress and final summary to this coordinator over a
+    multiprocessing queue. The coordinator keeps a merged ShardedProgress and
+    returns one PipelineSummary.
+
+    Shards do not share their seen URLs: a file linked from pages of two
+    shards is fetched by both, so shard by host when sites link to each other.
+    Sharded jobs are not checkpointed.
+    """
+
+    PROGRESS_INTERVAL = 1.0  # seconds between on_progress calls
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+    def run(
+        self,
+        urls: List[str],
+        file_types: List[str],
+        output_dir: Path,
+        on_progress: Optional[Callable[[ShardedProgress], None]] = None
+    ) -> PipelineSummary:
+        start = time.perf_counter()
+        groups = shard_urls(urls, self.config.SHARDS, self.config.SHARD_BY)
+        context = multiprocessing.get_context("spawn")  # no forked copies of loops, sessions or threads
+        channel = context.Queue()
+        progress = ShardedProgress([ShardProgress(index, len(group)) for index, group in enumerate(groups)])
+        summaries: Dict[int, PipelineSummary] = {}
+        processes = [
+            context.Process(
+                target=run_shard,
+                args=(index, shard_config(self.config, index, len(groups)), group, file_types, output_dir, channel),
+                name=f"shard-{index}"
+            )
+            for index, group in enumerate(groups)
+        ]
+        self.logger.info("Running %d urls in %d shards by %s", len(urls), len(groups), self.config.SHARD_BY)
+        for process in processes:
+            process.start()
+
+        last_report = 0.0
+        try:
+            while any(shard.state in (STATE_STARTING, STATE_RUNNING) for shard in progress.shards):
+                try:
+                    kind, index, payload = channel.get(timeout=0.5)
+                except queue.Empty:
+                    self._check_exited(processes, progress)
+                else:
+                    self._handle(kind, progress.shards[index], payload, progress, summaries)
+                if on_progress and time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    on_progress(progress)
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            channel.close()
+        if on_progress:
+            on_progress(progress)
+
+        merged = merge_summaries([summaries.get(index, PipelineSummary()) for index in range(len(groups))],
+                                 self.config.MEMORY_RETENTION)
+        merged.errors.extend(f"shard {shard.index}: {shard.error}"
+                             for shard in progress.shards if shard.state == STATE_FAILED)
+        merged.total_time = time.perf_counter() - start
+        return merged
+
+    def _handle(
+        self,
+        kind: str,
+        shard: ShardProgress,
+        payload,
+        progress: ShardedProgress,
+        summaries: Dict[int, PipelineSummary]
+    ) -> None:
+        if kind == "log":
+            logging.getLogger(payload.name).handle(payload)
+        elif kind == "progress":
+            if DownloadManager.SUCCESS_MESSAGE in payload:
+                shard.downloaded += 1
+            elif DownloadManager.SKIP_MESSAGE in payload:
+                shard.skipped += 1
+            progress.last_message = payload
+        elif kind == "started":
+            shard.pid, shard.state = payload, STATE_RUNNING
+        elif kind == "done":
+            summaries[shard.index] = payload
+            shard.state = STATE_DONE
+        elif kind == "failed":
+            shard.state, shard.error = STATE_FAILED, payload
+            self.logger.error("Shard %d failed: %s", shard.index, payload)
+
+    def _check_exited(self, processes: List[multiprocessing.Process], progress: ShardedProgress) -> None:
+        """Mark shards whose process died without reporting, e.g. killed by the OS"""
+        for process, shard in zip(processes, progress.shards):
+            if shard.state in (STATE_STARTING, STATE_RUNNING) and not process.is_alive():
+                shard.state = STATE_FAILED
+                shard.error = f"process exited with code {process.exitcode}"
+                self.logger.error("Shard %d failed: %s", shard.index, shard.error)
+
+def run_sharded(
+    config: AppConfig,
+    urls: List[str],
+    file_types: List[str],
+    output_dir: Path,
+    on_progress: Optional[Callable[[ShardedProgress], None]] = None
+) -> PipelineSummary:
+    """Run a headless discover-and-download job in SHARDS processes"""
+    return ShardedRunner(config).run(urls, file_types, output_dir, on_progress)
\ No newline at end of file
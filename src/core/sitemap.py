@@ -0,0 +1,133 @@
+# src/core/sitemap.py
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urlsplit
+from xml.etree.ElementTree import XMLPullParser
+
+SITEMAP_SUFFIXES = ('.xml', '.xml.gz', '.txt', '.txt.gz')
+_GZIP_MAGIC = b'\x1f\x8b'
+_INFLATE_STEP = 1024 * 1024  # most bytes inflated per call, so a small gzip chunk cannot balloon
+
+@dataclass
+class SitemapEntry:
+    loc: str
+    is_index: bool = False  # a <sitemap> of a sitemap index rather than a <url>
+    lastmod: Optional[datetime] = None
+
+def is_sitemap_url(url: str) -> bool:
+    """True for URLs like /sitemap.xml, /sitemap_index.xml.gz or /sitemaps/docs-1.xml"""
+    path = urlsplit(url).path.lower()
+    return 'sitemap' in path and path.endswith(SITEMAP_SUFFIXES)
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a W3C datetime such as 2024-01-05 or 2024-01-05T10:00:00Z"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+class SitemapParser:
+    """Incremental parser for XML sitemaps, sitemap indexes and plain-text URL lists.
+
+    Fed the raw body chunk by chunk, gzipped or not; gzip is recognised by its
+    magic bytes since .xml.gz files are usually served without a
+    Content-Encoding. Finished elements are dropped as soon as they are read,
+    so memory stays flat however many URLs the sitemap lists.
+    """
+
+    def __init__(self):
+        self._inflater = None
+        self._started = False
+        self._text: Optional[bool] = None  # plain-text sitemap, one URL per line
+        self._pending = b""  # undecided leading bytes, or the partial last line of a text sitemap
+        self._xml: Optional[XMLPullParser] = None
+        self._root = None
+        self._namespace = ""  # of the root element; image and video extensions use others
+        self._loc: Optional[str] = None
+        self._lastmod: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[SitemapEntry]:
+        """Parse the next chunk of the body and return the entries it completed"""
+        if not self._started:
+            self._pending += chunk
+            if len(self._pending) < 2:
+                return []
+            chunk, self._pending = self._pending, b""
+            self._started = True
+            if chunk.startswith(_GZIP_MAGIC):
+                self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._inflater is None:
+            return self._parse(chunk)
+        entries = []
+        data = chunk
+        while data:
+            entries.extend(self._parse(self._inflater.decompress(data, _INFLATE_STEP)))
+            data = self._inflater.unconsumed_tail
+        return entries
+
+    def close(self) -> List[SitemapEntry]:
+        """Finish parsing; raises xml.etree.ElementTree.ParseError for truncated XML"""
+        entries = []
+        if not self._started and self._pending:
+            self._started = True
+            data, self._pending = self._pending, b""
+            entries.extend(self._parse(data))
+        if self._inflater is not None:
+            entries.extend(self._parse(self._inflater.flush()))
+        if self._text:
+            entries.extend(self._lines(b"", final=True))
+        elif self._xml is not None:
+            self._xml.close()
+            entries.extend(self._events())
+        return entries
+
+    def _parse(self, data: bytes) -> List[SitemapEntry]:
+        if not data:
+            return []
+        if self._text is None:
+            start = data.lstrip()
+            if not start:
+                return []
+            self._text = not start.startswith(b'<')
+            if not self._text:
+                self._xml = XMLPullParser(events=("start", "end"))
+        if self._text:
+            return self._lines(data)
+        self._xml.feed(data)
+        return self._events()
+
+    def _lines(self, data: bytes, final: bool = False) -> List[SitemapEntry]:
+        lines = (self._pending + data).split(b'\n')
+        self._pending = b"" if final else lines.pop()
+        entries = []
+        for line in lines:
+            loc = line.strip().decode('utf-8', errors='replace')
+            if loc.startswith(('http://', 'https://')):
+                entries.append(SitemapEntry(loc, is_index=is_sitemap_url(loc)))
+        return entries
+
+    def _events(self) -> List[SitemapEntry]:
+        entries = []
+        for event, element in self._xml.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                    self._namespace = element.tag[:element.tag.find('}') + 1]
+                continue
+            if not element.tag.startswith(self._namespace):
+                continue
+            tag = element.tag[len(self._namespace):]
+            if tag == "loc":
+                self._loc = (element.text or "").strip()
+            elif tag == "lastmod":
+                self._lastmod = element.text
+            elif tag in ("url", "sitemap"):
+                if self._loc:
+                    entries.append(SitemapEntry(self._loc, tag == "sitemap", parse_lastmod(self._lastmod)))
+                self._loc = self._lastmod = None
+                self._root.clear()
+        return entries
\ No newline at end of file
@@ -0,0 +1,86 @@
+# src/core/transfer.py
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Deque, Optional, Tuple, TypeVar
+import aiohttp
+
+T = TypeVar('T')
+
+def client_timeout(config) -> aiohttp.ClientTimeout:
+    """Session timeout with no overall limit.
+
+    Only connecting is bounded here. Time to first byte, read idle time and
+    throughput are enforced by open_response and iter_body, so a long but
+    steady transfer is never cut off.
+    """
+    return aiohttp.ClientTimeout(
+        total=None,
+        connect=config.CONNECT_TIMEOUT or None,
+        sock_connect=config.CONNECT_TIMEOUT or None,
+        sock_read=None
+    )
+
+async def open_response(request: Awaitable[T], first_byte_timeout: float) -> T:
+    """Await a session request, allowing first_byte_timeout seconds for the response headers"""
+    try:
+        return await asyncio.wait_for(request, first_byte_timeout or None)
+    except asyncio.TimeoutError:
+        raise asyncio.TimeoutError(f"No response within {first_byte_timeout:g}s") from None
+
+class ThroughputMonitor:
+    """Transfer rate over a sliding window of time spent waiting for the network.
+
+    Time spent elsewhere, such as bandwidth throttling or disk writes, is not
+    counted, so a deliberately capped download is not mistaken for a stall.
+    """
+
+    def __init__(self, min_rate: float, window: float):
+        self.min_rate = min_rate
+        self.window = window
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._waited = 0.0
+        self._bytes = 0
+
+    def record(self, count: int, waited: float) -> Optional[float]:
+        """Add a chunk; return the window rate if it is below the floor"""
+        self._samples.append((waited, count))
+        self._waited += waited
+        self._bytes += count
+        while self._samples and self._waited - self._samples[0][0] >= self.window:
+            old_waited, old_count = self._samples.popleft()
+            self._waited -= old_waited
+            self._bytes -= old_count
+        if self.min_rate and self._waited >= self.window:
+            rate = self._bytes / self._waited
+            if rate < self.min_rate:
+                return rate
+        return None
+
+async def iter_body(
+    response: aiohttp.ClientResponse,
+    chunk_size: int,
+    idle_timeout: float,
+    monitor: Optional[ThroughputMonitor] = None
+) -> AsyncIterator[bytes]:
+    """Yield body chunks, raising asyncio.TimeoutError when the transfer stalls.
+
+    A stall is either no data for idle_timeout seconds or a rate below the
+    monitor's floor.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = response.content.iter_chunked(chunk_size).__aiter__()
+    while True:
+        started = loop.time()
+        try:
+            chunk = await asyncio.wait_for(chunks.__anext__(), idle_timeout or None)
+        except StopAsyncIteration:
+            return
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"No data received for {idle_timeout:g}s") from None
+        if monitor:
+            rate = monitor.record(len(chunk), loop.time() - started)
+            if rate is not None:
+                raise asyncio.TimeoutError(
+                    f"Transfer rate {rate:.0f} B/s below the {monitor.min_rate:.0f} B/s minimum"
+                )
+        yield chunk
\ No newline at end of file
@@ -0,0 +1,192 @@
+# src/core/warmup.py
+import asyncio
+import logging
+import socket
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+from aiohttp.abc import AbstractResolver, ResolveResult
+from aiohttp.resolver import DefaultResolver
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# (scheme, host, port): one connection pool of the connector
+Origin = Tuple[str, str, int]
+
+def origin_of(url: str) -> Optional[Origin]:
+    parts = urlsplit(url)
+    if not parts.hostname or parts.scheme not in DEFAULT_PORTS:
+        return None
+    return parts.scheme, parts.hostname.lower(), parts.port or DEFAULT_PORTS[parts.scheme]
+
+class CachingResolver(AbstractResolver):
+    """DNS resolver whose answers can be fetched ahead of the connections that need them.
+
+    Wraps aiohttp's default resolver with a TTL cache; concurrent lookups of
+    one name share a single query. Given to the TCPConnector, so a name
+    prefetched here is answered instantly when a connection is opened.
+    """
+
+    def __init__(self, ttl: float = 300.0, resolver: Optional[AbstractResolver] = None):
+        self.ttl = ttl
+        self._resolver = resolver or DefaultResolver()
+        self._cache: Dict[Tuple[str, int, int], Tuple[float, List[ResolveResult]]] = {}
+        self._pending: Dict[Tuple[str, int, int], asyncio.Future] = {}
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET) -> List[ResolveResult]:
+        key = (host, port, family)
+        cached = self._cache.get(key)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = asyncio.ensure_future(self._resolver.resolve(host, port, family))
+            try:
+                addresses = await pending
+                self._cache[key] = (time.monotonic() + self.ttl, addresses)
+                return addresses
+            finally:
+                del self._pending[key]
+        return await asyncio.shield(pending)
+
+    def cached(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_UNSPEC) -> bool:
+        entry = self._cache.get((host, port, family))
+        return entry is not None and time.monotonic() < entry[0]
+
+    async def close(self) -> None:
+        await self._resolver.close()
+
+@dataclass
+class WarmupReport:
+    """What connection warm-up did in a job, and the first-byte time it is estimated to have saved"""
+    hosts: int = 0
+    resolved: int = 0
+    connections: int = 0
+    failed: int = 0  # hosts that could not be resolved or connected to
+    resolve_time: float = 0.0  # wall time of the concurrent lookups
+    cold_time: float = 0.0  # summed lookup + connect + first byte of the warm-up requests
+    warm_downloads: int = 0  # downloads that could use a pre-opened connection
+    warm_time: float = 0.0  # their summed time to first byte
+    saved: float = 0.0  # estimated seconds of time to first byte saved
+
+    def add(self, other: 'WarmupReport') -> None:
+        for item in fields(self):
+            setattr(self, item.name, getattr(self, item.name) + getattr(other, item.name))
+
+    def format(self) -> str:
+        line = (f"Warm-up: {self.hosts} hosts, {self.resolved} resolved in {self.resolve_time:.2f}s, "
+                f"{self.connections} connections opened, {self.failed} failed")
+        if self.connections and self.warm_downloads:
+            cold = self.cold_time / self.connections * 1000
+            warm = self.warm_time / self.warm_downloads * 1000
+            line += (f"; first byte {cold:.0f} ms cold vs {warm:.0f} ms warm, "
+                     f"about {self.saved:.1f}s saved over {self.warm_downloads} downloads")
+        return line
+
+@dataclass
+class _HostWarmup:
+    lookup: float = 0.0  # seconds the DNS lookup took
+    setup: List[float] = field(default_factory=list)  # lookup + connect + first byte per warm-up request
+    unused: int = 0  # pre-opened connections not yet taken by a download
+
+class ConnectionWarmer:
+    """Resolves the hosts of discovered files and opens keep-alive connections before they are downloaded.
+
+    Without it the first requests to each host pay DNS, TCP and TLS setup in
+    series, right before the transfer. warm() resolves all new hosts
+    concurrently through the CachingResolver, then opens up to `connections`
+    connections per host with concurrent open requests; once released they
+    stay in the connector's keep-alive pool. record_first_byte() compares the
+    time to first byte of the downloads that get those connections with the
+    cold setup time of the host, which gives the reported saving.
+    """
+
+    def __init__(self, connections: int = 2):
+        self.connections = connections
+        self.report = WarmupReport()
+        self.logger = logging.getLogger(__name__)
+        self._hosts: Dict[Origin, _HostWarmup] = {}
+
+    async def warm(
+        self,
+        urls: Iterable[str],
+        open_connection: Callable[[str], Awaitable[Any]],
+        resolver: Optional[CachingResolver] = None
+    ) -> None:
+        """Warm the hosts of urls not warmed before; open_connection(url) makes one request and releases it"""
+        if self.connections <= 0:
+            return
+        targets: Dict[Origin, List[str]] = {}
+        for url in urls:
+            origin = origin_of(url)
+            if origin is None or origin in self._hosts:
+                continue
+            host_urls = targets.setdefault(origin, [])
+            if len(host_urls) < self.connections:
+                host_urls.append(url)
+        if not targets:
+            return
+        for origin in targets:
+            self._hosts[origin] = _HostWarmup()
+        self.report.hosts += len(targets)
+
+        if resolver is not None:
+            start = time.perf_counter()
+            failed = await asyncio.gather(*(self._resolve(resolver, origin) for origin in targets))
+            self.report.resolve_time += time.perf_counter() - start
+            for origin, error in zip(list(targets), failed):
+                if error:
+                    self.logger.info("Could not resolve %s: %s", origin[1], error)
+                    self.report.failed += 1
+                    del targets[origin]
+        await asyncio.gather(*(self._open(origin, host_urls, open_connection) for origin, host_urls in targets.items()))
+
+    async def _resolve(self, resolver: CachingResolver, origin: Origin) -> Optional[Exception]:
+        start = time.perf_counter()
+        try:
+            # the family TCPConnector asks for by default, so its lookup hits this entry
+            await resolver.resolve(origin[1], origin[2], socket.AF_UNSPEC)
+        except (OSError, asyncio.TimeoutError) as e:
+            return e
+        self._hosts[origin].lookup = time.perf_counter() - start
+        self.report.resolved += 1
+        return None
+
+    async def _open(self, origin: Origin, urls: List[str], open_connection: Callable[[str], Awaitable[Any]]) -> None:
+        record = self._hosts[origin]
+
+        async def open_one(url: str) -> bool:
+            start = time.perf_counter()
+            try:
+                await open_connection(url)
+            except Exception as e:
+                self.logger.debug("Warm-up request to %s failed: %s", url, e, extra={"url": url})
+                return False
+            record.setup.append(record.lookup + time.perf_counter() - start)
+            return True
+
+        opened = sum(await asyncio.gather(*(open_one(url) for url in urls)))
+        if not opened:
+            self.report.failed += 1
+        record.unused += opened
+        self.report.connections += opened
+        self.report.cold_time += sum(record.setup)
+
+    def record_first_byte(self, url: str, seconds: float) -> None:
+        """Note a download's time to first byte; the first ones per warmed host count towards the saving"""
+        origin = origin_of(url)
+        record = self._hosts.get(origin) if origin else None
+        if record is None or not record.unused:
+            return
+        record.unused -= 1
+        cold = sum(record.setup) / len(record.setup)
+        self.report.warm_downloads += 1
+        self.report.warm_time += seconds
+        self.report.saved += max(0.0, cold - seconds)
+
+    def reset(self) -> None:
+        """Start a new report; hosts stay warmed while their connections are pooled"""
+        self.report = WarmupReport()
+        for record in self._hosts.values():
+            record.unused = 0
\ No newline at end of file
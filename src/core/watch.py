@@ -0,0 +1,312 @@
+# src/core/watch.py
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from ..config import AppConfig
+from ..utils.exceptions import ContentMismatchError, WebScraperError
+from .browser_manager import BrowserManager
+from .download_manager import DownloadManager
+from .metadata import FileInfo
+from .scraper_service import ScraperService
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    next_poll REAL NOT NULL DEFAULT 0,
+    last_poll REAL,
+    last_change REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER,
+    downloaded INTEGER NOT NULL DEFAULT 0,
+    replace INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, url)
+);
+CREATE INDEX IF NOT EXISTS files_source ON files (source, downloaded);
+"""
+
+# State files written when each file url had one row, under the source that linked it last
+_MIGRATE_FILES = """
+DROP INDEX files_source;
+ALTER TABLE files RENAME TO files_by_url;
+""" + _SCHEMA + """
+INSERT INTO files (source, url, etag, last_modified, size, downloaded, replace)
+    SELECT source, url, etag, last_modified, size, downloaded, replace FROM files_by_url;
+DROP TABLE files_by_url;
+"""
+
+# (etag, last_modified, size) as last seen for a file
+Validators = Tuple[Optional[str], Optional[str], Optional[int]]
+
+@dataclass
+class SourceState:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None  # the page's Last-Modified header
+    next_poll: float = 0.0  # POSIX time
+    last_poll: Optional[float] = None
+    last_change: Optional[float] = None
+    error: Optional[str] = None
+
+@dataclass
+class PollResult:
+    source: str
+    unchanged: bool = False  # the page answered 304 Not Modified
+    new: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    downloaded: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+
+    def format(self) -> str:
+        if self.error:
+            status = f"failed: {self.error}"
+        elif self.unchanged:
+            status = "not modified"
+        else:
+            status = f"{len(self.new)} new, {len(self.changed)} changed"
+        line = f"{self.source}: {status}"
+        if self.downloaded or self.failed:
+            line += f"; {self.downloaded} downloaded, {self.failed} failed"
+        return line
+
+class WatchState:
+    """On-disk per-source poll state and known files for watch mode.
+
+    Files are kept per (source, url), so a file linked from several sources
+    has its own validators and download flag for each of them.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        keys = {row[1]: row[5] for row in self._db.execute("PRAGMA table_info(files)")}
+        if not keys.get("source"):  # keyed on url alone
+            self._db.executescript(_MIGRATE_FILES)
+        self._db.commit()
+
+    def source(self, url: str) -> SourceState:
+        row = self._db.execute(
+            "SELECT etag, last_modified, next_poll, last_poll, last_change, error FROM sources WHERE url = ?", (url,)
+        ).fetchone()
+        return SourceState(url, *row) if row else SourceState(url)
+
+    def save_source(self, state: SourceState) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO sources (url, etag, last_modified, next_poll, last_poll, last_change, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (state.url, state.etag, state.last_modified, state.next_poll, state.last_poll,
+             state.last_change, state.error)
+        )
+        self._db.commit()
+
+    def known_files(self, source: str) -> Dict[str, Validators]:
+        return {url: (etag, modified, size) for url, etag, modified, size in self._db.execute(
+            "SELECT url, etag, last_modified, size FROM files WHERE source = ?", (source,)
+        )}
+
+    def record_files(self, source: str, infos: List[FileInfo], replace: bool) -> None:
+        """Store new or changed files as waiting for download"""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO files (source, url, etag, last_modified, size, downloaded, replace) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?)",
+            [(source, info.url, *validators(info), int(replace)) for info in infos]
+        )
+        self._db.commit()
+
+    def pending_files(self, source: str) -> List[Tuple[str, bool]]:
+        """(url, replace) of files not downloaded yet, including failures of earlier polls"""
+        return [(url, bool(replace)) for url, replace in self._db.execute(
+            "SELECT url, replace FROM files WHERE source = ? AND downloaded = 0", (source,)
+        )]
+
+    def mark_downloaded(self, source: str, url: str) -> None:
+        self._db.execute(
+            "UPDATE files SET downloaded = 1, replace = 0 WHERE source = ? AND url = ?", (source, url)
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def validators(info: FileInfo) -> Validators:
+    modified = info.last_modified.isoformat() if info.last_modified else None
+    return info.etag, modified, info.size
+
+def has_changed(old: Validators, new: Validators) -> bool:
+    """Compare the strongest validator both sides know: ETag, then Last-Modified, then size"""
+    for before, after in zip(old, new):
+        if before is not None and after is not None:
+            return before != after
+    return False
+
+def poll_delay(interval: float, jitter: float) -> float:
+    """interval spread by up to +/- jitter of itself, so sources do not poll in lockstep"""
+    return max(0.0, interval * (1 + random.uniform(-jitter, jitter)))
+
+class SourceWatcher:
+    """Long-running watch mode: polls each source page and downloads only new or changed files.
+
+    Pages are fetched with If-None-Match/If-Modified-Since; a 304 costs one
+    request and changes nothing. For a changed page the files are compared with
+    the ones recorded last time using listing metadata or HEAD requests, and
+    only new or changed files are handed to the DownloadManager. Files whose
+    download failed are retried on the next poll even if the page is unchanged.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        scraper_service: ScraperService,
+        download_manager: DownloadManager,
+        state: WatchState
+    ):
+        self.config = config
+        self.scraper_service = scraper_service
+        self.download_manager = download_manager
+        download_manager.robots = scraper_service.robots  # one Crawl-delay schedule per host
+        self.state = state
+        self.logger = logging.getLogger(__name__)
+        self._downloading = 0
+
+    def interval_for(self, url: str) -> float:
+        return self.config.WATCH_INTERVALS.get(url, self.config.WATCH_INTERVAL)
+
+    async def run(
+        self,
+        urls: List[str],
+        file_types: List[str],
+        output_dir: Path,
+        on_result: Optional[Callable[[PollResult], Awaitable[None]]] = None
+    ) -> None:
+        """Poll every source when it is due, until cancelled"""
+        semaphore = asyncio.Semaphore(max(1, self.config.MAX_CONCURRENT_PAGES))
+
+        async def watch(url: str) -> None:
+            while True:
+                wait = self.state.source(url).next_poll - time.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                async with semaphore:
+                    result = await self.poll(url, file_types, output_dir)
+                if on_result:
+                    await on_result(result)
+
+        self.logger.info("Watching %d sources", len(urls))
+        await asyncio.gather(*(watch(url) for url in dict.fromkeys(urls)))
+
+    async def poll(self, url: str, file_types: List[str], output_dir: Path) -> PollResult:
+        """Check one source now and download its new or changed files"""
+        source = self.state.source(url)
+        result = PollResult(url)
+        try:
+            page = await self.scraper_service.fetch_if_changed(url, file_types, source.etag, source.last_modified)
+        except WebScraperError as e:
+            self.logger.warning("Polling %s failed: %s", url, e, extra={"url": url})
+            result.error = source.error = str(e)
+        else:
+            source.error = None
+            if page is None:
+                result.unchanged = True
+            else:
+                source.etag, source.last_modified = page.etag, page.last_modified
+                await self._compare(url, page.files, result)
+                if result.new or result.changed:
+                    source.last_change = time.time()
+
+        await self._download_pending(url, output_dir, result)
+        source.last_poll = time.time()
+        source.next_poll = source.last_poll + poll_delay(self.interval_for(url), self.config.WATCH_JITTER)
+        self.state.save_source(source)
+        self.logger.info("%s", result.format(), extra={"url": url})
+        return result
+
+    async def _compare(self, source: str, files: List[str], result: PollResult) -> None:
+        infos: Dict[str, FileInfo] = {}
+        missing = []
+        for file_url in files:
+            # Directory listings already gave size and date; no HEAD request needed
+            info = self.scraper_service.take_file_info(file_url)
+            if info:
+                infos[file_url] = info
+            else:
+                missing.append(file_url)
+        if missing:
+            fetched = await self.download_manager.prefetch_metadata(missing, refresh=True)
+            infos.update((file_url, fetched.get(file_url) or FileInfo(file_url)) for file_url in missing)
+
+        known = self.state.known_files(source)
+        new, changed = [], []
+        for file_url in files:
+            info = infos[file_url]
+            old = known.get(file_url)
+            if old is None:
+                new.append(info)
+            elif has_changed(old, validators(info)):
+                changed.append(info)
+        self.state.record_files(source, new, replace=False)
+        self.state.record_files(source, changed, replace=True)
+        result.new = [info.url for info in new]
+        result.changed = [info.url for info in changed]
+
+    async def _download_pending(self, source: str, output_dir: Path, result: PollResult) -> None:
+        pending = self.state.pending_files(source)
+        if not pending:
+            return
+        self._downloading += 1
+        try:
+            self.download_manager.reset_output_scan()
+            for file_url, replace in pending:
+                try:
+                    await self.download_manager.download_file(file_url, output_dir, replace=replace)
+                except ContentMismatchError:
+                    self.state.mark_downloaded(source, file_url)  # not the wanted file type; do not retry
+                    continue
+                except Exception as e:
+                    result.failed += 1
+                    self.logger.error("Error downloading file %s: %s", file_url, e, extra={"url": file_url})
+                    continue
+                self.state.mark_downloaded(source, file_url)
+                result.downloaded += 1
+        finally:
+            self._downloading -= 1
+            if not self._downloading:
+                # Archives are only complete once closed; later polls start new ones
+                await self.download_manager.close_archive()
+
+async def run_watch(
+    config: AppConfig,
+    urls: List[str],
+    file_types: List[str],
+    output_dir: Path,
+    on_result: Optional[Callable[[PollResult], Awaitable[None]]] = None
+) -> None:
+    """Watch the sources with freshly created services until cancelled"""
+    browser_manager = BrowserManager(config)
+    with WatchState(config.WATCH_STATE_FILE) as state:
+        async with ScraperService(config, browser_manager) as scraper_service, \
+                   DownloadManager(config) as download_manager:
+            await SourceWatcher(config, scraper_service, download_manager, state).run(
+                urls, file_types, output_dir, on_result
+            )
\ No newline at end of file
@@ -1,8 +1,27 @@
 import argparse
 import logging
+import multiprocessing
+from pathlib import Path
 from src.config import AppConfig
+from src.core.backends import LOOP_ASYNCIO, LOOP_UVLOOP, TRANSPORT_AIOHTTP, TRANSPORT_HTTPX, run_async
+from src.core.file_filter import parse_file_types
+from src.core.frontier import CrawlFrontier
+from src.core.pipeline import run_pipeline
+from src.core.scraper_service import ScraperService
+from src.core.sharding import SHARD_BY_HOST, SHARD_BY_URL, ShardedProgress, run_sharded
+from src.core.watch import PollResult, run_watch
+from src.core.download_manager import DownloadManager
 from src.ui.scraper_gui import start_gui
 from src.utils.logging_setup import setup_logging
+from src.utils.profiling import PROFILE_CPROFILE, PROFILE_SAMPLING, RunProfiler
+from src.utils.settings_manager import load_settings
+from src.utils.url_utils import parse_url_list
+
+# Coroutines timed per call in --profile runs
+PROFILED_COROUTINES = {
+    ScraperService: ("fetch_many", "_fetch_links", "_read_page", "_parse_links"),
+    DownloadManager: ("download_files", "download_file", "_transfer", "fetch_metadata")
+}
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Web Scraper")
@@ -12,19 +31,171 @@ def parse_args():
     parser.add_argument('-v', '--verbose', help="Verbose output",
                        action="store_const", dest="loglevel",
                        const=logging.INFO, default=None)
+    parser.add_argument('--headless', help="Discover and download without the GUI",
+                       action="store_true")
+    parser.add_argument('-u', '--url', help="Page to search (repeatable, headless mode)",
+                       action="append", dest="urls", default=[])
+    parser.add_argument('-o', '--output', help="Output directory (headless mode)")
+    parser.add_argument('-t', '--file-type', help="File type or group such as documents/archives (repeatable, headless mode)",
+                       action="append", dest="file_types", default=[])
+    parser.add_argument('--depth', help="Crawl pages linked under the start URLs up to this depth",
+                       type=int, default=None)
+    parser.add_argument('--job', help="Checkpoint the headless job to this file so it can be resumed")
+    parser.add_argument('--resume', help="Resume the headless job checkpointed in this file")
+    parser.add_argument('--shards', help="Split the headless job across this many worker processes",
+                       type=int, default=None)
+    parser.add_argument('--shard-by', help="Keep each host in one shard, or spread the start URLs evenly",
+                       choices=[SHARD_BY_HOST, SHARD_BY_URL], default=None)
+    parser.add_argument('--watch', help="Keep polling the pages and download only new or changed files (headless mode)",
+                       action="store_true")
+    parser.add_argument('--watch-interval', help="Seconds between polls of each page in --watch mode",
+                       type=float, default=None)
+    parser.add_argument('--robots', help="Obey robots.txt Disallow rules while discovering and Crawl-delay for all requests",
+                       action="store_true")
+    parser.add_argument('--sitemaps', help="Also search the sitemaps listed in each site's robots.txt",
+                       action="store_true")
+    parser.add_argument('--layout', help="Output layout: flat, host subdirectories, mirrored URL paths or hash fan-out",
+                       choices=["flat", "host", "mirror", "hash"], default=None)
+    parser.add_argument('--output-mode', help="Write files individually or into rolling tar/zip archives",
+                       choices=["files", "tar", "zip"], default=None)
+    parser.add_argument('--limit-rate', help="Overall download bandwidth cap in MB/s",
+                       type=float, default=None)
+    parser.add_argument('--limit-rate-per-host', help="Per-host download bandwidth cap in MB/s",
+                       type=float, default=None)
+    parser.add_argument('--transport', help="HTTP client: aiohttp (HTTP/1.1) or httpx (HTTP/2 when h2 is installed)",
+                       choices=[TRANSPORT_AIOHTTP, TRANSPORT_HTTPX], default=None)
+    parser.add_argument('--event-loop', help="Event loop implementation; uvloop must be installed",
+                       choices=[LOOP_ASYNCIO, LOOP_UVLOOP], default=None)
+    parser.add_argument('--warmup-connections', help="Connections to open per discovered host before downloading, 0 = off",
+                       type=int, default=None)
+    parser.add_argument('--log-format', help="Log as plain text or as JSON lines with job and url fields",
+                       choices=["text", "json"])
+    parser.add_argument('--monitor-loop', help="Report event loop lag and the stacks of calls that block it",
+                       action="store_true")
+    parser.add_argument('--profile', help="Profile the run with cProfile (default) or a low-overhead sampler",
+                       nargs="?", const=PROFILE_CPROFILE, choices=[PROFILE_CPROFILE, PROFILE_SAMPLING], default=None)
+    parser.add_argument('--profile-dir', help="Directory for --profile reports",
+                       default="profiles")
     return parser.parse_args()
 
+def watch_headless(config: AppConfig, args) -> None:
+    settings = load_settings(config.SETTINGS_FILE)
+    urls = parse_url_list(" ".join(args.urls) or settings["last_url"])
+    file_types = parse_file_types(",".join(args.file_types) or settings["last_file_type"])
+    output_dir = Path(args.output or settings["last_output_directory"] or ".")
+
+    async def report(result: PollResult) -> None:
+        print(result.format(), flush=True)
+
+    try:
+        run_async(run_watch(config, urls, file_types, output_dir, report), config.EVENT_LOOP)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+def run_headless(config: AppConfig, args) -> None:
+    if args.watch:
+        watch_headless(config, args)
+        return
+    if config.SHARDS > 1 and (args.job or args.resume):
+        raise SystemExit("Sharded jobs cannot be checkpointed; drop --job/--resume or --shards")
+    if args.depth is not None:
+        config.CRAWL_MAX_DEPTH = args.depth
+
+    frontier = None
+    if args.resume:
+        frontier = CrawlFrontier(Path(args.resume), config.CHECKPOINT_INTERVAL)
+        job = frontier.load_job()
+        if not job:
+            frontier.close()
+            raise SystemExit(f"No resumable job found in {args.resume}")
+        urls, file_types, output_dir = job["urls"], job["file_types"], Path(job["output_dir"])
+        config.CRAWL_MAX_DEPTH = job["max_depth"]
+    else:
+        settings = load_settings(config.SETTINGS_FILE)
+        urls = parse_url_list(" ".join(args.urls) or settings["last_url"])
+        file_types = parse_file_types(",".join(args.file_types) or settings["last_file_type"])
+        output_dir = Path(args.output or settings["last_output_directory"] or ".")
+        if args.job:
+            frontier = CrawlFrontier(Path(args.job), config.CHECKPOINT_INTERVAL)
+            frontier.save_job({
+                "urls": urls,
+                "file_types": file_types,
+                "output_dir": str(output_dir),
+                "max_depth": config.CRAWL_MAX_DEPTH
+            })
+
+    if config.SHARDS > 1:
+        def report(progress: ShardedProgress) -> None:
+            print(progress.format(), flush=True)
+
+        print(run_sharded(config, urls, file_types, output_dir, report).format())
+        return
+
+    try:
+        summary = run_async(run_pipeline(config, urls, file_types, output_dir, frontier=frontier), config.EVENT_LOOP)
+    finally:
+        if frontier:
+            frontier.close()
+    print(summary.format())
+
+def run(config: AppConfig, args) -> None:
+    if args.headless:
+        run_headless(config, args)
+    else:
+        start_gui(config)
+
 def main():
     args = parse_args()
     config = AppConfig.load_from_file()
     config.update_log_level(args.loglevel)
+    if args.layout:
+        config.OUTPUT_LAYOUT = args.layout
+    if args.robots:
+        config.ROBOTS_TXT = True
+    if args.sitemaps:
+        config.SITEMAP_DISCOVERY = True
+    if args.shards is not None:
+        config.SHARDS = args.shards
+    if args.shard_by:
+        config.SHARD_BY = args.shard_by
+    if args.watch_interval is not None:
+        config.WATCH_INTERVAL = args.watch_interval
+    if args.transport:
+        config.HTTP_TRANSPORT = args.transport
+    if args.event_loop:
+        config.EVENT_LOOP = args.event_loop
+    if args.warmup_connections is not None:
+        config.WARMUP_CONNECTIONS = args.warmup_connections
+    if args.log_format:
+        config.LOG_FORMAT = args.log_format
+    if args.monitor_loop:
+        config.LOOP_MONITOR = True
+    if args.output_mode:
+        config.OUTPUT_MODE = args.output_mode
+    if args.limit_rate is not None:
+        config.BANDWIDTH_LIMIT = args.limit_rate * 1024 * 1024
+    if args.limit_rate_per_host is not None:
+        config.PER_HOST_BANDWIDTH_LIMIT = args.limit_rate_per_host * 1024 * 1024
     setup_logging(config)
+    if args.profile and args.headless and not args.watch and config.SHARDS > 1:
+        # The shards run in their own processes, out of the profiler's sight
+        raise SystemExit("Sharded jobs cannot be profiled; drop --profile or --shards")
     
     try:
-        start_gui(config)
+        if args.profile:
+            profiler = RunProfiler(Path(args.profile_dir), "headless" if args.headless else "gui",
+                                   args.profile, PROFILED_COROUTINES)
+            try:
+                with profiler:
+                    run(config, args)
+            finally:
+                print("Profile written to:\n" + "\n".join(f"  {path}" for path in profiler.written))
+        else:
+            run(config, args)
     except Exception as e:
         logging.error(f"Application error: {e}", exc_info=True)
         raise
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # parse worker processes in frozen Windows builds
     main()
\ No newline at end of file
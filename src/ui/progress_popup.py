@@ -1,8 +1,12 @@
 # src/ui/progress_popup.py
 import asyncio
 import logging
+import time
+from collections import deque
 from dataclasses import dataclass
+from typing import Optional
 import PySimpleGUI as sg
+from ..core.metadata import format_size
 
 @dataclass
 class ProgressState:
@@ -13,11 +17,25 @@ class ProgressState:
     total: int = 0
 
 class ProgressPopup:
-    def __init__(self, total: int, success_message: str, skip_message: str):
+    def __init__(
+        self,
+        total: int,
+        success_message: str,
+        skip_message: str,
+        total_bytes: Optional[int] = None,
+        max_log_lines: int = 10_000
+    ):
         self.total = total
         self.current = 0
         self.success_message = success_message
         self.skip_message = skip_message
+        self.total_bytes = total_bytes
+        self.bytes_done = 0
+        self.started = time.monotonic()
+        self._last_bytes_refresh = 0.0
+        self.max_log_lines = max_log_lines
+        self._log_lines = deque(maxlen=max_log_lines or None)
+        self._printed = 0
         self.logger = logging.getLogger(__name__)
         self.window = self._create_window()
         self.progress_bar = self.window["-PROGRESS-"]
@@ -35,6 +53,7 @@ class ProgressPopup:
                     size=(40, 20),
                     key="-PROGRESS-"
                 )],
+                [sg.Text("", key="-BYTES-", size=(50, 1))],
                 [sg.Multiline(
                     "", 
                     size=(60, 15),
@@ -68,8 +87,7 @@ class ProgressPopup:
                 self.current += 1
                 self.progress_bar.update_bar(self.current, self.total)
             
-            # Print all messages
-            self.log.print(message)
+            self._print_log(message)
             
             # Process events
             event, _ = self.window.read(timeout=1)
@@ -89,6 +107,45 @@ class ProgressPopup:
             self.logger.error(f"Error updating progress: {e}")
             self.close()
 
+    def _print_log(self, message: str) -> None:
+        """Append to the log, trimming it to the last max_log_lines lines now and then"""
+        self._log_lines.append(message)
+        self._printed += 1
+        if self.max_log_lines and self._printed > 2 * self.max_log_lines:
+            self.log.update("\n".join(self._log_lines) + "\n")
+            self._printed = len(self._log_lines)
+        else:
+            self.log.print(message)
+
+    def update_bytes(self, count: int, skipped: bool = False) -> None:
+        """Track transferred bytes and show throughput and ETA"""
+        if self.closed:
+            return
+        if skipped:
+            if self.total_bytes is not None:
+                self.total_bytes = max(0, self.total_bytes - count)
+        else:
+            self.bytes_done += count
+
+        now = time.monotonic()
+        if now - self._last_bytes_refresh < 0.5:
+            return
+        self._last_bytes_refresh = now
+        try:
+            self.window["-BYTES-"].update(self._bytes_text(now - self.started))
+        except Exception as e:
+            self.logger.error(f"Error updating byte progress: {e}")
+
+    def _bytes_text(self, elapsed: float) -> str:
+        rate = self.bytes_done / elapsed if elapsed > 0 else 0
+        text = f"{format_size(self.bytes_done)}"
+        if self.total_bytes is not None:
+            text += f" of {format_size(self.total_bytes)}"
+            if rate > 0:
+                remaining = max(0, self.total_bytes - self.bytes_done) / rate
+                text += f", ETA {int(remaining // 60)}:{int(remaining % 60):02d}"
+        return text + f" ({format_size(int(rate))}/s)"
+
     async def wait_for_close(self) -> None:
         """Wait until the user clicks the close button"""
         while not self.closed:
@@ -116,10 +173,16 @@ class ProgressPopup:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-def create_progress_popup(total: int, success_message: str, skip_message: str) -> ProgressPopup:
+def create_progress_popup(
+    total: int,
+    success_message: str,
+    skip_message: str,
+    total_bytes: Optional[int] = None,
+    max_log_lines: int = 10_000
+) -> ProgressPopup:
     """Factory function to create progress popup"""
     try:
-        return ProgressPopup(total, success_message, skip_message)
+        return ProgressPopup(total, success_message, skip_message, total_bytes, max_log_lines)
     except Exception as e:
         logging.error(f"Failed to create progress popup: {e}")
         raise
\ No newline at end of file
@@ -1,98 +1,307 @@
 import asyncio
 import logging
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import PySimpleGUI as sg
-from selenium.webdriver.common.by import By
 from ..config import AppConfig
+from ..core.backends import run_async
 from ..core.browser_manager import BrowserManager
 from ..core.scraper_service import ScraperService
 from ..core.download_manager import DownloadManager
+from ..core.metadata import FileInfo
+from ..core.results_store import COLUMNS, ResultStore
+from ..core.file_filter import parse_file_types
+from ..core.watch import PollResult, SourceWatcher, WatchState
 from ..utils.settings_manager import save_settings, load_settings
+from ..utils.url_utils import parse_url_list
 from ..utils.exceptions import log_and_raise, BrowserError, ScraperError, DownloaderError
+from ..utils.loop_monitor import LoopLagMonitor
 from .progress_popup import create_progress_popup
 
 class WebScraperGUI:
+    ORDER_CHOICES = {
+        "As listed": DownloadManager.ORDER_LISTED,
+        "Smallest first": DownloadManager.ORDER_SMALLEST,
+        "Largest first": DownloadManager.ORDER_LARGEST
+    }
+
     def __init__(self, config: AppConfig):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.browser_manager = BrowserManager(config)
         self.scraper_service = ScraperService(config, self.browser_manager)
         self.download_manager = DownloadManager(config)
+        self.download_manager.robots = self.scraper_service.robots  # one Crawl-delay schedule per host
         self.settings = load_settings(self.config.SETTINGS_FILE)
         self.window: Optional[sg.Window] = None
-        self.files: List[str] = []
+        self.results = ResultStore()
+        self.page_start = 0
+        self._search_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._metadata_tasks: List[asyncio.Task] = []
+        self._rows_dirty = False
+        self._last_refresh = 0.0
 
     def create_layout(self) -> list:
         return [
-            [sg.Text("Enter URL:"), 
-             sg.InputText(self.settings.get("last_url", ""), key="-URL-", expand_x=True)],
+            [sg.Text("Enter URL(s):"), 
+             sg.Multiline(self.settings.get("last_url", ""), key="-URL-", size=(60, 3), expand_x=True)],
             [sg.Text("Select Output Folder:"), 
              sg.Input(self.settings.get("last_output_directory", ""), key="-OUTPUT-"), 
              sg.FolderBrowse()],
             [sg.Text("File Type:"), 
              sg.InputText(self.settings.get("last_file_type", ".pdf"), key="-FILETYPE-")],
-            [sg.Button("Search")],
-            [sg.Text("Files Found:")],
+            [sg.Button("Search"), sg.Button("Watch", key="-WATCH-")],
+            [sg.Text("Files Found:", key="-STATUS-", expand_x=True)],
             [sg.Column([
                 [sg.Table(
                     values=[], 
-                    headings=["File Name"], 
+                    headings=["File Name", "Size", "Type", "Modified", "Source Page"], 
                     auto_size_columns=False,
                     justification="left",
                     key="-FILELIST-",
                     enable_events=True,
+                    enable_click_events=True,
                     expand_x=True,
                     expand_y=True,
                     right_click_menu=["", ["Show in Browser"]]
                 )]
             ], expand_x=True, expand_y=True)],
-            [sg.Button("Download Selected")]
+            [sg.Button("<", key="-PREV-"),
+             sg.Text("", key="-PAGE-", size=(24, 1)),
+             sg.Button(">", key="-NEXT-"),
+             sg.Text("Filter name:"),
+             sg.Input("", key="-FILTER-", size=(20, 1), enable_events=True),
+             sg.Text("Type:"),
+             sg.Combo([""], default_value="", key="-TYPEFILTER-", size=(8, 1), readonly=True, enable_events=True),
+             sg.Text("Source:"),
+             sg.Combo([""], default_value="", key="-SOURCEFILTER-", size=(40, 1), readonly=True, enable_events=True)],
+            [sg.Button("Download Selected"),
+             sg.Checkbox("All matching rows", key="-ALLROWS-"),
+             sg.Text("Order:"),
+             sg.Combo(list(self.ORDER_CHOICES), default_value="As listed", key="-ORDER-", readonly=True),
+             sg.Text("Size KB min/max:"),
+             sg.Input("", key="-MINSIZE-", size=(8, 1)),
+             sg.Input("", key="-MAXSIZE-", size=(8, 1)),
+             sg.Text("Modified after (YYYY-MM-DD):"),
+             sg.Input("", key="-MODIFIED-", size=(11, 1))]
         ]
 
+    def _refresh_rows(self, keep_selection: bool = True) -> None:
+        """Render only the current page of the results table"""
+        table = self.window["-FILELIST-"]
+        page_size = max(1, self.config.RESULTS_PAGE_SIZE)
+        visible = len(self.results)
+        self.page_start = min(self.page_start, max(0, (visible - 1) // page_size * page_size))
+        rows = self.results.page(self.page_start, page_size)
+        selected = [i for i in (getattr(table, "SelectedRows", None) or []) if i < len(rows)] if keep_selection else []
+        table.update(values=rows, select_rows=selected)
+        end = self.page_start + len(rows)
+        shown = f"{self.page_start + 1}-{end}" if rows else "0"
+        matching = f" ({self.results.total} total)" if visible != self.results.total else ""
+        self.window["-PAGE-"].update(f"Rows {shown} of {visible}{matching}")
+        self._rows_dirty = False
+        self._last_refresh = time.monotonic()
+
+    def _on_metadata(self, info: FileInfo) -> None:
+        self.results.set_info(info)
+        self._rows_dirty = True
+
+    def _append_files(self, batch: List[Tuple[str, str]]) -> None:
+        """Append a batch of search results and prefetch their metadata"""
+        suffixes, sources = len(self.results.suffixes), len(self.results.source_pages)
+        page_filled = len(self.results) >= self.page_start + self.config.RESULTS_PAGE_SIZE
+        for file_url, page_url in batch:
+            # Directory listings already gave size and date; no HEAD request needed
+            info = self.scraper_service.take_file_info(file_url)
+            if info:
+                self.download_manager.metadata[file_url] = info
+            self.results.add(file_url, page_url, info)
+        if len(self.results.suffixes) != suffixes or len(self.results.source_pages) != sources:
+            self._update_filter_choices()
+        # Rows are appended after a page that was already full, so it only needs a new row count
+        if self.results.sort_key is not None or not page_filled:
+            self._refresh_rows()
+        else:
+            self._rows_dirty = True
+        self.window["-STATUS-"].update(f"Files Found: {self.results.total} (searching...)")
+        self.window.refresh()
+        self._metadata_tasks.append(asyncio.create_task(
+            self.download_manager.prefetch_metadata(
+                [file_url for file_url, _ in batch],
+                self._on_metadata
+            )
+        ))
+
+    def _update_filter_choices(self) -> None:
+        # Setting new choices clears the combo, so the active filter is put back
+        self.window["-TYPEFILTER-"].update(value=self.results.type_filter, values=[""] + sorted(self.results.suffixes))
+        self.window["-SOURCEFILTER-"].update(value=self.results.source_filter, values=[""] + self.results.source_pages)
+
+    def handle_table_event(self, event: tuple) -> None:
+        """Sort by a column when its heading is clicked; a second click reverses the order"""
+        _, kind, (row, column) = event
+        if kind != "+CLICKED+" or row != -1 or column is None or column < 0:
+            return
+        key = COLUMNS[column]
+        descending = self.results.sort_key == key and not self.results.descending
+        self.results.sort(key, descending)
+        self.page_start = 0
+        self._refresh_rows(keep_selection=False)
+
+    def handle_filter(self, values: Dict[str, Any]) -> None:
+        self.results.set_filter(values.get("-FILTER-", ""), values.get("-TYPEFILTER-", ""),
+                                values.get("-SOURCEFILTER-", ""))
+        self.page_start = 0
+        self._refresh_rows(keep_selection=False)
+
+    def handle_page(self, step: int) -> None:
+        page_size = max(1, self.config.RESULTS_PAGE_SIZE)
+        start = self.page_start + step * page_size
+        if 0 <= start < len(self.results):
+            self.page_start = start
+            self._refresh_rows(keep_selection=False)
+
+    def _selected_urls(self, values: Dict[str, Any]) -> List[str]:
+        """URLs of the selected rows on the current page, or of every matching row"""
+        if values.get("-ALLROWS-"):
+            return self.results.visible_urls()
+        visible = len(self.results)
+        positions = (self.page_start + i for i in values.get("-FILELIST-") or [])
+        return [self.results.url_at(position) for position in positions if position < visible]
+
+    def _busy(self) -> bool:
+        """Whether background tasks are running, which then get the event loop more often"""
+        # Finished metadata prefetches are dropped so the list does not grow over a session
+        self._metadata_tasks = [task for task in self._metadata_tasks if not task.done()]
+        return bool(self._metadata_tasks) or any(
+            task is not None and not task.done() for task in (self._search_task, self._watch_task)
+        )
+
+    def _cancel_metadata_tasks(self) -> None:
+        for task in self._metadata_tasks:
+            if not task.done():
+                task.cancel()
+        self._metadata_tasks = []
+
+    def _download_options(self, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse ordering and filter options, or None after reporting bad input"""
+        try:
+            min_size = values.get("-MINSIZE-", "").strip()
+            max_size = values.get("-MAXSIZE-", "").strip()
+            modified = values.get("-MODIFIED-", "").strip()
+            return {
+                "order": self.ORDER_CHOICES.get(values.get("-ORDER-"), DownloadManager.ORDER_LISTED),
+                "min_size": int(float(min_size) * 1024) if min_size else None,
+                "max_size": int(float(max_size) * 1024) if max_size else None,
+                "modified_after": datetime.strptime(modified, "%Y-%m-%d") if modified else None
+            }
+        except ValueError as e:
+            sg.popup_error(f"Invalid download filter: {e}")
+            return None
+
     async def handle_search(self, values: Dict[str, Any]) -> None:
-        url = values["-URL-"]
+        urls = parse_url_list(values["-URL-"])
         file_type = values["-FILETYPE-"]
+        if not urls:
+            sg.popup_error("Please enter at least one URL.")
+            return
+
+        self._cancel_metadata_tasks()
+        self.results.clear()
+        self.results.set_filter(values.get("-FILTER-", ""), values.get("-TYPEFILTER-", ""),
+                                values.get("-SOURCEFILTER-", ""))
+        self.page_start = 0
+        failed_pages = []
 
         try:
             self.window["-FILELIST-"].update([["Searching..."]])
-            self.files = await self.scraper_service.fetch_files(url, [file_type])
-            
-            if not self.files:
+            self.window["-STATUS-"].update(f"Files Found: searching {len(urls)} page(s)...")
+            async for batch in self.scraper_service.iter_file_batches(
+                urls, parse_file_types(file_type), lambda page_url, error: failed_pages.append(page_url)
+            ):
+                self._append_files(batch)
+
+            self._refresh_rows()
+            self.window["-STATUS-"].update(f"Files Found: {self.results.total}")
+            if failed_pages:
+                sg.popup_error(f"Could not search {len(failed_pages)} of {len(urls)} pages:\n" +
+                               "\n".join(failed_pages))
+
+            if not self.results.total:
                 self.window["-FILELIST-"].update([["No files found."]])
                 return
 
-            file_data = [[Path(f).name] for f in self.files]
-            self.window["-FILELIST-"].update(file_data)
-
+        # Runs as a background task, so errors are reported here; a re-raise would go unseen
         except ScraperError as e:
-            log_and_raise(self.logger, f"Scraping error: {e}", ScraperError, e)
+            self.logger.error("Scraping error: %s", e, exc_info=True)
             sg.popup_error(f"Error during search: {str(e)}")
             self.window["-FILELIST-"].update([["Error occurred"]])
         except Exception as e:
-            log_and_raise(self.logger, f"Unexpected error during search: {e}", Exception, e)
+            self.logger.error("Unexpected error during search: %s", e, exc_info=True)
             sg.popup_error(f"An unexpected error occurred: {str(e)}")
             self.window["-FILELIST-"].update([["Error occurred"]])
 
+    def _on_watch_result(self, result: PollResult) -> None:
+        self.window["-STATUS-"].update(f"Watching: {result.format()} ({datetime.now():%H:%M})")
+
+    async def handle_watch(self, values: Dict[str, Any]) -> None:
+        """Poll the entered pages until cancelled, downloading new or changed files to the output folder"""
+        urls = parse_url_list(values["-URL-"])
+        if not urls or not values["-OUTPUT-"]:
+            sg.popup_error("Please enter at least one URL and an output folder.")
+            return
+
+        async def report(result: PollResult) -> None:
+            self._on_watch_result(result)
+
+        state = WatchState(self.config.WATCH_STATE_FILE)
+        self.window["-WATCH-"].update("Stop Watching")
+        self.window["-STATUS-"].update(f"Watching {len(urls)} page(s)...")
+        try:
+            watcher = SourceWatcher(self.config, self.scraper_service, self.download_manager, state)
+            await watcher.run(urls, parse_file_types(values["-FILETYPE-"]), Path(values["-OUTPUT-"]), report)
+        except Exception as e:
+            self.logger.error("Watch mode stopped: %s", e, exc_info=True)
+            sg.popup_error(f"Watch mode stopped: {str(e)}")
+        finally:
+            state.close()
+            if self.window:
+                self.window["-WATCH-"].update("Watch")
+
     async def handle_download(self, values: Dict[str, Any]) -> None:
-        selected_indices = values["-FILELIST-"]
-        if not selected_indices:
+        selected_files = self._selected_urls(values)
+        if not selected_files:
             sg.popup_error("Please select at least one file.")
             return
 
         output_dir = Path(values["-OUTPUT-"])
-        selected_files = [self.files[i] for i in selected_indices]
+        options = self._download_options(values)
+        if options is None:
+            return
+        order = options.pop("order")
+        selected_files = self.download_manager.order_files(
+            self.download_manager.filter_files(selected_files, **options), order
+        )
+        if not selected_files:
+            sg.popup_error("Please select at least one file.")
+            return
         
         try:
             progress = create_progress_popup(
                 len(selected_files),
                 self.download_manager.SUCCESS_MESSAGE,
-                self.download_manager.SKIP_MESSAGE
+                self.download_manager.SKIP_MESSAGE,
+                self.download_manager.total_bytes(selected_files),
+                self.config.MEMORY_RETENTION
             )
             await self.download_manager.download_files(
                 selected_files, 
                 output_dir,
-                progress.update
+                progress.update,
+                progress.update_bytes
             )
             await progress.wait_for_close()
 
@@ -104,17 +313,16 @@ class WebScraperGUI:
             sg.popup_error(f"An unexpected error occurred: {str(e)}")
 
     async def handle_show_in_browser(self, values: Dict[str, Any]) -> None:
-        selected_indices = values["-FILELIST-"]
-        if not selected_indices:
+        selected = self._selected_urls({"-FILELIST-": values.get("-FILELIST-")})
+        if not selected:
             return
             
-        selected_file = self.files[selected_indices[0]]
+        selected_file = selected[0]
+        source_url = self.results.source_of(selected_file) or parse_url_list(values["-URL-"])[0]
         
         try:
-            driver = self.browser_manager.get_driver()
-            driver.get(values["-URL-"])
-            element = driver.find_element(By.PARTIAL_LINK_TEXT, Path(selected_file).name)
-            driver.execute_script("arguments[0].style.border='3px solid red'", element)
+            if not self.browser_manager.show_link(source_url, selected_file):
+                sg.popup(f"No link to {Path(selected_file).name} found on {source_url}")
         except BrowserError as e:
             log_and_raise(self.logger, f"Browser error: {e}", BrowserError, e)
             sg.popup_error(f"Browser error: {str(e)}")
@@ -126,6 +334,9 @@ class WebScraperGUI:
 
     async def run(self) -> None:
         await self.download_manager.ensure_session()
+        monitor = LoopLagMonitor(threshold=self.config.LOOP_LAG_THRESHOLD) if self.config.LOOP_MONITOR else None
+        if monitor:
+            monitor.start()
         
         self.window = sg.Window(
             'Web Scraper', 
@@ -136,18 +347,31 @@ class WebScraperGUI:
 
         try:
             while True:
-                event, values = self.window.read(timeout=100)
+                busy = self._busy()
+                event, values = self.window.read(timeout=10 if busy else 100)
+                await asyncio.sleep(0)
+                # Metadata arrives in bursts; re-render the page a few times per second at most
+                if self._rows_dirty and time.monotonic() - self._last_refresh > 0.25:
+                    self._refresh_rows()
                 
                 if event == sg.WIN_CLOSED:
                     save_settings(self.config.SETTINGS_FILE, {
-                        "last_url": self.window["-URL-"].get(),
+                        "last_url": self.window["-URL-"].get().strip(),
                         "last_output_directory": self.window["-OUTPUT-"].get(),
                         "last_file_type": self.window["-FILETYPE-"].get()
                     })
                     break
                 
                 elif event == "Search":
-                    await self.handle_search(values)
+                    if self._search_task and not self._search_task.done():
+                        self._search_task.cancel()
+                    self._search_task = asyncio.create_task(self.handle_search(values))
+
+                elif event == "-WATCH-":
+                    if self._watch_task and not self._watch_task.done():
+                        self._watch_task.cancel()
+                    else:
+                        self._watch_task = asyncio.create_task(self.handle_watch(values))
                     
                 elif event == "Download Selected":
                     await self.handle_download(values)
@@ -155,15 +379,33 @@ class WebScraperGUI:
                 elif event == "Show in Browser":
                     await self.handle_show_in_browser(values)
 
+                elif isinstance(event, tuple) and event[0] == "-FILELIST-":
+                    self.handle_table_event(event)
+
+                elif event in ("-FILTER-", "-TYPEFILTER-", "-SOURCEFILTER-"):
+                    self.handle_filter(values)
+
+                elif event in ("-PREV-", "-NEXT-"):
+                    self.handle_page(-1 if event == "-PREV-" else 1)
+
         except Exception as e:
             self.logger.error(f"Fatal error in GUI: {e}", exc_info=True)
             sg.popup_error(f"A fatal error occurred: {str(e)}")
         finally:
+            if self._search_task and not self._search_task.done():
+                self._search_task.cancel()
+            if self._watch_task and not self._watch_task.done():
+                self._watch_task.cancel()
+                await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._cancel_metadata_tasks()
             await self.download_manager.cleanup()
             self.browser_manager.cleanup()
             if self.window:
                 self.window.close()
+            if monitor:
+                await monitor.stop()
+                self.logger.warning(monitor.format())
 
 def start_gui(config: AppConfig) -> None:
     gui = WebScraperGUI(config)
-    asyncio.run(gui.run())
\ No newline at end of file
+    run_async(gui.run(), config.EVENT_LOOP)
\ No newline at end of file
@@ -1,5 +1,6 @@
 # src/utils/__init__.py
 from .settings_manager import Settings, SettingsManager, save_settings, load_settings
 from .logging_setup import setup_logging
+from .url_utils import parse_url_list
 
-__all__ = ['Settings', 'SettingsManager', 'save_settings', 'load_settings', 'setup_logging']
\ No newline at end of file
+__all__ = ['Settings', 'SettingsManager', 'save_settings', 'load_settings', 'setup_logging', 'parse_url_list']
\ No newline at end of file
@@ -23,6 +23,10 @@ class ParsingError(ScraperError):
     """Raised when HTML parsing fails"""
     pass
 
+class PageTooLargeError(ScraperError):
+    """Raised when a page exceeds MAX_PAGE_BYTES; not retried"""
+    pass
+
 class DownloaderError(WebScraperError):
     """Raised when download fails"""
     pass
@@ -31,6 +35,10 @@ class DownloadTimeout(DownloaderError):
     """Raised when download times out"""
     pass
 
+class ContentMismatchError(DownloaderError):
+    """Raised when a response is not the file type its URL promises; not retried"""
+    pass
+
 class BrowserError(WebScraperError):
     """Raised when browser operations fail"""
     pass
@@ -1,43 +1,219 @@
 # src/utils/logging_setup.py
+import atexit
+import json
 import os
 import platform
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from ..config import AppConfig
+from .memory import BoundedDict
+
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_JSON = "json"
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+JSON_FIELDS = ("job", "shard", "url")  # record attributes copied into JSON lines when set
+
+_fields: ContextVar[Dict[str, Any]] = ContextVar("log_fields", default={})
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_sampler: Optional['SamplingFilter'] = None
+
+@contextmanager
+def log_fields(**fields: Any) -> Iterator[None]:
+    """Attach fields such as job to every record logged in this context, including tasks it starts"""
+    token = _fields.set({**_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+class SamplingFilter(logging.Filter):
+    """Rate-limits repetitive INFO and DEBUG records before they are queued.
+
+    Records are grouped by logger and unformatted message template, so
+    logger.info("%s already exists", name) for 100k files is one group. Each
+    group passes limit records per window seconds; the rest are dropped before
+    any formatting and counted. The next record of the group to pass, or
+    flush(), reports how many were dropped. Warnings and errors always pass.
+    Only the max_groups most recently seen templates are tracked.
+    """
+
+    def __init__(self, limit: int = 20, window: float = 10.0, max_groups: int = 1000):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.suppressed_total = 0
+        self._groups = BoundedDict(max_groups)  # (logger, template) -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _fields.get()
+        for name, value in fields.items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        if self.limit <= 0 or record.levelno > logging.INFO or getattr(record, "unsampled", False):
+            return True
+        now = time.monotonic()
+        with self._lock:
+            key = (record.name, record.msg)
+            try:
+                group = self._groups[key]
+            except KeyError:
+                group = self._groups[key] = [now, 0, 0]
+            if now - group[0] >= self.window:
+                group[0], group[1] = now, 0
+            if group[1] >= self.limit:
+                group[2] += 1
+                self.suppressed_total += 1
+                return False
+            group[1] += 1
+            suppressed, group[2] = group[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+    def flush(self) -> None:
+        """Log the counts of records dropped since their group last passed"""
+        with self._lock:
+            pending = [(key, group[2]) for key, group in self._groups.items() if group[2]]
+            for key, _ in pending:
+                self._groups.get(key)[2] = 0
+        for (name, template), count in pending:
+            logging.getLogger(name).info("Suppressed %d similar messages: %s", count, template,
+                                         extra={"unsampled": True})
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, with the JSON_FIELDS attached via log_fields() or extra="""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in JSON_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render tracebacks while they still hold their values at the
+        # time of the call; the line itself is formatted on the listener thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class ForwardingHandler(_QueueHandler):
+    """Hands prepared, picklable records to send, e.g. to pass them to another process"""
+
+    def __init__(self, send: Callable[[logging.LogRecord], None]):
+        super().__init__(None)
+        self.send = send
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.send(record)
+
+def forward_logging(
+    send: Callable[[logging.LogRecord], None],
+    level: int = logging.WARNING,
+    sample_limit: int = 20,
+    sample_window: float = 10.0
+) -> ForwardingHandler:
+    """Route this process's root logger to send instead of its own files"""
+    handler = ForwardingHandler(send)
+    handler.addFilter(SamplingFilter(sample_limit, sample_window))
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    return handler
+
+def create_queue_logging(
+    handlers: List[logging.Handler],
+    sample_limit: int = 20,
+    sample_window: float = 10.0
+) -> Tuple[QueueHandler, QueueListener, SamplingFilter]:
+    """A queue handler for the root logger and a started listener writing to handlers"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    sampler = SamplingFilter(sample_limit, sample_window)
+    queue_handler.addFilter(sampler)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return queue_handler, listener, sampler
+
+def stop_logging() -> None:
+    """Report sampled-out records and wait for the background writer to drain"""
+    global _listener, _queue_handler, _sampler
+    if _sampler is not None:
+        _sampler.flush()
+        _sampler = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 # src/utils/logging_setup.py
 def setup_logging(config: AppConfig) -> None:
-    """Initialize logging with performance monitoring"""
+    """Initialize logging with a background writer thread"""
+    global _listener, _queue_handler, _sampler
     try:
         log_dir = config.LOG_DIR
         log_dir.mkdir(parents=True, exist_ok=True)
-        
+
         handlers = [
             RotatingFileHandler(
-                filename=log_dir / "webscraper.log",
+                filename=log_dir / ("webscraper.jsonl" if config.LOG_FORMAT == LOG_FORMAT_JSON else "webscraper.log"),
                 maxBytes=5*1024*1024,
                 backupCount=3,
                 encoding='utf-8'
             ),
             logging.StreamHandler()
         ]
-        
+
         for handler in handlers:
-            handler.setFormatter(logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            ))
-            
+            if config.LOG_FORMAT == LOG_FORMAT_JSON:
+                handler.setFormatter(JsonLinesFormatter())
+            else:
+                handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        stop_logging()
+        _queue_handler, _listener, _sampler = create_queue_logging(
+            handlers, config.LOG_SAMPLE_LIMIT, config.LOG_SAMPLE_WINDOW
+        )
+        atexit.register(stop_logging)
         logging.basicConfig(
             level=config.LOG_LEVEL,
-            handlers=handlers
+            handlers=[_queue_handler]
         )
-        
+
         # Log system info
-        logging.info(f"Python version: {platform.python_version()}")
-        logging.info(f"Operating system: {platform.system()} {platform.version()}")
-        logging.info(f"CPU count: {os.cpu_count()}")
-        
+        logging.info("Python version: %s", platform.python_version())
+        logging.info("Operating system: %s %s", platform.system(), platform.version())
+        logging.info("CPU count: %s", os.cpu_count())
+
     except Exception as e:
         print(f"Failed to setup logging: {e}")
         logging.basicConfig(level=logging.WARNING)
\ No newline at end of file
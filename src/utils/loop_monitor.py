@@ -0,0 +1,142 @@
+# src/utils/loop_monitor.py
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Upper bucket bounds in milliseconds; the last bucket holds everything above
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+class LagHistogram:
+    """Fixed-bucket histogram of event loop lag"""
+
+    def __init__(self, bounds_ms=LAG_BUCKETS_MS):
+        self.bounds = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, lag: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, lag * 1000)] += 1
+        self.samples += 1
+        self.total += lag
+        self.max = max(self.max, lag)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound in ms of the bucket holding the given fraction of samples"""
+        if not self.samples:
+            return 0.0
+        target = fraction * self.samples
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.bounds[index] if index < len(self.bounds) else self.max * 1000
+        return self.max * 1000
+
+    def format(self) -> str:
+        mean = self.total / self.samples * 1000 if self.samples else 0.0
+        lines = [f"Event loop lag: {self.samples} samples, mean {mean:.1f} ms, "
+                 f"p50 <= {self.percentile(0.5):g} ms, p99 <= {self.percentile(0.99):g} ms, max {self.max * 1000:.0f} ms"]
+        lower = 0
+        for bound, count in zip(self.bounds + (None,), self.counts):
+            if count:
+                label = f"{lower}-{bound} ms" if bound is not None else f">{lower} ms"
+                lines.append(f"  {label:>14}: {count}")
+            lower = bound
+        return "\n".join(lines)
+
+@dataclass
+class BlockingReport:
+    stack: str  # where the loop thread was when the stall was caught
+    count: int = 1
+    longest: float = 0.0  # seconds
+
+class LoopLagMonitor:
+    """Opt-in watchdog for calls that block the asyncio event loop.
+
+    A heartbeat task sleeps for interval and records how late it wakes up. A
+    watchdog thread checks the heartbeat; when the loop has not run it for
+    threshold seconds it captures the loop thread's stack, which points at the
+    blocking call. Stalls with the same stack are counted together.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_reports: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_reports = max_reports
+        self.histogram = LagHistogram()
+        self.reports: Dict[str, BlockingReport] = {}
+        self.logger = logging.getLogger(__name__)
+        self._beat = 0.0
+        self._stall: Optional[BlockingReport] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start monitoring the running loop; call from a coroutine"""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.histogram.record(lag)
+            self._beat = time.monotonic()
+            stall = self._stall
+            if stall is not None:
+                stall.longest = max(stall.longest, lag)
+                self._stall = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            blocked = time.monotonic() - self._beat - self.interval
+            if blocked < self.threshold or self._stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=15))
+            report = self.reports.get(stack)
+            if report is not None:
+                report.count += 1
+            elif len(self.reports) < self.max_reports:
+                report = self.reports[stack] = BlockingReport(stack)
+                self.logger.warning(f"Event loop blocked for over {blocked * 1000:.0f} ms at:\n{stack}")
+            else:
+                report = BlockingReport(stack)  # counted in the histogram only
+            report.longest = max(report.longest, blocked)
+            self._stall = report
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def format(self) -> str:
+        lines = [self.histogram.format()]
+        reports: List[BlockingReport] = sorted(self.reports.values(), key=lambda r: -r.longest)
+        for report in reports:
+            lines.append(f"Blocked {report.count}x, longest {report.longest * 1000:.0f} ms, at:")
+            lines.append(report.stack.rstrip())
+        return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,125 @@
+# src/utils/memory.py
+import os
+import sys
+import tracemalloc
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if it cannot be read"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+def peak_rss_bytes() -> Optional[int]:
+    """Highest resident set size this process reached so far"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+class MemoryGauge:
+    """Samples RSS, plus Python allocations when tracing with tracemalloc.
+
+    Tracing costs noticeable CPU time, so it is opt-in. sample() is cheap and
+    meant to be called once per batch, not per file.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.peak_rss = 0
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.sample()
+
+    def sample(self) -> Optional[int]:
+        """Read the current RSS and update the peak"""
+        rss = rss_bytes()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def snapshot(self) -> Dict[str, Optional[int]]:
+        rss = self.sample()
+        stats: Dict[str, Optional[int]] = {"rss": rss, "peak_rss": max(self.peak_rss, peak_rss_bytes() or 0) or None}
+        if tracemalloc.is_tracing():
+            stats["traced"], stats["traced_peak"] = tracemalloc.get_traced_memory()
+        return stats
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+class BoundedList(deque):
+    """List-like log that keeps the last maxlen items and counts the dropped ones"""
+
+    def __init__(self, maxlen: int, items: Iterable[Any] = ()):
+        super().__init__((), maxlen=maxlen if maxlen > 0 else None)
+        self.dropped = 0
+        self.extend(items)
+
+    def append(self, item: Any) -> None:
+        if self.maxlen is not None and len(self) == self.maxlen:
+            self.dropped += 1
+        super().append(item)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, list):
+            return list(self) == other
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        # deque's own pickling passes maxlen positionally, which __init__ would take as items
+        return type(self), (self.maxlen or 0, list(self)), {"dropped": self.dropped}
+
+class BoundedDict(OrderedDict):
+    """Dict that evicts the least recently set or read entry beyond maxsize (0 = unbounded)"""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if self.maxsize and len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def __getitem__(self, key: Any) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
\ No newline at end of file
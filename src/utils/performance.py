@@ -1,8 +1,79 @@
 # src/utils/performance.py
+import inspect
 import time
 import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Iterable, Iterator, List, Optional
+
+@dataclass
+class Timing:
+    calls: int = 0
+    failures: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+class TimingStats:
+    """Call counts and wall time per coroutine, collected by timed()"""
+
+    def __init__(self):
+        self.timings: Dict[str, Timing] = {}
+
+    def record(self, name: str, elapsed: float, failed: bool = False) -> None:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.calls += 1
+        timing.failures += failed
+        timing.total += elapsed
+        timing.max = max(timing.max, elapsed)
+
+    def clear(self) -> None:
+        self.timings.clear()
+
+    def format(self) -> str:
+        lines = [f"{'coroutine':<40} {'calls':>8} {'failed':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9}"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: -item[1].total):
+            mean = timing.total / timing.calls * 1000 if timing.calls else 0.0
+            lines.append(f"{name:<40} {timing.calls:>8} {timing.failures:>7} {timing.total:>9.2f} "
+                         f"{mean:>9.1f} {timing.max * 1000:>9.1f}")
+        return "\n".join(lines)
+
+timing_stats = TimingStats()
+
+def timed(func: Callable, stats: TimingStats = timing_stats, name: Optional[str] = None) -> Callable:
+    """Wrap a coroutine function to record its wall time in stats, without logging"""
+    name = name or func.__qualname__
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException:
+            stats.record(name, time.perf_counter() - start, failed=True)
+            raise
+        stats.record(name, time.perf_counter() - start)
+        return result
+    return wrapper
+
+@contextmanager
+def instrument(targets: Dict[type, Iterable[str]], stats: TimingStats = timing_stats) -> Iterator[List[str]]:
+    """Time the named coroutine methods of each class while the context is open"""
+    patched = []
+    try:
+        for cls, names in targets.items():
+            for name in names:
+                method = cls.__dict__.get(name)
+                if not inspect.iscoroutinefunction(method):
+                    continue
+                setattr(cls, name, timed(method, stats, f"{cls.__name__}.{name}"))
+                patched.append((cls, name, method))
+        yield [f"{cls.__name__}.{name}" for cls, name, _ in patched]
+    finally:
+        for cls, name, method in reversed(patched):
+            setattr(cls, name, method)
 
 def measure_performance(func: Callable) -> Callable:
     @wraps(func)
@@ -12,9 +83,11 @@ def measure_performance(func: Callable) -> Callable:
             result = await func(*args, **kwargs)
             elapsed = time.perf_counter() - start
             logging.debug(f"{func.__name__} completed in {elapsed:.2f}s")
+            timing_stats.record(func.__qualname__, elapsed)
             return result
         except Exception as e:
             elapsed = time.perf_counter() - start
             logging.error(f"{func.__name__} failed after {elapsed:.2f}s: {e}")
+            timing_stats.record(func.__qualname__, elapsed, failed=True)
             raise
     return wrapper
\ No newline at end of file
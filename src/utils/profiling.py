@@ -0,0 +1,151 @@
+# src/utils/profiling.py
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Dict, Iterable, List, Optional, Tuple
+from .performance import TimingStats, instrument
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILE_CPROFILE = "cprofile"
+PROFILE_SAMPLING = "sampling"
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a background thread.
+
+    Counts are kept per distinct stack and written in the collapsed format
+    ("outer;inner;leaf count") read by flamegraph.pl, speedscope and inferno.
+    Overhead is one stack walk per sample, independent of how many calls are made.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._stack(frame)] += 1
+                self.samples += 1
+
+    def _stack(self, frame: Optional[FrameType]) -> Tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                # ';' separates frames in the collapsed format
+                f.write(";".join(label.replace(";", ":") for label in stack) + f" {count}\n")
+
+class RunProfiler:
+    """Profiles one run and writes its reports to output_dir.
+
+    cprofile mode writes <name>.pstats and a text summary; sampling mode skips
+    cProfile's per-call overhead and, when pyinstrument is installed, writes its
+    HTML report. Both write <name>.collapsed from a stack sampler, and with
+    coroutine targets a <name>-timings.txt of per-coroutine wall time.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        name: str,
+        mode: str = PROFILE_CPROFILE,
+        targets: Optional[Dict[type, Iterable[str]]] = None,
+        interval: float = 0.005
+    ):
+        if mode not in (PROFILE_CPROFILE, PROFILE_SAMPLING):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.base = output_dir / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.targets = targets or {}
+        self.sampler = StackSampler(interval)
+        self.timings = TimingStats()
+        self.written: List[Path] = []
+        self.logger = logging.getLogger(__name__)
+        self._profile: Optional[cProfile.Profile] = None
+        self._pyinstrument = None
+        self._instrument = None
+
+    def __enter__(self) -> 'RunProfiler':
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._instrument = instrument(self.targets, self.timings)
+        self._instrument.__enter__()
+        self.sampler.start()
+        if self.mode == PROFILE_CPROFILE:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif pyinstrument is not None:
+            self._pyinstrument = pyinstrument.Profiler(async_mode="enabled")
+            self._pyinstrument.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        if self._pyinstrument is not None:
+            self._pyinstrument.stop()
+        self.sampler.stop()
+        self._instrument.__exit__(exc_type, exc_val, exc_tb)
+        try:
+            self._write_reports()
+        except OSError as e:
+            self.logger.error(f"Failed to write profile to {self.output_dir}: {e}")
+
+    def _write_reports(self) -> None:
+        if self._profile is not None:
+            stats_path = self.base.with_suffix(".pstats")
+            self._profile.dump_stats(stats_path)
+            summary = io.StringIO()
+            pstats.Stats(self._profile, stream=summary).sort_stats("cumulative").print_stats(50)
+            self._write(self.base.with_suffix(".txt"), summary.getvalue())
+            self.written.insert(0, stats_path)
+        if self._pyinstrument is not None:
+            self._write(self.base.with_suffix(".html"), self._pyinstrument.output_html())
+        collapsed_path = self.base.with_suffix(".collapsed")
+        self.sampler.write_collapsed(collapsed_path)
+        self.written.append(collapsed_path)
+        if self.timings.timings:
+            self._write(self.base.parent / f"{self.base.name}-timings.txt", self.timings.format() + "\n")
+
+    def _write(self, path: Path, text: str) -> None:
+        path.write_text(text, encoding='utf-8')
+        self.written.append(path)
\ No newline at end of file
@@ -0,0 +1,204 @@
+# src/utils/url_store.py
+import math
+from array import array
+from hashlib import blake2b
+from typing import Iterable, List, Set
+from .url_utils import canonicalize_url
+
+class URLStore:
+    """Set-like store of canonicalized URLs"""
+
+    def add(self, url: str) -> bool:
+        """Add url and return True if it was not seen before"""
+        return self._add_key(canonicalize_url(url))
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        return self._contains_key(canonicalize_url(url))
+
+    def _add_key(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def _contains_key(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+class CanonicalURLSet(URLStore):
+    """Exact store keeping full canonical URL strings"""
+
+    def __init__(self):
+        self._keys: Set[str] = set()
+
+    def _add_key(self, key: str) -> bool:
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def _contains_key(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._keys = set()
+
+class DigestURLSet(URLStore):
+    """Open-addressing hash set of 64-bit URL digests in a flat array (~12-16 bytes per URL).
+
+    Two different URLs share a digest with probability about n^2 / 2^65, i.e. roughly
+    one in 370,000 jobs at 10M URLs.
+    """
+    _MAX_LOAD = 0.7
+
+    def __init__(self, capacity: int = 1024):
+        self.initial_capacity = capacity
+        self._count = 0
+        self._slots = self._empty_slots(capacity)
+
+    @staticmethod
+    def _empty_slots(capacity: int) -> array:
+        size = 1 << max(4, math.ceil(math.log2(max(1, capacity) / DigestURLSet._MAX_LOAD)))
+        return array('Q', bytes(8 * size))
+
+    @staticmethod
+    def _digest(key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+    def _find(self, slots: array, digest: int) -> int:
+        mask = len(slots) - 1
+        index = digest & mask
+        while slots[index] and slots[index] != digest:
+            index = (index + 1) & mask
+        return index
+
+    def _add_key(self, key: str) -> bool:
+        digest = self._digest(key)
+        index = self._find(self._slots, digest)
+        if self._slots[index]:
+            return False
+        self._slots[index] = digest
+        self._count += 1
+        if self._count > len(self._slots) * self._MAX_LOAD:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        slots = self._empty_slots(len(self._slots))
+        for digest in self._slots:
+            if digest:
+                slots[self._find(slots, digest)] = digest
+        self._slots = slots
+
+    def _contains_key(self, key: str) -> bool:
+        return bool(self._slots[self._find(self._slots, self._digest(key))])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        self._count = 0
+        self._slots = self._empty_slots(self.initial_capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return self._slots.itemsize * len(self._slots)
+
+class DigestKeySet(DigestURLSet):
+    """DigestURLSet for plain string keys such as relative file paths, without URL canonicalization"""
+
+    def add(self, key: str) -> bool:
+        return self._add_key(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self._contains_key(key)
+
+class BloomURLFilter(URLStore):
+    """Scalable Bloom filter: no false negatives, false positives at about error_rate.
+
+    A false positive makes a new URL look already seen, so it is skipped. When the
+    filter fills up a larger one is chained with a tighter error rate so the overall
+    rate stays close to the target.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.initial_capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self._count = 0
+        self._filters: List[_BloomLayer] = []
+        self.clear()
+
+    def _add_key(self, key: str) -> bool:
+        hashes = self._hashes(key)
+        if any(layer.contains(hashes) for layer in self._filters):
+            return False
+        layer = self._filters[-1]
+        if layer.count >= layer.capacity:
+            layer = _BloomLayer(layer.capacity * 2, layer.error_rate / 2)
+            self._filters.append(layer)
+        layer.add(hashes)
+        self._count += 1
+        return True
+
+    def _contains_key(self, key: str) -> bool:
+        hashes = self._hashes(key)
+        return any(layer.contains(hashes) for layer in self._filters)
+
+    @staticmethod
+    def _hashes(key: str) -> tuple:
+        digest = blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        self._count = 0
+        # The first layer gets half the budget, later layers the rest (geometric series)
+        self._filters = [_BloomLayer(self.initial_capacity, self.error_rate / 2)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(layer.bits) for layer in self._filters)
+
+class _BloomLayer:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        bits = max(64, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.size = bits
+        self.hash_count = max(1, round(bits / capacity * math.log(2)))
+        self.bits = bytearray((bits + 7) // 8)
+
+    def _positions(self, hashes: tuple) -> Iterable[int]:
+        first, second = hashes
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, hashes: tuple) -> None:
+        for position in self._positions(hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def contains(self, hashes: tuple) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(hashes))
+
+def create_url_store(kind: str = "digest", capacity: int = 1_000_000, error_rate: float = 0.001) -> URLStore:
+    """Create a seen-URL store of the given kind: set, digest or bloom"""
+    if kind == "set":
+        return CanonicalURLSet()
+    if kind == "bloom":
+        return BloomURLFilter(capacity, error_rate)
+    if kind == "digest":
+        return DigestURLSet()
+    raise ValueError(f"Unknown URL store type: {kind}")
\ No newline at end of file
@@ -0,0 +1,50 @@
+# src/utils/url_utils.py
+import re
+from typing import List
+from urllib.parse import urlsplit, urlunsplit
+
+# Commas and semicolons are legal inside URLs (";jsessionid=", "?id=1,2"), so they
+# only separate URLs where the next one starts with a scheme
+_URL_SEPARATORS = re.compile(r'\s+|[,;]\s*(?=https?://)', re.IGNORECASE)
+
+def parse_url_list(text: str) -> List[str]:
+    """Split a pasted block of URLs into a de-duplicated list, keeping order"""
+    urls = []
+    seen = set()
+    for part in _URL_SEPARATORS.split(text or ""):
+        url = part.strip().rstrip(',;')
+        if url and url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+_PERCENT_ESCAPE = re.compile(r'%[0-9a-fA-F]{2}')
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL for duplicate detection.
+
+    Lowercases scheme and host, drops default ports and the fragment, sorts query
+    parameters and uppercases percent escapes. Only meant for comparing URLs; the
+    result is not guaranteed to address the same resource on every server.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').rstrip('.')
+        port = parts.port
+    except ValueError:
+        return url
+    netloc = f"[{host}]" if ':' in host else host
+    if parts.username or parts.password:
+        userinfo = parts.username or ''
+        if parts.password:
+            userinfo += f":{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc += f":{port}"
+    path = _PERCENT_ESCAPE.sub(lambda m: m.group(0).upper(), parts.path) or '/'
+    query = '&'.join(sorted(parts.query.split('&'))) if parts.query else ''
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+__all__ = ['parse_url_list', 'canonicalize_url']
\ No newline at end of file
@@ -0,0 +1,108 @@
+# tests/test_archive_writer.py
+import asyncio
+import json
+import tarfile
+import zipfile
+import pytest
+from src.core.archive_writer import ArchiveWriter
+
+async def add_member(writer, name, data):
+    buffer = writer.new_buffer()
+    buffer.write(data)
+    return await writer.add(name, buffer, f"http://test.com/{name}")
+
+class TestArchiveWriter:
+    @pytest.mark.asyncio
+    async def test_tar_members_and_index(self, tmp_path):
+        writer = ArchiveWriter(tmp_path, "tar")
+        await writer.start()
+        entry = await add_member(writer, "a.pdf", b"%PDF-a")
+        await add_member(writer, "b.pdf", b"%PDF-bb")
+        await writer.close()
+
+        assert entry["archive"] == "files-00001.tar"
+        with tarfile.open(tmp_path / "files-00001.tar") as tar:
+            assert tar.getnames() == ["a.pdf", "b.pdf"]
+            assert tar.extractfile("b.pdf").read() == b"%PDF-bb"
+        with open(tmp_path / "files-00001.tar", "rb") as f:
+            f.seek(entry["offset"])
+            assert f.read(entry["size"]) == b"%PDF-a"
+        index = [json.loads(line) for line in (tmp_path / "files-index.jsonl").read_text().splitlines()]
+        assert [row["name"] for row in index] == ["a.pdf", "b.pdf"]
+        assert index[1]["url"] == "http://test.com/b.pdf"
+
+    @pytest.mark.asyncio
+    async def test_rolls_over_at_max_bytes(self, tmp_path):
+        writer = ArchiveWriter(tmp_path, "zip", max_bytes=3000)
+        await writer.start()
+        entries = [await add_member(writer, f"{i}.bin", bytes(1000)) for i in range(5)]
+        await writer.close()
+
+        archives = sorted({entry["archive"] for entry in entries})
+        assert len(archives) > 1
+        names = []
+        for archive in archives:
+            assert (tmp_path / archive).stat().st_size <= 3000 + 1000
+            with zipfile.ZipFile(tmp_path / archive) as zf:
+                assert zf.testzip() is None
+                names.extend(zf.namelist())
+        assert names == [f"{i}.bin" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_reopen_keeps_index_and_numbers(self, tmp_path):
+        writer = ArchiveWriter(tmp_path, "tar")
+        await writer.start()
+        await add_member(writer, "a.pdf", b"a")
+        await writer.close()
+
+        writer = ArchiveWriter(tmp_path, "tar")
+        await writer.start()
+        assert "a.pdf" in writer
+        assert not writer.reserve("a.pdf")
+        assert writer.reserve("b.pdf")
+        assert not writer.reserve("b.pdf")
+        entry = await add_member(writer, "b.pdf", b"b")
+        await writer.close()
+        assert entry["archive"] == "files-00002.tar"
+
+    @pytest.mark.asyncio
+    async def test_index_entries_past_the_archive_end_are_dropped(self, tmp_path):
+        writer = ArchiveWriter(tmp_path, "tar")
+        await writer.start()
+        await add_member(writer, "a.pdf", b"a" * 600)
+        entry = await add_member(writer, "b.pdf", b"b" * 600)
+        await writer.close()
+        # As after a crash that lost the tail of the archive but not the index
+        with open(tmp_path / "files-00001.tar", "r+b") as f:
+            f.truncate(entry["offset"] + 10)
+
+        writer = ArchiveWriter(tmp_path, "tar")
+        await writer.start()
+        assert "a.pdf" in writer
+        assert writer.reserve("b.pdf")
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_members_queued_after_close_are_refused(self, tmp_path):
+        writer = ArchiveWriter(tmp_path, "tar")
+        await writer.start()
+        futures = []
+        for item in ["a.pdf", None, "b.pdf"]:
+            if item is None:
+                writer._queue.put_nowait(None)
+                continue
+            buffer = writer.new_buffer()
+            buffer.write(b"data")
+            futures.append(asyncio.get_running_loop().create_future())
+            writer._queue.put_nowait((item, buffer, "", futures[-1]))
+        await writer.close()
+
+        assert futures[0].result()["name"] == "a.pdf"
+        with pytest.raises(RuntimeError):
+            futures[1].result()
+        with tarfile.open(tmp_path / "files-00001.tar") as tar:
+            assert tar.getnames() == ["a.pdf"]
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            ArchiveWriter(tmp_path, "rar")
\ No newline at end of file
@@ -0,0 +1,82 @@
+# tests/test_autoindex.py
+from datetime import datetime
+import pytest
+from src.core.autoindex import APACHE, LIGHTTPD, NGINX, ListingEntry, detect_listing, parse_listing
+
+APACHE_PAGE = b'''<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">
+<html>
+ <head>
+  <title>Index of /pub</title>
+ </head>
+ <body>
+<h1>Index of /pub</h1>
+  <table>
+   <tr><th valign="top"><img src="/icons/blank.gif" alt="[ICO]"></th><th><a href="?C=N;O=D">Name</a></th><th><a href="?C=M;O=A">Last modified</a></th><th><a href="?C=S;O=A">Size</a></th><th><a href="?C=D;O=A">Description</a></th></tr>
+   <tr><th colspan="5"><hr></th></tr>
+<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]"></td><td><a href="/">Parent Directory</a></td><td>&nbsp;</td><td align="right">  - </td><td>&nbsp;</td></tr>
+<tr><td valign="top"><img src="/icons/folder.gif" alt="[DIR]"></td><td><a href="sub/">sub/</a></td><td align="right">2023-01-05 10:22  </td><td align="right">  - </td><td>&nbsp;</td></tr>
+<tr><td valign="top"><img src="/icons/layout.gif" alt="[   ]"></td><td><a href="a%20b.pdf">a b.pdf</a></td><td align="right">2023-01-06 11:00  </td><td align="right">1.5M</td><td>&nbsp;</td></tr>
+   <tr><th colspan="5"><hr></th></tr>
+</table>
+<address>Apache/2.4.41 (Ubuntu) Server at x Port 80</address>
+</body></html>'''
+NGINX_PAGE = b'''<html>
+<head><title>Index of /files/</title></head>
+<body>
+<h1>Index of /files/</h1><hr><pre><a href="../">../</a>
+<a href="docs/">docs/</a>                                              05-Jan-2023 10:22                   -
+<a href="r&amp;d.pdf">r&amp;d.pdf</a>                                 06-Jan-2023 11:00              123456
+</pre><hr></body>
+</html>'''
+LIGHTTPD_PAGE = b'''<?xml version="1.0" encoding="utf-8"?>
+<html><head><title>Index of /dl/</title></head><body>
+<h2>Index of /dl/</h2>
+<div class="list">
+<table summary="Directory Listing" cellpadding="0" cellspacing="0">
+<thead><tr><th class="n">Name</th><th class="m">Last Modified</th><th class="s">Size</th><th class="t">Type</th></tr></thead>
+<tbody>
+<tr class="d"><td class="n"><a href="../">..</a>/</td><td class="m">&nbsp;</td><td class="s">- &nbsp;</td><td class="t">Directory</td></tr>
+<tr class="d"><td class="n"><a href="x/">x</a>/</td><td class="m">2023-Jan-05 10:22:33</td><td class="s">- &nbsp;</td><td class="t">Directory</td></tr>
+<tr><td class="n"><a href="f.pdf">f.pdf</a></td><td class="m">2023-Jan-06 11:00:01</td><td class="s">2.0K</td><td class="t">application/pdf</td></tr>
+</tbody>
+</table>
+</div>
+<div class="foot">lighttpd/1.4.59</div>
+</body></html>'''
+
+@pytest.mark.parametrize("page,server", [
+    (APACHE_PAGE, APACHE),
+    (NGINX_PAGE, NGINX),
+    (LIGHTTPD_PAGE, LIGHTTPD),
+    (b"<html><head><title>Index of reports</title></head><body><a href='a.pdf'>a</a></body></html>", None),
+    (b"<html><body><a href='a.pdf'>a</a></body></html>", None)
+])
+def test_detect_listing(page, server):
+    assert detect_listing(page) == server
+
+def test_parse_apache():
+    assert parse_listing(APACHE_PAGE) == [
+        ListingEntry("/"),
+        ListingEntry("sub/", None, datetime(2023, 1, 5, 10, 22)),
+        ListingEntry("a%20b.pdf", 1572864, datetime(2023, 1, 6, 11, 0))
+    ]
+
+def test_parse_nginx():
+    entries = parse_listing(NGINX_PAGE)
+    assert entries == [
+        ListingEntry("docs/", None, datetime(2023, 1, 5, 10, 22)),
+        ListingEntry("r&d.pdf", 123456, datetime(2023, 1, 6, 11, 0))
+    ]
+    assert [entry.is_dir for entry in entries] == [True, False]
+
+def test_parse_lighttpd():
+    assert parse_listing(LIGHTTPD_PAGE) == [
+        ListingEntry("x/", None, datetime(2023, 1, 5, 10, 22, 33)),
+        ListingEntry("f.pdf", 2048, datetime(2023, 1, 6, 11, 0, 1))
+    ]
+
+def test_parse_large_listing():
+    rows = b"".join(b'<a href="f%d.pdf">f%d.pdf</a>   07-Feb-2024 09:15   %d\n' % (i, i, i) for i in range(5000))
+    entries = parse_listing(NGINX_PAGE.replace(b"</pre>", rows + b"</pre>"))
+    assert len(entries) == 5002
+    assert entries[-1] == ListingEntry("f4999.pdf", 4999, datetime(2024, 2, 7, 9, 15))
\ No newline at end of file
@@ -0,0 +1,103 @@
+# tests/test_backends.py
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import Mock
+import aiohttp
+import pytest
+from aiohttp import web
+from src.config import AppConfig
+from src.core import backends
+from src.core.backends import TransportError, create_session, run_async, uses_aiohttp
+from src.core.download_manager import DownloadManager
+
+async def _answer():
+    await asyncio.sleep(0)
+    return 42
+
+class TestCreateSession:
+    @pytest.mark.asyncio
+    async def test_default_is_aiohttp(self):
+        session = create_session(AppConfig(), {"User-Agent": "test"})
+        try:
+            assert isinstance(session, aiohttp.ClientSession)
+            assert session.headers["User-Agent"] == "test"
+        finally:
+            await session.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_httpx_falls_back_to_aiohttp(self, monkeypatch):
+        monkeypatch.setattr(backends, "httpx", None)
+        config = AppConfig(HTTP_TRANSPORT="httpx")
+        assert uses_aiohttp(config)
+        session = create_session(config)
+        try:
+            assert isinstance(session, aiohttp.ClientSession)
+        finally:
+            await session.close()
+
+    def test_unknown_transport(self):
+        with pytest.raises(ValueError):
+            create_session(AppConfig(HTTP_TRANSPORT="curl"))
+
+class TestRunAsync:
+    def test_default_loop(self):
+        assert run_async(_answer()) == 42
+
+    def test_uvloop_when_installed(self, monkeypatch):
+        fake = Mock(run=Mock(side_effect=asyncio.run))
+        monkeypatch.setattr(backends, "uvloop", fake)
+        assert run_async(_answer(), "uvloop") == 42
+        fake.run.assert_called_once()
+
+    def test_missing_uvloop_falls_back(self, monkeypatch):
+        monkeypatch.setattr(backends, "uvloop", None)
+        assert run_async(_answer(), "uvloop") == 42
+
+    def test_unknown_loop(self):
+        with pytest.raises(ValueError):
+            run_async(_answer(), "trio")
+
+@asynccontextmanager
+async def serve():
+    async def handle(request):
+        if request.match_info["name"] == "missing.pdf":
+            raise web.HTTPNotFound()
+        return web.Response(body=b"%PDF-" + bytes(2000), content_type="application/pdf")
+
+    app = web.Application()
+    app.router.add_get("/files/{name}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}"
+    finally:
+        await runner.cleanup()
+
+class TestHttpxTransport:
+    @pytest.mark.asyncio
+    async def test_download_manager_over_httpx(self, tmp_path):
+        pytest.importorskip("httpx")
+        config = AppConfig(HTTP_TRANSPORT="httpx", DEFAULT_DELAY_MIN=0, DEFAULT_DELAY_MAX=0, RETRY_ATTEMPTS=1)
+        async with serve() as server, DownloadManager(config) as manager:
+            assert isinstance(manager._session, backends.HttpxSession) and manager.connector is None
+            path = await manager.download_file(f"{server}/files/a.pdf", tmp_path)
+            assert path.read_bytes().startswith(b"%PDF-") and path.stat().st_size == 2005
+            info = await manager.fetch_metadata(f"{server}/files/b.pdf")
+            assert info.size == 2005
+
+    @pytest.mark.asyncio
+    async def test_errors_are_client_errors(self):
+        pytest.importorskip("httpx")
+        async with serve() as server:
+            session = create_session(AppConfig(HTTP_TRANSPORT="httpx"))
+            try:
+                async with await session.get(f"{server}/files/missing.pdf") as response:
+                    with pytest.raises(aiohttp.ClientError):
+                        response.raise_for_status()
+                with pytest.raises(TransportError):
+                    await session.get("http://127.0.0.1:9/unreachable")
+            finally:
+                await session.close()
+            assert session.closed
\ No newline at end of file
@@ -0,0 +1,48 @@
+# tests/test_bandwidth.py
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.core.bandwidth import TokenBucket, BandwidthLimiter
+
+class TestTokenBucket:
+    def test_unlimited_never_waits(self):
+        bucket = TokenBucket(0)
+        assert bucket.reserve(10 ** 9) == 0
+
+    def test_debt_is_repaid_at_rate(self):
+        bucket = TokenBucket(1000)
+        bucket.tokens = 0
+        assert bucket.reserve(500) == pytest.approx(0.5, abs=0.01)
+
+class TestBandwidthLimiter:
+    @pytest.mark.asyncio
+    async def test_disabled_limiter_does_not_sleep(self):
+        limiter = BandwidthLimiter()
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await limiter.throttle("example.com", 10 ** 6)
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_per_host_limit_is_stricter(self):
+        limiter = BandwidthLimiter(global_rate=1000, per_host_rate=100)
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await limiter.throttle("example.com", 100)
+        delay = mock_sleep.call_args[0][0]
+        assert delay == pytest.approx(1.0, abs=0.05)
+        assert "example.com" in limiter.host_buckets
+
+    def test_set_limits_updates_existing_hosts(self):
+        limiter = BandwidthLimiter(per_host_rate=100)
+        limiter.host_buckets["a"] = TokenBucket(100)
+        limiter.set_limits(global_rate=500, per_host_rate=50)
+        assert limiter.global_bucket.rate == 500
+        assert limiter.host_buckets["a"].rate == 50
+
+    def test_schedule_selects_latest_started_entry(self):
+        limiter = BandwidthLimiter(schedule=[
+            {"start": "00:00", "global": 1000},
+            {"start": "23:59", "global": 10}
+        ])
+        with patch("src.core.bandwidth.datetime") as mock_datetime:
+            mock_datetime.now.return_value.strftime.return_value = "12:00"
+            limiter._apply_schedule()
+        assert limiter.global_bucket.rate == 1000
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import Mock, patch
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import NoSuchWindowException, WebDriverException
 from src.core.browser_manager import BrowserManager
 from src.config import AppConfig
 from src.utils.exceptions import BrowserError
@@ -73,4 +73,78 @@ class TestBrowserManager:
             # Verify user agent was set
             mock_firefox.call_args[1]['options'].preferences.get(
                 'general.useragent.override'
-            ) == config.USER_AGENT
\ No newline at end of file
+            ) == config.USER_AGENT
+
+class TestShowLink:
+    @pytest.fixture
+    def driver(self, browser_manager):
+        driver = Mock(current_window_handle="tab-1")
+        driver.execute_script.side_effect = lambda script, *args: 12 if "querySelectorAll" in script else True
+        with patch.object(browser_manager, 'get_driver', return_value=driver):
+            yield driver
+
+    def test_page_loaded_and_indexed_once(self, browser_manager, driver):
+        assert browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        assert browser_manager.show_link("http://test.com/", "http://test.com/b.pdf")
+        driver.get.assert_called_once_with("http://test.com/")
+        scripts = [call.args[0] for call in driver.execute_script.call_args_list]
+        assert sum("querySelectorAll" in script for script in scripts) == 1
+        assert driver.execute_script.call_args.args[1] == "http://test.com/b.pdf"
+        driver.switch_to.window.assert_called_once_with("tab-1")
+        driver.find_element.assert_not_called()
+
+    def test_each_source_page_gets_a_tab(self, browser_manager, driver):
+        browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        browser_manager.show_link("http://test.com/docs/", "http://test.com/docs/b.pdf")
+        driver.switch_to.new_window.assert_called_once_with('tab')
+        assert driver.get.call_count == 2
+
+    def test_reindexes_after_navigation(self, browser_manager, driver):
+        browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        results = iter([None, 12, False])
+        driver.execute_script.side_effect = lambda script, *args: next(results)
+        assert not browser_manager.show_link("http://test.com/", "http://test.com/missing.pdf")
+        assert driver.get.call_count == 2
+
+    def test_closed_tab_is_reopened(self, browser_manager, driver):
+        browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        driver.window_handles = ["tab-0"]
+
+        def switch(handle):
+            if handle == "tab-1":
+                raise NoSuchWindowException("closed")
+
+        driver.switch_to.window.side_effect = switch
+        assert browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        assert driver.get.call_count == 2
+
+    def test_closed_tab_is_left_before_loading(self, browser_manager, driver):
+        browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        driver.current_window_handle = "tab-2"
+        browser_manager.show_link("http://test.com/docs/", "http://test.com/docs/b.pdf")
+        # The user closes the first tab, which the driver was not on
+        driver.window_handles = ["tab-2"]
+        events = []
+
+        def switch(handle):
+            if handle == "tab-1":
+                raise NoSuchWindowException("closed")
+            events.append(f"switch {handle}")
+
+        driver.switch_to.window.side_effect = switch
+        driver.switch_to.new_window.side_effect = lambda kind: events.append("new tab")
+        driver.get.side_effect = lambda url: events.append(f"get {url}")
+        assert browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        assert events == ["switch tab-2", "new tab", "get http://test.com/"]
+        assert browser_manager._pages == {"http://test.com/docs/": "tab-2", "http://test.com/": "tab-2"}
+
+    def test_new_browser_when_every_window_is_closed(self, browser_manager, driver):
+        browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        driver.window_handles = []
+        driver.switch_to.window.side_effect = NoSuchWindowException("closed")
+        with patch.object(browser_manager, 'cleanup', wraps=browser_manager.cleanup) as cleanup:
+            assert browser_manager.show_link("http://test.com/", "http://test.com/a.pdf")
+        cleanup.assert_called_once()
+        assert browser_manager.get_driver.call_count == 3
+        driver.switch_to.new_window.assert_not_called()
+        assert driver.get.call_count == 2
\ No newline at end of file
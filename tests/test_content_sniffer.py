@@ -0,0 +1,68 @@
+# tests/test_content_sniffer.py
+import pytest
+from src.core.content_sniffer import ContentSniffer, expected_suffix
+
+@pytest.mark.parametrize("url,suffix", [
+    ("http://test.com/a/report.PDF", ".pdf"),
+    ("http://test.com/data.tar.gz?x=1", ".tar.gz"),
+    ("http://test.com/v1.2.zip", ".zip"),
+    ("http://test.com/download", "")
+])
+def test_expected_suffix(url, suffix):
+    assert expected_suffix(url) == suffix
+
+@pytest.mark.parametrize("url,body", [
+    ("http://test.com/a.pdf", b"%PDF-1.7\n..."),
+    ("http://test.com/a.pdf", b"\r\n\r\n%PDF-1.4"),
+    ("http://test.com/a.docx", b"PK\x03\x04rest"),
+    ("http://test.com/a.png", b"\x89PNG\r\n\x1a\nIHDR"),
+    ("http://test.com/a.mp4", b"\x00\x00\x00\x18ftypmp42"),
+    ("http://test.com/a.mp3", b"ID3\x04\x00"),
+    ("http://test.com/a.mp3", b"\xff\xfa\x90\x64"),  # MPEG-1 Layer III with CRC
+    ("http://test.com/a.mp3", b"\xff\xe3\x18\xc4"),  # MPEG-2.5
+    ("http://test.com/a.csv", b"id,name\n1,x\n"),
+])
+def test_matching_content(url, body):
+    sniffer = ContentSniffer(url, "application/octet-stream")
+    assert sniffer.check_headers() is None
+    assert sniffer.feed(body) is None
+    assert sniffer.finish() is None
+
+@pytest.mark.parametrize("url,body", [
+    ("http://test.com/a.pdf", b"<!DOCTYPE html><html><body>Please log in</body></html>"),
+    ("http://test.com/a.zip", b"Not Found"),
+    ("http://test.com/a.csv", b"  <html><head><title>Error</title>"),
+])
+def test_mismatched_content(url, body):
+    sniffer = ContentSniffer(url)
+    assert sniffer.feed(body) or sniffer.finish()
+
+def test_html_content_type():
+    # Signature formats are decided by the body, so a mislabelled real file passes
+    sniffer = ContentSniffer("http://test.com/a.pdf", "text/html; charset=utf-8")
+    assert sniffer.check_headers() is None
+    assert sniffer.feed(b"%PDF-1.5") is None
+    # Text formats have no signature, so the header alone rejects them
+    assert ContentSniffer("http://test.com/a.csv", "text/html").check_headers()
+
+def test_waits_for_enough_bytes():
+    sniffer = ContentSniffer("http://test.com/a.png")
+    assert sniffer.feed(b"\x89PN") is None
+    assert not sniffer.done
+    assert sniffer.feed(b"G\r\n\x1a\n") is None
+    assert sniffer.done
+
+def test_html_urls_are_not_checked():
+    sniffer = ContentSniffer("http://test.com/page.html", "text/html")
+    assert sniffer.done
+    assert sniffer.check_headers() is None
+
+def test_gzip_content_encoding():
+    # aiohttp unpacks Content-Encoding: gzip, so the .gz magic is gone but an error page is still caught
+    sniffer = ContentSniffer("http://test.com/data.tar.gz", "application/x-gzip", "gzip")
+    assert sniffer.feed(bytes(257) + b"ustar" + bytes(250)) is None
+    assert ContentSniffer("http://test.com/a.gz", None, "gzip").finish() is None
+    sniffer = ContentSniffer("http://test.com/a.gz", "text/html", "gzip")
+    assert sniffer.check_headers()
+    sniffer = ContentSniffer("http://test.com/a.gz", None, "identity")
+    assert sniffer.feed(b"plain text" * 10) or sniffer.finish()
\ No newline at end of file
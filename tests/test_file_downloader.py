@@ -1,11 +1,18 @@
 # tests/test_file_downloader.py
+import asyncio
+import time
 import pytest
 import aiohttp
+import tarfile
 from pathlib import Path
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, Mock
+from datetime import datetime
 from src.core.download_manager import DownloadManager
+from src.core.metadata import FileInfo, format_size
 from src.config import AppConfig
-from src.utils.exceptions import DownloaderError
+from src.core.output_layout import url_digest
+from src.core.robots import RobotsCache
+from src.utils.exceptions import DownloaderError, ContentMismatchError
 
 @pytest.fixture
 def config():
@@ -106,4 +113,222 @@ class TestDownloadManager:
             ]
             
             result = await download_manager.download_file(url, tmp_path)
-            assert result == tmp_path / "test.pdf"
\ No newline at end of file
+            assert result == tmp_path / "test.pdf"
+
+    @pytest.mark.asyncio
+    async def test_prefetch_metadata_skips_cached(self, download_manager):
+        urls = ["http://example.com/a.pdf", "http://example.com/b.pdf"]
+        download_manager.metadata[urls[0]] = FileInfo(urls[0], size=10)
+
+        async def fake_fetch(url):
+            info = FileInfo(url, size=20)
+            download_manager.metadata[url] = info
+            return info
+
+        with patch.object(download_manager, 'fetch_metadata', side_effect=fake_fetch) as mock_fetch:
+            metadata = await download_manager.prefetch_metadata(urls + urls)
+
+        mock_fetch.assert_called_once_with(urls[1])
+        assert metadata[urls[1]].size == 20
+
+    def test_order_and_filter_files(self, download_manager):
+        sizes = {"http://x/a.pdf": 300, "http://x/b.pdf": 100, "http://x/c.pdf": None, "http://x/d.pdf": 200}
+        for url, size in sizes.items():
+            download_manager.metadata[url] = FileInfo(url, size=size)
+        files = list(sizes)
+
+        assert download_manager.order_files(files, DownloadManager.ORDER_SMALLEST) == [
+            "http://x/b.pdf", "http://x/d.pdf", "http://x/a.pdf", "http://x/c.pdf"
+        ]
+        assert download_manager.order_files(files, DownloadManager.ORDER_LARGEST)[0] == "http://x/a.pdf"
+        assert download_manager.order_files(files) == files
+        assert download_manager.filter_files(files, min_size=150, max_size=250) == [
+            "http://x/c.pdf", "http://x/d.pdf"
+        ]
+        assert download_manager.total_bytes(["http://x/a.pdf", "http://x/b.pdf"]) == 400
+        assert download_manager.total_bytes(files) is None
+
+    def test_filter_files_by_date(self, download_manager):
+        url = "http://x/a.pdf"
+        download_manager.metadata[url] = FileInfo.from_headers(url, {
+            "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"
+        })
+        assert download_manager.filter_files([url], modified_after=datetime(2015, 1, 1)) == [url]
+        assert download_manager.filter_files([url], modified_after=datetime(2016, 1, 1)) == []
+
+    @pytest.mark.asyncio
+    async def test_mismatched_content_aborts_without_retry(self, download_manager, config, tmp_path):
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        response = FakeResponse([b"<!DOCTYPE html><html>Login required" + b" " * 100, b"more"] * 50,
+                                {"Content-Type": "text/html"})
+        download_manager._session = Mock(closed=False, get=Mock(return_value=response))
+        messages = []
+
+        async def progress_callback(message):
+            messages.append(message)
+
+        with pytest.raises(ContentMismatchError):
+            await download_manager.download_file("http://test.com/a.pdf", tmp_path, progress_callback)
+
+        assert download_manager._session.get.call_count == 1
+        assert response.chunks_read == 1
+        assert list(tmp_path.iterdir()) == []
+        assert messages[-1] == f"a.pdf {DownloadManager.MISMATCH_MESSAGE}"
+
+    @pytest.mark.asyncio
+    async def test_gzip_served_with_content_encoding(self, download_manager, config, tmp_path):
+        # The client has already unpacked the body, which is longer than the sent Content-Length
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        tar_data = bytes(257) + b"ustar" + bytes(250)
+        response = FakeResponse([tar_data], {"Content-Encoding": "gzip", "Content-Length": "40",
+                                             "Content-Type": "application/x-gzip"})
+        download_manager._session = Mock(closed=False, get=Mock(return_value=response))
+
+        path = await download_manager.download_file("http://test.com/data.tar.gz", tmp_path)
+
+        assert path.read_bytes() == tar_data
+        assert download_manager._session.get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_archive_output_mode(self, download_manager, config, tmp_path):
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        config.OUTPUT_MODE = "tar"
+        bodies = {f"http://test.com/{i}.pdf": b"%PDF-" + bytes([i]) * 100 for i in range(3)}
+        download_manager._session = Mock(closed=False, get=Mock(
+            side_effect=lambda url: FakeResponse([bodies[url]], {"Content-Type": "application/pdf"})
+        ))
+
+        paths = await download_manager.download_files(list(bodies), tmp_path)
+        assert paths == [tmp_path / "files-00001.tar"] * 3
+        with tarfile.open(tmp_path / "files-00001.tar") as tar:
+            assert tar.getnames() == ["0.pdf", "1.pdf", "2.pdf"]
+            assert tar.extractfile("1.pdf").read() == bodies["http://test.com/1.pdf"]
+
+        # A later job sees the archived files through the index
+        download_manager._cache.clear()
+        messages = []
+
+        async def progress_callback(message):
+            messages.append(message)
+
+        await download_manager.download_files(list(bodies), tmp_path, progress_callback)
+        assert all(DownloadManager.SKIP_MESSAGE in message for message in messages)
+        assert download_manager._session.get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_hash_layout_keeps_same_names_apart(self, download_manager, config, tmp_path):
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        config.OUTPUT_LAYOUT = "hash"
+        bodies = {"http://a.com/report.pdf": b"%PDF-a", "http://b.com/report.pdf": b"%PDF-b"}
+        download_manager._session = Mock(closed=False, get=Mock(
+            side_effect=lambda url: FakeResponse([bodies[url]], {"Content-Type": "application/pdf"})
+        ))
+
+        paths = await download_manager.download_files(list(bodies), tmp_path)
+        assert len(set(paths)) == 2
+        for url, path in zip(bodies, paths):
+            assert path.read_bytes() == bodies[url]
+            assert path.relative_to(tmp_path).parts[0] == url_digest(url)[:2]
+
+        # A fresh job finds both files with one directory scan
+        download_manager._cache.clear()
+        assert await download_manager.download_files(list(bodies), tmp_path) == paths
+        assert download_manager._session.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_downloads_to_one_path(self, download_manager, config, tmp_path):
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        bodies = {"http://a.com/report.pdf": b"%PDF-a" * 100, "http://b.com/report.pdf": b"%PDF-b" * 100}
+        download_manager._session = Mock(closed=False, get=Mock(side_effect=lambda url: FakeResponse(
+            [bodies[url][:300], bodies[url][300:]], {"Content-Type": "application/pdf", "content-length": "600"}
+        )))
+        messages = []
+
+        async def progress_callback(message):
+            messages.append(message)
+
+        paths = await asyncio.gather(*(download_manager.download_file(url, tmp_path, progress_callback)
+                                       for url in bodies))
+        assert paths == [tmp_path / "report.pdf"] * 2
+        assert (tmp_path / "report.pdf").read_bytes() == bodies["http://a.com/report.pdf"]
+        assert download_manager._session.get.call_count == 1
+        assert f"report.pdf {DownloadManager.SKIP_MESSAGE}" in messages
+        assert [path.name for path in tmp_path.iterdir()] == ["report.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_file_written_by_another_process_is_kept(self, download_manager, config, tmp_path):
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        output = tmp_path / "report.pdf"
+
+        def get(url):
+            output.write_bytes(b"%PDF-other")  # e.g. another shard finishing first
+            return FakeResponse([b"%PDF-mine"], {"Content-Type": "application/pdf"})
+
+        download_manager._session = Mock(closed=False, get=Mock(side_effect=get))
+        counted = []
+        path = await download_manager.download_file("http://a.com/report.pdf", tmp_path,
+                                                    byte_callback=lambda count, skipped=False: counted.append(
+                                                        (count, skipped)))
+        assert path == output and output.read_bytes() == b"%PDF-other"
+        assert [path.name for path in tmp_path.iterdir()] == ["report.pdf"]
+        assert counted == [(9, False), (-9, False), (9, True)]
+
+    @pytest.mark.asyncio
+    async def test_crawl_delay_spaces_downloads(self, download_manager, config, tmp_path):
+        config.DEFAULT_DELAY_MIN = config.DEFAULT_DELAY_MAX = 0
+        config.ROBOTS_TXT = True
+        config.WARMUP_CONNECTIONS = 0
+
+        async def fetch_robots(url):
+            return 200, "User-agent: *\nCrawl-delay: 1\n"
+
+        download_manager.robots = RobotsCache(config.USER_AGENT, fetch_robots, max_delay=0.2)
+        download_manager._session = Mock(closed=False, get=Mock(
+            side_effect=lambda url: FakeResponse([b"%PDF-1.7"], {"Content-Type": "application/pdf"})
+        ))
+        start = time.monotonic()
+        paths = await download_manager.download_files([f"http://test.com/{i}.pdf" for i in range(3)], tmp_path)
+        assert len(paths) == 3
+        assert time.monotonic() - start >= 0.39
+
+class FakeResponse:
+    """Streams the given chunks like an aiohttp response"""
+
+    def __init__(self, chunks, headers):
+        self.chunks = chunks
+        self.headers = headers
+        self.chunks_read = 0
+        self.content = Mock(iter_chunked=self._iter_chunked)
+
+    async def _iter_chunked(self, size):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)  # lets concurrent downloads interleave
+            self.chunks_read += 1
+            yield chunk
+
+    def raise_for_status(self):
+        pass
+
+    def __await__(self):
+        async def response():
+            return self
+        return response().__await__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+def test_file_info_from_headers():
+    info = FileInfo.from_headers("http://x/a.pdf", {
+        "Content-Length": "2048",
+        "Content-Type": "application/pdf; charset=binary",
+        "Accept-Ranges": "bytes"
+    })
+    assert info.size == 2048
+    assert info.content_type == "application/pdf"
+    assert info.accept_ranges
+    assert info.last_modified is None
+    assert format_size(info.size) == "2.0 KB"
+    assert format_size(None) == ""
@@ -0,0 +1,67 @@
+# tests/test_file_filter.py
+import pytest
+from urllib.parse import urljoin
+from src.core.file_filter import FileFilter, is_valid_url, parse_file_types
+
+class TestFileFilter:
+    def test_matches_path_not_query(self):
+        file_filter = FileFilter([".pdf"])
+        assert file_filter.matches("file.pdf?download=1")
+        assert file_filter.matches("/docs/File.PDF#page=2")
+        assert not file_filter.matches("view.php?file=report.pdf")
+        assert not file_filter.matches("/docs/")
+        assert not file_filter.matches("get.php?file=a/b.pdf")
+        assert not file_filter.matches("http://files.pdf")
+        assert not file_filter.matches("//files.pdf/")
+        assert file_filter.matches("http://files.pdf/report.pdf?download=1")
+
+    def test_suffix_without_dot_and_groups(self):
+        file_filter = FileFilter(["docx", "archives"])
+        assert file_filter.matches("a.docx")
+        assert file_filter.matches("backup.tar.gz")
+        assert file_filter.matches("b.zip")
+        assert not file_filter.matches("a.pdf")
+
+    def test_filter_links(self):
+        file_filter = FileFilter([".pdf"])
+        hrefs = [
+            "a.pdf",
+            "http://other.com/b.pdf#x",
+            "../c.pdf?v=2",
+            "page.html",
+            "http://bad.com/d{1}.pdf",
+            "http://[broken/e.pdf"
+        ]
+        assert list(file_filter.filter_links("http://test.com/docs/index.html", hrefs)) == [
+            "http://test.com/docs/a.pdf",
+            "http://other.com/b.pdf",
+            "http://test.com/c.pdf?v=2"
+        ]
+
+    def test_joins_like_urljoin(self):
+        file_filter = FileFilter([".pdf"])
+        hrefs = ["c.pdf", "/c.pdf", "//cdn.test.com/c.pdf", "./c.pdf", "d//c.pdf",
+                 "d/e/c.pdf", "https://test.com/x/../c.pdf"]
+        for base_url in ("http://test.com/docs/index.html", "http://test.com",
+                         "http://test.com/a//b/", "http://test.com/a/?q=1"):
+            assert list(file_filter.filter_links(base_url, hrefs)) == \
+                [urljoin(base_url, href) for href in hrefs]
+
+    def test_for_types_is_cached(self):
+        assert FileFilter.for_types([".pdf"]) is FileFilter.for_types([".pdf"])
+
+@pytest.mark.parametrize("url,expected", [
+    ("http://example.com", True),
+    ("HTTPS://example.com/file.pdf?x=1", True),
+    ("ftp://example.com", False),
+    ("http://example.com//", False),
+    ("http:///path", False),
+    ("http://example.com/a|b", False),
+    ("http://example.com/" + "a" * 2048, False)
+])
+def test_is_valid_url(url, expected):
+    assert is_valid_url(url) is expected
+
+def test_parse_file_types():
+    assert parse_file_types(".pdf, archives;docx") == [".pdf", "archives", "docx"]
+    assert parse_file_types("") == []
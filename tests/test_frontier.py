@@ -0,0 +1,59 @@
+# tests/test_frontier.py
+import sqlite3
+import pytest
+from src.core.frontier import CrawlFrontier
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = CrawlFrontier(tmp_path / "job.db", checkpoint_interval=0)
+    yield frontier
+    frontier.close()
+
+class TestCrawlFrontier:
+    def test_job_round_trip(self, frontier):
+        frontier.save_job({"urls": ["http://a"], "max_depth": 2})
+        assert frontier.load_job() == {"urls": ["http://a"], "max_depth": 2}
+
+    def test_record_page_moves_work_forward(self, frontier):
+        frontier.seed(["http://a/"])
+        assert frontier.pending_pages() == [("http://a/", 0)]
+
+        frontier.record_page("http://a/", ["http://a/1.pdf"], ["http://a/sub/"], 0)
+
+        assert frontier.pending_pages() == [("http://a/sub/", 1)]
+        assert frontier.pending_downloads() == [("http://a/1.pdf", "http://a/")]
+        frontier.mark_downloaded("http://a/1.pdf")
+        assert frontier.pending_downloads() == []
+        assert frontier.stats() == {"done": 1, "pending": 1, "files": 1, "downloaded": 1}
+
+    def test_failed_pages_are_retried(self, frontier):
+        frontier.seed(["http://a/"])
+        frontier.record_page("http://a/", [], [], 0, Exception("boom"))
+        assert frontier.pending_pages() == [("http://a/", 0)]
+
+    def test_state_survives_reopen(self, tmp_path):
+        path = tmp_path / "job.db"
+        with CrawlFrontier(path) as frontier:
+            frontier.seed(["http://a/"])
+            frontier.record_page("http://a/", ["http://a/1.pdf"], [], 0)
+
+        with CrawlFrontier(path) as frontier:
+            assert frontier.pending_pages() == []
+            assert list(frontier.known_files()) == ["http://a/1.pdf"]
+
+    def test_sitemaps_are_flagged(self, tmp_path):
+        path = tmp_path / "job.db"
+        # a frontier from before pages had a sitemap column
+        db = sqlite3.connect(str(path))
+        db.execute("CREATE TABLE pages (url TEXT PRIMARY KEY, depth INTEGER NOT NULL, status TEXT NOT NULL, "
+                   "error TEXT, updated REAL)")
+        db.execute("INSERT INTO pages (url, depth, status) VALUES ('http://a/old/', 0, 'pending')")
+        db.commit()
+        db.close()
+
+        with CrawlFrontier(path) as frontier:
+            frontier.seed(["http://a/", "http://a/feed.xml"], ["http://a/feed.xml"])
+            frontier.record_page("http://a/feed.xml", [], ["http://a/docs-1.xml", "http://a/page/"], 0,
+                                 sitemaps=["http://a/docs-1.xml"])
+            assert sorted(frontier.known_sitemaps()) == ["http://a/docs-1.xml", "http://a/feed.xml"]
+            assert ("http://a/old/", 0) in frontier.pending_pages()
\ No newline at end of file
@@ -1,8 +1,10 @@
+import asyncio
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from src.ui.scraper_gui import WebScraperGUI
 from src.config import AppConfig
 from src.core.scraper_service import ScraperService
+from src.utils.exceptions import ScraperError
 
 @pytest.fixture
 def config():
@@ -45,4 +47,47 @@ class TestWebScraperGUI:
         
         with patch.object(ScraperService, 'fetch_files', side_effect=[Exception("Test error"), ["http://example.com/test1.pdf"]]):
             await gui.handle_search(values)
-            # Should retry and eventually succeed
\ No newline at end of file
+            # Should retry and eventually succeed
+
+    @pytest.mark.asyncio
+    async def test_search_task_reports_errors(self, gui):
+        async def failing_batches(*args, **kwargs):
+            raise ScraperError("site down")
+            yield
+
+        gui.window = MagicMock()
+        values = {"-URL-": "http://example.com", "-FILETYPE-": ".pdf"}
+        with patch.object(gui.scraper_service, 'iter_file_batches', failing_batches), \
+                patch('PySimpleGUI.popup_error') as popup:
+            await asyncio.create_task(gui.handle_search(values))
+        popup.assert_called_once_with("Error during search: site down")
+
+    @pytest.mark.asyncio
+    async def test_metadata_prefetch_keeps_gui_busy(self, gui):
+        assert not gui._busy()
+        release = asyncio.Event()
+        pending = asyncio.create_task(release.wait())
+        finished = asyncio.create_task(asyncio.sleep(0))
+        await finished
+        gui._metadata_tasks = [pending, finished]
+        assert gui._busy()
+        assert gui._metadata_tasks == [pending]
+        release.set()
+        await pending
+        assert not gui._busy() and gui._metadata_tasks == []
+
+    def test_selection_maps_to_current_page(self, gui, config):
+        config.RESULTS_PAGE_SIZE = 2
+        gui.window = MagicMock()
+        for i in range(5):
+            gui.results.add(f"http://example.com/{i}.pdf", "http://example.com/")
+        gui.handle_page(1)
+        assert gui.page_start == 2
+        assert gui._selected_urls({"-FILELIST-": [1]}) == ["http://example.com/3.pdf"]
+        assert len(gui._selected_urls({"-FILELIST-": [], "-ALLROWS-": True})) == 5
+
+        # Clicking the name heading twice sorts descending and returns to the first page
+        gui.handle_table_event(("-FILELIST-", "+CLICKED+", (-1, 0)))
+        gui.handle_table_event(("-FILELIST-", "+CLICKED+", (-1, 0)))
+        assert gui.page_start == 0
+        assert gui._selected_urls({"-FILELIST-": [0]}) == ["http://example.com/4.pdf"]
\ No newline at end of file
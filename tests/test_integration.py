@@ -60,7 +60,6 @@ class TestIntegration:
             await gui.handle_show_in_browser(values)
             
             assert mock_driver.get.called
-            assert mock_driver.find_element.called
             assert mock_driver.execute_script.called
 
     @pytest.mark.asyncio
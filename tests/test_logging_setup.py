@@ -0,0 +1,99 @@
+# tests/test_logging_setup.py
+import asyncio
+import json
+import logging
+import time
+import pytest
+from src.utils.logging_setup import JsonLinesFormatter, SamplingFilter, create_queue_logging, log_fields
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def queue_logger():
+    """A logger writing through a queue handler to a ListHandler on the listener thread"""
+    target = ListHandler()
+    queue_handler, listener, sampler = create_queue_logging([target], sample_limit=5, sample_window=60)
+    logger = logging.getLogger("test_logging_setup")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler)
+    yield logger, listener, sampler, target
+    logger.removeHandler(queue_handler)
+    if listener._thread is not None:  # not stopped by the test
+        listener.stop()
+
+def _record(msg, *args, level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+class TestSamplingFilter:
+    def test_limits_each_template(self):
+        sampler = SamplingFilter(limit=3, window=60)
+        passed = [sampler.filter(_record("%s already exists", i)) for i in range(10)]
+        assert passed.count(True) == 3
+        assert sampler.filter(_record("Other message"))
+        assert sampler.suppressed_total == 7
+
+    def test_warnings_always_pass(self):
+        sampler = SamplingFilter(limit=1, window=60)
+        assert all(sampler.filter(_record("failed %s", i, level=logging.WARNING)) for i in range(5))
+
+    def test_reports_suppressed_count_in_next_window(self):
+        sampler = SamplingFilter(limit=1, window=0.05)
+        for i in range(4):
+            sampler.filter(_record("%s already exists", i))
+        time.sleep(0.06)
+        record = _record("%s already exists", "last")
+        assert sampler.filter(record)
+        assert record.getMessage() == "last already exists (3 similar messages suppressed)"
+
+    def test_disabled(self):
+        sampler = SamplingFilter(limit=0)
+        assert all(sampler.filter(_record("%s", i)) for i in range(100))
+
+class TestQueueLogging:
+    def test_records_written_by_listener(self, queue_logger):
+        logger, listener, _, target = queue_logger
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed %s", "file.pdf")
+        listener.stop()
+        record, = target.records
+        assert record.getMessage() == "Failed file.pdf"
+        assert "ValueError: boom" in record.exc_text and record.exc_info is None
+
+    def test_100k_skips_are_sampled(self, queue_logger):
+        logger, listener, sampler, target = queue_logger
+        start = time.perf_counter()
+        for i in range(100_000):
+            logger.info("%s %s", f"{i}.pdf", "already exists", extra={"url": f"http://test.com/{i}.pdf"})
+        elapsed = time.perf_counter() - start
+        sampler.flush()
+        listener.stop()
+        assert sampler.suppressed_total == 100_000 - 5
+        assert len(target.records) == 6
+        assert target.records[-1].getMessage() == "Suppressed 99995 similar messages: %s %s"
+        assert elapsed < 5  # no formatting or I/O for dropped records
+
+    @pytest.mark.asyncio
+    async def test_log_fields_reach_tasks(self, queue_logger):
+        logger, listener, _, target = queue_logger
+
+        async def worker():
+            logger.warning("Not retrying %s", "a.pdf", extra={"url": "http://test.com/a.pdf"})
+
+        with log_fields(job="job-1"):
+            await asyncio.create_task(worker())
+        logger.warning("after the job")
+        listener.stop()
+        first, second = target.records
+        line = json.loads(JsonLinesFormatter().format(first))
+        assert line["job"] == "job-1" and line["url"] == "http://test.com/a.pdf"
+        assert line["message"] == "Not retrying a.pdf" and line["level"] == "WARNING"
+        assert "job" not in json.loads(JsonLinesFormatter().format(second))
\ No newline at end of file
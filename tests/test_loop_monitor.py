@@ -0,0 +1,50 @@
+# tests/test_loop_monitor.py
+import asyncio
+import time
+import pytest
+from src.utils.loop_monitor import LagHistogram, LoopLagMonitor
+
+def blocking_call():
+    time.sleep(0.4)
+
+class TestLagHistogram:
+    def test_buckets_and_percentiles(self):
+        histogram = LagHistogram((1, 10, 100))
+        for lag in (0.0005, 0.0005, 0.005, 0.05, 0.5):
+            histogram.record(lag)
+        assert histogram.counts == [2, 1, 1, 1]
+        assert histogram.percentile(0.4) == 1
+        assert histogram.percentile(0.8) == 100
+        assert histogram.percentile(1.0) == pytest.approx(500)
+        text = histogram.format()
+        assert "5 samples" in text and "max 500 ms" in text
+        assert "  >100 ms: 1" in text
+
+    def test_empty(self):
+        assert LagHistogram().percentile(0.99) == 0.0
+        assert "0 samples" in LagHistogram().format()
+
+class TestLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_captures_blocking_stack(self):
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        assert len(monitor.reports) == 1
+        report, = monitor.reports.values()
+        assert "blocking_call" in report.stack and "time.sleep" in report.stack
+        assert report.longest >= 0.1
+        assert monitor.histogram.max >= 0.3
+        assert "Blocked 1x" in monitor.format()
+
+    @pytest.mark.asyncio
+    async def test_no_reports_without_blocking(self):
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.2)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        assert monitor.reports == {}
+        assert monitor.histogram.samples > 0
\ No newline at end of file
@@ -0,0 +1,121 @@
+# tests/test_memory.py
+import json
+import os
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src.utils.memory import BoundedDict, BoundedList, MemoryGauge, rss_bytes
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs a pipeline job of N files in a fresh process and prints its peak RSS. Discovery
+# and the network are faked; the pipeline, DownloadManager and summary are real.
+JOB_SCRIPT = """
+import asyncio, json, logging, sys
+from pathlib import Path
+from unittest.mock import Mock
+from src.config import AppConfig
+from src.core.download_manager import DownloadManager
+from src.core.pipeline import DownloadPipeline
+from src.utils.memory import peak_rss_bytes
+
+count, output_dir = int(sys.argv[1]), Path(sys.argv[2])
+logging.disable(logging.CRITICAL)
+
+async def batches(urls, file_types, on_error, max_depth, frontier):
+    for start in range(0, count, 500):
+        yield [(f"http://test.com/files/{i}.bin", "http://test.com/") for i in range(start, min(start + 500, count))]
+
+class Response:
+    headers = {"Content-Type": "application/octet-stream"}
+
+    def __init__(self, url):
+        self.url = url
+        self.content = Mock(iter_chunked=self.iter_chunked)
+
+    async def iter_chunked(self, size):
+        yield b"data"
+
+    def raise_for_status(self):
+        if self.url.endswith("0.bin"):
+            raise RuntimeError(f"failed {self.url}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __await__(self):
+        async def response():
+            return self
+        return response().__await__()
+
+async def main():
+    config = AppConfig(DEFAULT_DELAY_MIN=0, DEFAULT_DELAY_MAX=0, RETRY_ATTEMPTS=1, OUTPUT_LAYOUT="hash",
+                       MEMORY_RETENTION=1000)
+    scraper_service = Mock(pages_visited=1, iter_file_batches=batches, take_file_info=lambda url: None)
+    async with DownloadManager(config) as download_manager:
+        download_manager._session = Mock(closed=False, get=Response)
+        summary = await DownloadPipeline(config, scraper_service, download_manager).run(["http://test.com/"], [".bin"], output_dir)
+    print(json.dumps({"downloaded": summary.downloaded, "failed": summary.failed,
+                      "errors": len(summary.errors), "peak": peak_rss_bytes()}))
+
+asyncio.run(main())
+"""
+
+def _run_job(count: int, output_dir: Path) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", JOB_SCRIPT, str(count), str(output_dir)],
+                            capture_output=True, text=True, env=env, cwd=ROOT, timeout=300)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.skipif(sys.platform == "win32", reason="peak RSS is read with the resource module")
+def test_peak_rss_flat_across_job_sizes(tmp_path):
+    small = _run_job(2_000, tmp_path / "small")
+    large = _run_job(20_000, tmp_path / "large")
+    assert large["downloaded"] == 18_000 and large["failed"] == 2_000
+    assert large["errors"] == 1000
+    # 10x the files; only the 16-byte-per-file digests of existing output files may grow.
+    # Keeping every error and cached path adds about 7 MB here.
+    assert large["peak"] - small["peak"] < 3 * 1024 ** 2
+
+class TestBoundedContainers:
+    def test_bounded_list_keeps_last_items(self):
+        errors = BoundedList(3, ["a", "b"])
+        errors.extend(["c", "d", "e"])
+        assert errors == ["c", "d", "e"]
+        assert errors.dropped == 2
+
+    def test_bounded_list_unbounded(self):
+        errors = BoundedList(0, range(5))
+        assert errors == [0, 1, 2, 3, 4] and errors.dropped == 0
+
+    def test_bounded_list_pickles(self):
+        errors = pickle.loads(pickle.dumps(BoundedList(2, ["a", "b", "c"])))
+        assert errors == ["b", "c"] and errors.dropped == 1 and errors.maxlen == 2
+
+    def test_bounded_dict_evicts_least_recently_used(self):
+        cache = BoundedDict(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache["a"] == 1
+        cache["c"] = 3
+        assert list(cache) == ["a", "c"]
+        assert cache.setdefault("a", 9) == 1
+        assert cache.setdefault("d", 4) == 4
+        assert "c" not in cache
+
+def test_memory_gauge_snapshot():
+    gauge = MemoryGauge(trace=True)
+    gauge.start()
+    data = [bytes(1024) for _ in range(1000)]
+    snapshot = gauge.snapshot()
+    gauge.stop()
+    assert snapshot["traced_peak"] >= 1000 * 1024
+    if rss_bytes() is not None:
+        assert snapshot["peak_rss"] >= snapshot["rss"] > 0
+    del data
\ No newline at end of file
@@ -0,0 +1,61 @@
+# tests/test_output_layout.py
+import pytest
+from src.core.output_layout import SCAN_DEPTHS, relative_path, safe_segment, scan_output_dir, url_digest
+
+class TestRelativePath:
+    def test_flat_keeps_legacy_names(self):
+        assert relative_path("http://a.com/docs/My%20File.pdf", "flat") == "My File.pdf"
+
+    def test_flat_names_are_safe(self):
+        first, second = (relative_path(f"http://x.com/file.pdf?download={i}", "flat") for i in (1, 2))
+        assert first != second and first.startswith("file-") and first.endswith(".pdf") and "?" not in first
+        assert relative_path("http://x.com/file.pdf?b=2&a=1", "flat") == relative_path("http://x.com/file.pdf?a=1&b=2",
+                                                                                         "flat")
+        assert relative_path("http://x.com/docs/a%2Fb.pdf", "flat") == "a_b.pdf"
+        assert relative_path("http://x.com/docs/", "flat") == "index.html"
+
+    def test_same_basename_from_different_urls_never_collides(self):
+        urls = ["http://a.com/x/report.pdf", "http://a.com/y/report.pdf", "http://b.com/x/report.pdf"]
+        for layout in ("host", "mirror", "hash"):
+            assert len({relative_path(url, layout) for url in urls}) == 3
+
+    def test_equivalent_urls_share_a_path(self):
+        assert (relative_path("HTTP://A.com:80/x/report.pdf#p=2", "hash")
+                == relative_path("http://a.com/x/report.pdf", "hash"))
+
+    def test_layout_shapes(self):
+        url = "http://a.com:8080/docs/2023/report.tar.gz"
+        digest = url_digest(url)[:8]
+        assert relative_path(url, "mirror") == "a.com_8080/docs/2023/report.tar.gz"
+        assert relative_path(url, "host") == f"a.com_8080/report-{digest}.tar.gz"
+        assert relative_path(url, "hash") == f"{url_digest(url)[:2]}/{url_digest(url)[2:4]}/report-{digest}.tar.gz"
+
+    def test_mirror_adds_digest_only_for_queries(self):
+        assert relative_path("http://a.com/get.pdf?id=1", "mirror") != relative_path("http://a.com/get.pdf?id=2", "mirror")
+        assert relative_path("http://a.com/dir/", "mirror") == "a.com/dir/index.html"
+
+    def test_unknown_layout(self):
+        with pytest.raises(ValueError):
+            relative_path("http://a.com/a.pdf", "tree")
+
+def test_safe_segment():
+    assert safe_segment('a:b?c.pdf') == 'a_b_c.pdf'
+    assert safe_segment('..') == '_'
+    assert safe_segment('CON.txt') == '_CON.txt'
+
+def test_scan_output_dir(tmp_path):
+    (tmp_path / "ab" / "cd").mkdir(parents=True)
+    (tmp_path / "ab" / "cd" / "f.pdf").write_bytes(b"x")
+    (tmp_path / "top.pdf").write_bytes(b"x")
+    (tmp_path / "partial.pdf.tmp").write_bytes(b"x")
+    assert scan_output_dir(tmp_path) == {"ab/cd/f.pdf", "top.pdf"}
+    assert scan_output_dir(tmp_path / "missing") == set()
+
+def test_scan_output_dir_depth(tmp_path):
+    (tmp_path / "ab" / "cd").mkdir(parents=True)
+    (tmp_path / "ab" / "cd" / "f.pdf").write_bytes(b"x")
+    (tmp_path / "ab" / "g.pdf").write_bytes(b"x")
+    (tmp_path / "top.pdf").write_bytes(b"x")
+    assert scan_output_dir(tmp_path, max_depth=SCAN_DEPTHS["flat"]) == {"top.pdf"}
+    assert scan_output_dir(tmp_path, max_depth=SCAN_DEPTHS["host"]) == {"ab/g.pdf", "top.pdf"}
+    assert scan_output_dir(tmp_path, max_depth=SCAN_DEPTHS["hash"]) == {"ab/cd/f.pdf", "ab/g.pdf", "top.pdf"}
\ No newline at end of file
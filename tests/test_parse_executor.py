@@ -0,0 +1,35 @@
+# tests/test_parse_executor.py
+import pytest
+from unittest.mock import patch
+from src.core.parse_executor import ParseExecutor, extract_hrefs
+
+PAGE = b'<html><body><a href="a.pdf">A</a><a name="x">no href</a><a href="/b/">B</a></body></html>'
+
+def test_extract_hrefs():
+    assert extract_hrefs(PAGE) == ["a.pdf", "/b/"]
+    assert extract_hrefs("<a href='caf\xe9.pdf'>x</a>".encode('latin-1'), 'latin-1') == ["caf\xe9.pdf"]
+
+class TestParseExecutor:
+    @pytest.mark.asyncio
+    async def test_small_pages_parse_inline(self):
+        executor = ParseExecutor(workers=1, threshold=len(PAGE) + 1)
+        assert await executor.extract_hrefs(PAGE) == ["a.pdf", "/b/"]
+        assert executor._pool is None
+
+    @pytest.mark.asyncio
+    async def test_large_pages_use_pool(self):
+        executor = ParseExecutor(workers=1, threshold=1024)
+        page = b"<html><body>" + b"".join(b'<a href="%d.pdf">f</a>' % i for i in range(200)) + b"</body></html>"
+        try:
+            hrefs = await executor.extract_hrefs(page)
+            assert executor._pool is not None
+        finally:
+            executor.shutdown()
+        assert hrefs == [f"{i}.pdf" for i in range(200)]
+
+    @pytest.mark.asyncio
+    async def test_disabled_pool(self):
+        executor = ParseExecutor(workers=2, threshold=0)
+        with patch('src.core.parse_executor.ProcessPoolExecutor') as mock_pool:
+            assert await executor.extract_hrefs(PAGE * 100)
+        mock_pool.assert_not_called()
\ No newline at end of file
@@ -0,0 +1,170 @@
+# tests/test_pipeline.py
+import pytest
+import asyncio
+from unittest.mock import Mock, patch
+from src.core.pipeline import DownloadPipeline, PipelineSummary
+from src.core.download_manager import DownloadManager
+from src.core.metadata import FileInfo
+from src.core.scraper_service import ScraperService
+from src.config import AppConfig
+from src.utils.exceptions import ContentMismatchError
+
+@pytest.fixture
+def config():
+    config = AppConfig()
+    config.PIPELINE_QUEUE_SIZE = 2
+    config.DOWNLOAD_WORKERS = 2
+    return config
+
+@pytest.fixture
+def scraper_service(config):
+    return ScraperService(config, Mock())
+
+@pytest.fixture
+def download_manager(config):
+    return DownloadManager(config)
+
+class TestDownloadPipeline:
+    @pytest.mark.asyncio
+    async def test_run_downloads_while_discovering(self, config, scraper_service, download_manager, tmp_path):
+        files = [f"http://test.com/{i}.pdf" for i in range(6)]
+        events = []
+
+        async def fake_fetch(url, file_types):
+            events.append("page")
+            return files
+
+        async def fake_download(url, output_dir, progress_callback=None):
+            events.append("download")
+            await asyncio.sleep(0)
+            message = DownloadManager.SKIP_MESSAGE if url.endswith("0.pdf") else DownloadManager.SUCCESS_MESSAGE
+            await progress_callback(f"{url} {message}")
+            return output_dir / url
+
+        with patch.object(scraper_service, '_fetch_page_files', side_effect=fake_fetch), \
+             patch.object(download_manager, 'download_file', side_effect=fake_download), \
+             patch.object(download_manager, 'ensure_session'):
+            pipeline = DownloadPipeline(config, scraper_service, download_manager)
+            summary = await pipeline.run(["http://test.com"], [".pdf"], tmp_path)
+
+        assert summary.discovered == 6
+        assert summary.downloaded == 5
+        assert summary.skipped == 1
+        assert summary.failed == 0
+        assert events.count("download") == 6
+
+    @pytest.mark.asyncio
+    async def test_run_counts_failures(self, config, scraper_service, download_manager, tmp_path):
+        with patch.object(scraper_service, '_fetch_page_files', return_value=["http://test.com/a.pdf"]), \
+             patch.object(download_manager, 'download_file', side_effect=Exception("boom")), \
+             patch.object(download_manager, 'ensure_session'):
+            pipeline = DownloadPipeline(config, scraper_service, download_manager)
+            summary = await pipeline.run(["http://test.com"], [".pdf"], tmp_path)
+
+        assert summary.failed == 1
+        assert "boom" in summary.format()
+
+    @pytest.mark.asyncio
+    async def test_run_counts_wrong_content_separately(self, config, scraper_service, download_manager, tmp_path):
+        error = ContentMismatchError("a.pdf: server sent an HTML page for a .pdf URL")
+        with patch.object(scraper_service, '_fetch_page_files', return_value=["http://test.com/a.pdf"]), \
+             patch.object(download_manager, 'download_file', side_effect=error), \
+             patch.object(download_manager, 'ensure_session'):
+            pipeline = DownloadPipeline(config, scraper_service, download_manager)
+            summary = await pipeline.run(["http://test.com"], [".pdf"], tmp_path)
+
+        assert summary.failed == 0
+        assert summary.mismatched == 1
+        assert "wrong content type: 1" in summary.format()
+
+    @pytest.mark.asyncio
+    async def test_discovery_failure_stops_downloads_before_cleanup(self, config, scraper_service, download_manager,
+                                                                     tmp_path):
+        events = []
+
+        async def failing_batches(*args, **kwargs):
+            yield [("http://test.com/a.pdf", "http://test.com")]
+            await asyncio.sleep(0)
+            raise RuntimeError("discovery broke")
+
+        async def stuck_download(url, output_dir, progress_callback=None):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                events.append("download cancelled")
+                raise
+
+        async def close_archive():
+            events.append("archive closed")
+
+        with patch.object(scraper_service, 'iter_file_batches', failing_batches), \
+             patch.object(download_manager, 'download_file', side_effect=stuck_download), \
+             patch.object(download_manager, 'close_archive', side_effect=close_archive), \
+             patch.object(download_manager, 'ensure_session'):
+            pipeline = DownloadPipeline(config, scraper_service, download_manager)
+            with pytest.raises(RuntimeError):
+                await pipeline.run(["http://test.com"], [".pdf"], tmp_path)
+
+        assert events == ["download cancelled", "archive closed"]
+
+    @pytest.mark.asyncio
+    async def test_listing_metadata_reaches_downloads(self, config, scraper_service, download_manager, tmp_path):
+        info = FileInfo("http://test.com/a.pdf", size=2048)
+        seen = []
+
+        async def listed(url, file_types):
+            scraper_service.file_info[url + "a.pdf"] = info
+            return [url + "a.pdf"]
+
+        async def fake_download(url, output_dir, progress_callback=None):
+            seen.append(download_manager.metadata.get(url))
+            return output_dir / "a.pdf"
+
+        with patch.object(scraper_service, '_fetch_page_files', side_effect=listed), \
+             patch.object(download_manager, 'download_file', side_effect=fake_download), \
+             patch.object(download_manager, 'ensure_session'):
+            pipeline = DownloadPipeline(config, scraper_service, download_manager)
+            await pipeline.run(["http://test.com/"], [".pdf"], tmp_path)
+
+        assert seen == [info]
+        assert not download_manager.metadata and not scraper_service.file_info
+
+    @pytest.mark.asyncio
+    async def test_discovery_waits_while_over_memory_budget(self, config, scraper_service, download_manager, tmp_path):
+        config.MEMORY_BUDGET = 100
+        pipeline = DownloadPipeline(config, scraper_service, download_manager)
+        queue = asyncio.Queue()
+        queue.put_nowait("http://test.com/a.pdf")
+        gauge = Mock(sample=Mock(return_value=200))
+
+        waiting = asyncio.create_task(pipeline._wait_for_memory(gauge, queue))
+        await asyncio.sleep(0.15)
+        assert not waiting.done()
+        queue.get_nowait()
+        await asyncio.wait_for(waiting, 1)
+
+        gauge.sample.return_value = 50
+        queue.put_nowait("http://test.com/b.pdf")
+        await asyncio.wait_for(pipeline._wait_for_memory(gauge, queue), 0.05)
+
+    @pytest.mark.asyncio
+    async def test_run_keeps_last_errors(self, config, scraper_service, download_manager, tmp_path):
+        config.MEMORY_RETENTION = 2
+        files = [f"http://test.com/{i}.pdf" for i in range(5)]
+        with patch.object(scraper_service, '_fetch_page_files', return_value=files), \
+             patch.object(download_manager, 'download_file', side_effect=Exception("boom")), \
+             patch.object(download_manager, 'ensure_session'):
+            pipeline = DownloadPipeline(config, scraper_service, download_manager)
+            summary = await pipeline.run(["http://test.com"], [".pdf"], tmp_path)
+
+        assert summary.failed == 5
+        assert len(summary.errors) == 2
+        assert "3 earlier errors not shown" in summary.format()
+
+def test_summary_format():
+    summary = PipelineSummary(pages=2, discovered=3, downloaded=2, skipped=1)
+    text = summary.format()
+    assert "Pages searched: 2" in text
+    assert "Downloaded: 2, skipped: 1, failed: 0" in text
+    assert "Peak memory" not in text
+    assert "Peak memory: 1.5 MB" in PipelineSummary(peak_memory=int(1.5 * 1024 ** 2)).format()
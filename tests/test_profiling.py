@@ -0,0 +1,73 @@
+# tests/test_profiling.py
+import asyncio
+import pstats
+import time
+import pytest
+from src.utils.performance import TimingStats, instrument, measure_performance, timing_stats
+from src.utils.profiling import PROFILE_SAMPLING, RunProfiler, StackSampler
+
+class Worker:
+    async def step(self, fail: bool = False) -> str:
+        await asyncio.sleep(0.01)
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    def busy(self) -> None:
+        end = time.perf_counter() + 0.1
+        while time.perf_counter() < end:
+            pass
+
+def test_instrument_times_and_restores_methods():
+    stats = TimingStats()
+    original = Worker.step
+    with instrument({Worker: ["step", "busy", "missing"]}, stats) as names:
+        assert names == ["Worker.step"]
+        worker = Worker()
+        assert asyncio.run(worker.step()) == "done"
+        with pytest.raises(ValueError):
+            asyncio.run(worker.step(fail=True))
+    assert Worker.step is original
+
+    timing = stats.timings["Worker.step"]
+    assert (timing.calls, timing.failures) == (2, 1)
+    assert timing.total >= 0.02
+    assert "Worker.step" in stats.format()
+
+def test_measure_performance_records_timings():
+    timing_stats.clear()
+    decorated = measure_performance(Worker.step)
+    asyncio.run(decorated(Worker()))
+    assert timing_stats.timings["Worker.step"].calls == 1
+
+def test_stack_sampler_collapsed_output(tmp_path):
+    sampler = StackSampler(interval=0.002)
+    sampler.start()
+    Worker().busy()
+    sampler.stop()
+    assert sampler.samples > 5
+    path = tmp_path / "run.collapsed"
+    sampler.write_collapsed(path)
+    lines = path.read_text().splitlines()
+    assert any("busy (test_profiling.py:" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+def test_run_profiler_writes_reports(tmp_path):
+    with RunProfiler(tmp_path, "headless", targets={Worker: ["step"]}) as profiler:
+        asyncio.run(Worker().step())
+        Worker().busy()
+
+    assert {path.suffix for path in profiler.written} == {".pstats", ".txt", ".collapsed"}
+    pstats_path = next(path for path in profiler.written if path.suffix == ".pstats")
+    assert "busy" in str(pstats.Stats(str(pstats_path)).stats)
+    assert any(path.name.endswith("-timings.txt") for path in profiler.written)
+    assert any(path.suffix == ".collapsed" for path in profiler.written)
+
+def test_sampling_mode_skips_cprofile(tmp_path):
+    with RunProfiler(tmp_path, "gui", PROFILE_SAMPLING) as profiler:
+        Worker().busy()
+    assert not any(path.suffix == ".pstats" for path in profiler.written)
+    assert any(path.suffix == ".collapsed" for path in profiler.written)
+    with pytest.raises(ValueError):
+        RunProfiler(tmp_path, "gui", "perf")
\ No newline at end of file
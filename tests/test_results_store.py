@@ -0,0 +1,54 @@
+# tests/test_results_store.py
+from datetime import datetime
+import pytest
+from src.core.metadata import FileInfo
+from src.core.results_store import ResultStore
+
+@pytest.fixture
+def store():
+    store = ResultStore()
+    store.add("http://a.com/docs/Report.pdf", "http://a.com/docs/")
+    store.add("http://a.com/docs/notes.docx", "http://a.com/docs/")
+    store.add("http://b.com/annual-report.pdf", "http://b.com/")
+    return store
+
+class TestResultStore:
+    def test_add_dedupes_and_pages(self, store):
+        assert not store.add("http://a.com/docs/Report.pdf", "http://b.com/")
+        assert store.total == len(store) == 3
+        assert store.page(1, 5) == [
+            ["notes.docx", "", "", "", "http://a.com/docs/"],
+            ["annual-report.pdf", "", "", "", "http://b.com/"]
+        ]
+        assert store.source_of("http://b.com/annual-report.pdf") == "http://b.com/"
+
+    def test_filters_by_name_type_and_source(self, store):
+        store.set_filter(name="REPORT")
+        assert store.visible_urls() == ["http://a.com/docs/Report.pdf", "http://b.com/annual-report.pdf"]
+        store.set_filter(file_type=".pdf", source="http://b.com/")
+        assert store.visible_urls() == ["http://b.com/annual-report.pdf"]
+        # New rows go through the active filter
+        store.add("http://b.com/other.pdf", "http://b.com/")
+        store.add("http://b.com/other.docx", "http://b.com/")
+        assert store.visible_urls() == ["http://b.com/annual-report.pdf", "http://b.com/other.pdf"]
+        assert store.total == 5
+
+    def test_sorts_by_metadata_as_it_arrives(self, store):
+        store.sort("size", descending=True)
+        store.set_info(FileInfo("http://a.com/docs/notes.docx", 10, "application/msword", datetime(2023, 1, 5)))
+        store.set_info(FileInfo("http://b.com/annual-report.pdf", 2048))
+        assert [row[0] for row in store.page(0, 3)] == ["annual-report.pdf", "notes.docx", "Report.pdf"]
+        assert store.page(1, 1)[0][1:4] == ["10 B", "application/msword", "2023-01-05 00:00"]
+
+        store.sort("name")
+        assert store.url_at(0) == "http://b.com/annual-report.pdf"
+        store.sort(None)
+        assert store.url_at(0) == "http://a.com/docs/Report.pdf"
+        with pytest.raises(ValueError):
+            store.sort("colour")
+
+    def test_clear(self, store):
+        store.set_filter(name="x")
+        store.clear()
+        assert store.total == len(store) == 0
+        assert store.name_filter == ""
\ No newline at end of file
@@ -0,0 +1,58 @@
+# tests/test_robots.py
+import asyncio
+import time
+import pytest
+from src.core.robots import RobotsCache
+
+ROBOTS = """
+User-agent: *
+Disallow: /private/
+Crawl-delay: 1
+Sitemap: http://test.com/sitemap.xml
+"""
+
+def _cache(status=200, body=ROBOTS, max_delay=10.0):
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+        await asyncio.sleep(0.01)
+        if isinstance(status, Exception):
+            raise status
+        return status, body
+    return RobotsCache("Mozilla/5.0", fetch, max_delay), fetched
+
+class TestRobotsCache:
+    @pytest.mark.asyncio
+    async def test_fetched_once_per_host(self):
+        robots, fetched = _cache()
+        results = await asyncio.gather(*(robots.allowed(f"http://TEST.com/{i}.pdf") for i in range(5)))
+        assert all(results)
+        assert not await robots.allowed("http://test.com/private/a.pdf")
+        assert await robots.sitemaps("http://test.com/") == ["http://test.com/sitemap.xml"]
+        assert fetched == ["http://test.com/robots.txt"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status, allowed", [(404, True), (403, True), (503, False)])
+    async def test_unavailable_robots(self, status, allowed):
+        robots, _ = _cache(status)
+        assert await robots.allowed("http://test.com/a.pdf") is allowed
+
+    @pytest.mark.asyncio
+    async def test_unreachable_host_is_unrestricted(self):
+        robots, _ = _cache(OSError("unreachable"))
+        assert await robots.allowed("http://test.com/private/a.pdf")
+
+    @pytest.mark.asyncio
+    async def test_crawl_delay_spaces_requests(self):
+        robots, _ = _cache(max_delay=0.2)
+        await robots.policy("http://test.com/")
+        start = time.monotonic()
+        await asyncio.gather(*(robots.wait("http://test.com/") for _ in range(3)))
+        assert time.monotonic() - start >= 0.39
+        await robots.wait("http://other.com/")  # other hosts have their own slots
+
+    @pytest.mark.asyncio
+    async def test_crawl_delay_capped(self):
+        robots, _ = _cache(body="User-agent: *\nCrawl-delay: 3600\n", max_delay=2)
+        assert await robots.crawl_delay("http://test.com/") == 2
\ No newline at end of file
@@ -1,11 +1,13 @@
 # tests/test_scraper_service.py
 import pytest
 import responses
+from unittest.mock import Mock, patch
 from bs4 import BeautifulSoup
 from src.core.scraper_service import ScraperService
 from src.core.browser_manager import BrowserManager
+from src.core.frontier import CrawlFrontier
 from src.config import AppConfig
-from src.utils.exceptions import ScraperError
+from src.utils.exceptions import ScraperError, URLError, PageTooLargeError
 
 @pytest.fixture
 def config():
@@ -114,4 +116,145 @@ class TestScraperService:
         # Invalid URLs
         assert not scraper_service._is_valid_url("invalid-url")
         assert not scraper_service._is_valid_url("ftp://example.com")
-        assert not scraper_service._is_valid_url("http://example.com//")
\ No newline at end of file
+        assert not scraper_service._is_valid_url("http://example.com//")
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_dedupes_across_pages(self, scraper_service, sample_html):
+        pages = ["http://test.com/a", "http://test.com/b"]
+        reported = []
+
+        async def fake_fetch(url, file_types):
+            soup = BeautifulSoup(sample_html, 'html.parser')
+            return scraper_service._extract_files(soup, "http://test.com", file_types)
+
+        async def on_page(page_url, files, error):
+            reported.append((page_url, files, error))
+
+        with patch.object(scraper_service, '_fetch_page_files', side_effect=fake_fetch):
+            results = await scraper_service.fetch_many(pages, [".pdf"], on_page)
+
+        assert list(results) == pages
+        assert len(results[pages[0]]) + len(results[pages[1]]) == 3
+        assert len(reported) == 2
+        assert all(error is None for _, _, error in reported)
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_reports_failed_pages(self, scraper_service):
+        with patch.object(scraper_service, '_fetch_page_files', side_effect=URLError("boom")):
+            results = await scraper_service.fetch_many(["http://test.com/a"], [".pdf"])
+
+        assert results == {"http://test.com/a": []}
+
+    @pytest.mark.asyncio
+    async def test_iter_files_yields_per_page(self, scraper_service):
+        pages = {
+            "http://test.com/a": ["http://test.com/1.pdf", "http://test.com/2.pdf"],
+            "http://test.com/b": ["http://test.com/3.pdf"]
+        }
+
+        async def fake_fetch(url, file_types):
+            return pages[url]
+
+        with patch.object(scraper_service, '_fetch_page_files', side_effect=fake_fetch):
+            found = [item async for item in scraper_service.iter_files(list(pages), [".pdf"])]
+
+        assert sorted(found) == sorted(
+            (file_url, page_url) for page_url, files in pages.items() for file_url in files
+        )
+
+    @pytest.mark.asyncio
+    async def test_iter_file_batches_respects_batch_size(self, scraper_service, config):
+        config.SEARCH_BATCH_SIZE = 2
+        files = [f"http://test.com/{i}.pdf" for i in range(5)]
+
+        with patch.object(scraper_service, '_fetch_page_files', return_value=files):
+            batches = [batch async for batch in scraper_service.iter_file_batches(["http://test.com"], [".pdf"])]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_crawls_and_resumes(self, scraper_service, tmp_path):
+        site = {
+            "http://test.com/docs/": (["http://test.com/docs/a.pdf"], ["http://test.com/docs/sub/"]),
+            "http://test.com/docs/sub/": (["http://test.com/docs/sub/b.pdf"], [])
+        }
+
+        async def fake_links(url, file_types):
+            return site[url]
+
+        async def fake_files(url, file_types):
+            return site[url][0]
+
+        frontier = CrawlFrontier(tmp_path / "job.db", checkpoint_interval=0)
+        with patch.object(scraper_service, '_fetch_page_links', side_effect=fake_links), \
+             patch.object(scraper_service, '_fetch_page_files', side_effect=fake_files) as mock_files:
+            results = await scraper_service.fetch_many(["http://test.com/docs/"], [".pdf"], max_depth=1, frontier=frontier)
+            assert results == {url: files for url, (files, _) in site.items()}
+
+            results = await scraper_service.fetch_many(["http://test.com/docs/"], [".pdf"], max_depth=1, frontier=frontier)
+            assert results == {}
+            assert mock_files.call_count == 1
+        frontier.close()
+
+    def test_extract_pages_stays_in_scope(self, scraper_service):
+        scraper_service._crawl_scopes = [scraper_service._crawl_scope("http://test.com/docs/index.html")]
+        soup = BeautifulSoup("""
+            <a href="sub/">sub</a>
+            <a href="page.html#top">page</a>
+            <a href="/other/">outside</a>
+            <a href="report.pdf">file</a>
+            <a href="image.png">image</a>
+        """, 'html.parser')
+        pages = scraper_service._extract_pages(soup, "http://test.com/docs/index.html", [".pdf"])
+        assert pages == ["http://test.com/docs/sub/", "http://test.com/docs/page.html"]
+
+    @pytest.mark.asyncio
+    async def test_parse_links_uses_listing_metadata(self, scraper_service):
+        listing = b"""<html><head><title>Index of /files/</title></head><body>
+<h1>Index of /files/</h1><hr><pre><a href="../">../</a>
+<a href="docs/">docs/</a>          05-Jan-2023 10:22       -
+<a href="a.pdf">a.pdf</a>          06-Jan-2023 11:00       2048
+<a href="b.txt">b.txt</a>          06-Jan-2023 11:00       10
+</pre><hr></body></html>"""
+        base_url = "http://test.com/files/"
+        scraper_service._crawl_scopes = [base_url]
+        hrefs, subdirectories = await scraper_service._parse_links(base_url, listing, None, [".pdf"])
+
+        assert hrefs == ["docs/", "a.pdf", "b.txt"]
+        assert subdirectories == ["docs/"]
+        assert list(scraper_service.file_info) == ["http://test.com/files/a.pdf"]
+        assert scraper_service.file_info["http://test.com/files/a.pdf"].size == 2048
+        assert scraper_service._extract_pages(subdirectories, base_url, [".pdf"]) == ["http://test.com/files/docs/"]
+        assert scraper_service.take_file_info("http://test.com/files/a.pdf").size == 2048
+        assert scraper_service.take_file_info("http://test.com/files/a.pdf") is None
+
+    @pytest.mark.asyncio
+    async def test_found_message_is_one_template(self, scraper_service, caplog):
+        # Log sampling groups records by their unformatted message
+        hrefs = [["a.pdf"], ["a.pdf", "b.pdf"]]
+        with patch.object(scraper_service, '_fetch_links', side_effect=[(links, None) for links in hrefs]), \
+                caplog.at_level("INFO", logger="src.core.scraper_service"):
+            await scraper_service._fetch_page_files("http://test.com/one/", [".pdf"])
+            await scraper_service._fetch_page_files("http://test.com/two/", [".pdf"])
+        found = [record for record in caplog.records if record.msg.startswith("Found")]
+        assert [record.getMessage() for record in found] == [
+            "Found 1 files on http://test.com/one/", "Found 2 files on http://test.com/two/"
+        ]
+        assert found[0].msg == found[1].msg and found[1].url == "http://test.com/two/"
+
+    @pytest.mark.asyncio
+    async def test_read_page_refuses_oversized_pages(self, scraper_service, config):
+        config.MAX_PAGE_BYTES = 100
+
+        async def chunks(size):
+            for _ in range(3):
+                yield b"x" * 60
+
+        declared = Mock(content_length=1000)
+        with pytest.raises(PageTooLargeError):
+            await scraper_service._read_page("http://test.com/", declared)
+        streamed = Mock(content_length=None, content=Mock(iter_chunked=chunks))
+        with pytest.raises(PageTooLargeError):
+            await scraper_service._read_page("http://test.com/", streamed)
+        config.MAX_PAGE_BYTES = 0
+        assert await scraper_service._read_page("http://test.com/", streamed) == b"x" * 180
\ No newline at end of file
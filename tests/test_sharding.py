@@ -0,0 +1,81 @@
+# tests/test_sharding.py
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.config import AppConfig
+from src.core.pipeline import PipelineSummary
+from src.core.sharding import ShardedRunner, merge_summaries, shard_config, shard_urls
+from src.utils.memory import BoundedList
+
+class TestShardUrls:
+    def test_by_host_keeps_sites_together(self):
+        urls = ["http://a.com/1", "http://b.com/1", "http://A.com/2", "http://c.com/1", "http://a.com/3"]
+        groups = shard_urls(urls, 2)
+        assert groups == [["http://a.com/1", "http://A.com/2", "http://a.com/3"], ["http://b.com/1", "http://c.com/1"]]
+
+    def test_by_url_round_robin(self):
+        urls = [f"http://a.com/{i}" for i in range(5)]
+        assert shard_urls(urls + urls[:1], 2, "url") == [urls[0::2], urls[1::2]]
+
+    def test_no_empty_shards(self):
+        assert shard_urls(["http://a.com/1", "http://a.com/2"], 8) == [["http://a.com/1", "http://a.com/2"]]
+        with pytest.raises(ValueError):
+            shard_urls(["http://a.com/"], 2, "path")
+
+def test_shard_config_divides_shared_budgets():
+    config = AppConfig(BANDWIDTH_LIMIT=800, PER_HOST_BANDWIDTH_LIMIT=100, PARSE_WORKERS=0,
+                       BANDWIDTH_SCHEDULE=[{"start": "22:00", "global": 400, "per_host": 50}])
+    shard = shard_config(config, 1, 4)
+    assert (shard.BANDWIDTH_LIMIT, shard.PER_HOST_BANDWIDTH_LIMIT) == (200, 100)
+    assert shard.BANDWIDTH_SCHEDULE == [{"start": "22:00", "global": 100, "per_host": 50}]
+    assert shard.ARCHIVE_PREFIX == "files-shard1" and shard.PARSE_WORKERS >= 1 and shard.SHARDS == 0
+    config.SHARD_BY = "url"
+    assert shard_config(config, 0, 4).PER_HOST_BANDWIDTH_LIMIT == 25
+
+def test_merge_summaries():
+    first = PipelineSummary(pages=2, downloaded=3, discovery_time=1.0, peak_memory=100,
+                            errors=BoundedList(1, ["x", "y"]))
+    second = PipelineSummary(pages=1, downloaded=1, failed=1, discovery_time=2.5, errors=["z"])
+    merged = merge_summaries([first, second])
+    assert (merged.pages, merged.downloaded, merged.failed, merged.shards) == (3, 4, 1, 2)
+    assert merged.discovery_time == 2.5 and merged.peak_memory == 100
+    assert merged.errors == ["y", "z"] and merged.errors.dropped == 1
+    assert merged.format().startswith("Shards: 2\n")
+
+class Handler(SimpleHTTPRequestHandler):
+    def guess_type(self, path):
+        return "application/pdf" if str(path).endswith(".pdf") else "text/html"
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / "site"
+    for name in ("a", "b"):
+        (root / name).mkdir(parents=True)
+        links = "".join(f'<a href="{name}{i}.pdf">{i}</a>' for i in range(3))
+        (root / name / "index.html").write_text(f"<html><body>{links}</body></html>")
+        for i in range(3):
+            (root / name / f"{name}{i}.pdf").write_bytes(b"%PDF-1.4\n" + b"x" * 1000)
+    handler = functools.partial(Handler, directory=str(root))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+def test_sharded_run_merges_progress_and_summaries(site, tmp_path):
+    config = AppConfig(SHARDS=2, DEFAULT_DELAY_MIN=0, DEFAULT_DELAY_MAX=0, LOG_DIR=tmp_path / "logs")
+    # two host names for one server, so sharding by host gives each shard one site
+    urls = [f"http://127.0.0.1:{site}/a/", f"http://localhost:{site}/b/"]
+    updates = []
+    summary = ShardedRunner(config).run(urls, [".pdf"], tmp_path / "out", lambda progress: updates.append(progress.format()))
+    assert summary.shards == 2 and summary.pages == 2
+    assert summary.downloaded == 6 and summary.failed == 0, summary.errors
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+        "a0.pdf", "a1.pdf", "a2.pdf", "b0.pdf", "b1.pdf", "b2.pdf"
+    ]
+    assert updates[-1] == "Shards: 0 running, 2 done, 0 failed; downloaded: 6, skipped: 0"
\ No newline at end of file
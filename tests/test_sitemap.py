@@ -0,0 +1,163 @@
+# tests/test_sitemap.py
+import gzip
+from datetime import datetime, timezone
+from unittest.mock import Mock
+import pytest
+from src.config import AppConfig
+from src.core.frontier import CrawlFrontier
+from src.core.scraper_service import ScraperService
+from src.core.sitemap import SitemapParser, is_sitemap_url, parse_lastmod
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url><loc>http://test.com/docs/a.pdf</loc><lastmod>2024-01-05T10:00:00Z</lastmod></url>
+  <url>
+    <image:image><image:loc>http://test.com/img/cover.png</image:loc></image:image>
+    <loc>http://test.com/docs/b.pdf</loc>
+  </url>
+  <url><loc>http://test.com/about.html</loc></url>
+</urlset>"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>http://test.com/sitemap-docs.xml.gz</loc><lastmod>2024-02-01</lastmod></sitemap>
+</sitemapindex>"""
+
+def _parse_in_chunks(data: bytes, size: int):
+    parser = SitemapParser()
+    entries = []
+    for start in range(0, len(data), size):
+        entries.extend(parser.feed(data[start:start + size]))
+    return entries + parser.close()
+
+class TestSitemapParser:
+    @pytest.mark.parametrize("size", [1, 7, 4096])
+    def test_urlset_in_any_chunking(self, size):
+        entries = _parse_in_chunks(URLSET, size)
+        assert [entry.loc for entry in entries] == [
+            "http://test.com/docs/a.pdf", "http://test.com/docs/b.pdf", "http://test.com/about.html"
+        ]
+        assert entries[0].lastmod == datetime(2024, 1, 5, 10, tzinfo=timezone.utc)
+        assert not any(entry.is_index for entry in entries)
+
+    @pytest.mark.parametrize("size", [3, 64])
+    def test_gzipped_index(self, size):
+        entry, = _parse_in_chunks(gzip.compress(INDEX), size)
+        assert entry.loc == "http://test.com/sitemap-docs.xml.gz"
+        assert entry.is_index and entry.lastmod == datetime(2024, 2, 1)
+
+    def test_text_sitemap(self):
+        entries = _parse_in_chunks(b"http://test.com/a.pdf\r\n\nnot a url\nhttp://test.com/b.pdf", 5)
+        assert [entry.loc for entry in entries] == ["http://test.com/a.pdf", "http://test.com/b.pdf"]
+
+    def test_large_gzip_sitemap_is_not_buffered(self):
+        body = b"<urlset>" + b"".join(b"<url><loc>http://test.com/%d.pdf</loc></url>" % i for i in range(50_000)) + b"</urlset>"
+        parser = SitemapParser()
+        compressed = gzip.compress(body)
+        count = 0
+        for start in range(0, len(compressed), 65536):
+            count += len(parser.feed(compressed[start:start + 65536]))
+            assert len(parser._root) <= 1  # finished <url> elements are dropped
+        assert count + len(parser.close()) == 50_000
+
+def test_is_sitemap_url():
+    assert is_sitemap_url("http://test.com/sitemap.xml")
+    assert is_sitemap_url("http://test.com/sitemaps/docs-1.xml.gz?v=2")
+    assert not is_sitemap_url("http://test.com/data.xml")
+    assert not is_sitemap_url("http://test.com/sitemap/")
+    assert parse_lastmod("yesterday") is None
+
+class Response:
+    charset = None
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.body = body
+        self.status = status
+        self.content_length = len(body)
+        self.content = Mock(iter_chunked=self.iter_chunked)
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), 10):
+            yield self.body[start:start + 10]
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(self.status)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __await__(self):
+        async def response():
+            return self
+        return response().__await__()
+
+@pytest.fixture
+def site():
+    return {
+        "http://test.com/robots.txt": Response(b"User-agent: *\nDisallow: /private/\n"
+                                               b"Sitemap: http://test.com/sitemap_index.xml\n"),
+        "http://test.com/sitemap_index.xml": Response(INDEX),
+        "http://test.com/sitemap-docs.xml.gz": Response(gzip.compress(
+            URLSET.replace(b"</urlset>", b"<url><loc>http://test.com/private/c.pdf</loc></url></urlset>"))),
+        "http://test.com/": Response(b'<html><a href="d.pdf">d</a></html>'),
+    }
+
+def _service(site, **config):
+    service = ScraperService(AppConfig(**config), Mock())
+    service._session = Mock(closed=False, get=lambda url: site.get(url, Response(b"", 404)))
+    return service
+
+class TestSitemapDiscovery:
+    @pytest.mark.asyncio
+    async def test_nested_gzip_sitemaps_feed_the_file_filter(self, site):
+        service = _service(site, SEARCH_BATCH_SIZE=1)
+        reported = []
+
+        async def on_page(page_url, files, error):
+            reported.append((page_url, files))
+
+        results = await service.fetch_many(["http://test.com/sitemap_index.xml"], [".pdf"], on_page)
+        assert results["http://test.com/sitemap-docs.xml.gz"] == [
+            "http://test.com/docs/a.pdf", "http://test.com/docs/b.pdf", "http://test.com/private/c.pdf"
+        ]
+        # one batch per file, then the end of the sitemap
+        assert len([files for page, files in reported if page.endswith(".gz")]) == 4
+        assert service.take_file_info("http://test.com/docs/a.pdf").last_modified.year == 2024
+        assert service.pages_visited == 2
+
+    @pytest.mark.asyncio
+    async def test_sitemaps_without_sitemap_in_their_name(self, site, tmp_path):
+        site["http://test.com/robots.txt"] = Response(b"Sitemap: http://test.com/feeds/index.xml\n")
+        site["http://test.com/feeds/index.xml"] = Response(INDEX.replace(b"sitemap-docs.xml.gz", b"feeds/docs-1.xml"))
+        site["http://test.com/feeds/docs-1.xml"] = Response(URLSET)
+        service = _service(site, SITEMAP_DISCOVERY=True)
+        results = await service.fetch_many(["http://test.com/"], [".pdf"])
+        assert results["http://test.com/feeds/docs-1.xml"] == ["http://test.com/docs/a.pdf", "http://test.com/docs/b.pdf"]
+
+        # A resumed job still reads the nested sitemap as one
+        with CrawlFrontier(tmp_path / "job.db") as frontier:
+            frontier.seed(["http://test.com/feeds/index.xml"], ["http://test.com/feeds/index.xml"])
+            frontier.record_page("http://test.com/feeds/index.xml", [], ["http://test.com/feeds/docs-1.xml"], 0,
+                                 sitemaps=["http://test.com/feeds/docs-1.xml"])
+            results = await _service(site).fetch_many(["http://test.com/feeds/index.xml"], [".pdf"], frontier=frontier)
+        assert results["http://test.com/feeds/docs-1.xml"] == ["http://test.com/docs/a.pdf", "http://test.com/docs/b.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_robots_sitemaps_and_disallow_rules(self, site):
+        service = _service(site, SITEMAP_DISCOVERY=True, ROBOTS_TXT=True)
+        results = await service.fetch_many(["http://test.com/"], [".pdf"])
+        files = [file_url for page_files in results.values() for file_url in page_files]
+        assert sorted(files) == ["http://test.com/d.pdf", "http://test.com/docs/a.pdf", "http://test.com/docs/b.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_crawl_pages_from_sitemap(self, site):
+        service = _service(site)
+        site["http://test.com/about.html"] = Response(b'<a href="e.pdf">e</a>')
+        service._crawl_scopes = [service._crawl_scope("http://test.com/sitemap-docs.xml.gz")]
+        results = await service.fetch_many(["http://test.com/sitemap-docs.xml.gz"], [".pdf"], max_depth=1)
+        assert results["http://test.com/about.html"] == ["http://test.com/e.pdf"]
\ No newline at end of file
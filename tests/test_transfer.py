@@ -0,0 +1,63 @@
+# tests/test_transfer.py
+import asyncio
+import pytest
+from unittest.mock import Mock
+from src.core.transfer import ThroughputMonitor, iter_body, open_response
+
+def make_response(chunks, delay=0.0):
+    async def iter_chunked(size):
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+    return Mock(content=Mock(iter_chunked=iter_chunked))
+
+class TestThroughputMonitor:
+    def test_steady_slow_transfer_passes(self):
+        monitor = ThroughputMonitor(min_rate=100, window=10)
+        # 200 B/s for a minute
+        assert all(monitor.record(200, 1.0) is None for _ in range(60))
+
+    def test_rate_below_floor_after_window(self):
+        monitor = ThroughputMonitor(min_rate=100, window=10)
+        for _ in range(9):
+            assert monitor.record(50, 1.0) is None
+        assert monitor.record(50, 1.0) == pytest.approx(50)
+
+    def test_window_slides(self):
+        monitor = ThroughputMonitor(min_rate=100, window=5)
+        monitor.record(10_000, 1.0)
+        for _ in range(3):
+            assert monitor.record(10, 1.0) is None
+        # The fast first second is still in the window
+        assert monitor.record(10, 1.0) is None
+        # Now it has slid out
+        assert monitor.record(10, 1.0) is not None
+
+    def test_no_floor(self):
+        monitor = ThroughputMonitor(min_rate=0, window=1)
+        assert monitor.record(0, 5.0) is None
+
+class TestIterBody:
+    @pytest.mark.asyncio
+    async def test_yields_all_chunks(self):
+        chunks = [b"a", b"b", b"c"]
+        assert [chunk async for chunk in iter_body(make_response(chunks), 1, 1.0)] == chunks
+
+    @pytest.mark.asyncio
+    async def test_idle_timeout(self):
+        with pytest.raises(asyncio.TimeoutError, match="No data received"):
+            async for _ in iter_body(make_response([b"a", b"b"], delay=0.2), 1, 0.05):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_throughput_floor(self):
+        monitor = ThroughputMonitor(min_rate=1_000_000, window=0.05)
+        with pytest.raises(asyncio.TimeoutError, match="below"):
+            async for _ in iter_body(make_response([b"a"] * 10, delay=0.02), 1, 1.0, monitor):
+                pass
+
+@pytest.mark.asyncio
+async def test_open_response_first_byte_timeout():
+    with pytest.raises(asyncio.TimeoutError, match="No response within"):
+        await open_response(asyncio.sleep(1), 0.05)
+    assert await open_response(asyncio.sleep(0, result="ok"), 1.0) == "ok"
\ No newline at end of file
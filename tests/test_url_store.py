@@ -0,0 +1,40 @@
+# tests/test_url_store.py
+import pytest
+from src.utils.url_store import create_url_store, BloomURLFilter, DigestURLSet
+
+@pytest.fixture(params=["set", "digest", "bloom"])
+def store(request):
+    return create_url_store(request.param, capacity=1000, error_rate=0.01)
+
+class TestURLStore:
+    def test_add_reports_new_urls(self, store):
+        assert store.add("http://example.com/a.pdf")
+        assert not store.add("http://EXAMPLE.com:80/a.pdf#top")
+        assert "http://example.com/a.pdf" in store
+        assert "http://example.com/b.pdf" not in store
+        assert len(store) == 1
+
+    def test_clear(self, store):
+        store.update(["http://example.com/a.pdf", "http://example.com/b.pdf"])
+        store.clear()
+        assert len(store) == 0
+        assert "http://example.com/a.pdf" not in store
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            create_url_store("trie")
+
+def test_digest_set_grows():
+    store = DigestURLSet(capacity=16)
+    urls = [f"http://example.com/{i}.pdf" for i in range(5000)]
+    store.update(urls)
+    assert len(store) == 5000
+    assert all(url in store for url in urls)
+    assert store.nbytes < 5000 * 32
+
+def test_bloom_filter_error_rate_after_scaling():
+    bloom = BloomURLFilter(capacity=1000, error_rate=0.01)
+    bloom.update(f"http://example.com/{i}.pdf" for i in range(4000))
+    assert all(f"http://example.com/{i}.pdf" in bloom for i in range(4000))
+    false_positives = sum(f"http://other.com/{i}.pdf" in bloom for i in range(10000))
+    assert false_positives / 10000 < 0.02
@@ -0,0 +1,34 @@
+from src.utils.url_utils import parse_url_list, canonicalize_url
+
+def test_parse_url_list_splits_pasted_block():
+    text = """
+    http://example.com/a, http://example.com/b
+    http://example.com/c;http://example.com/a
+    """
+    assert parse_url_list(text) == [
+        "http://example.com/a",
+        "http://example.com/b",
+        "http://example.com/c"
+    ]
+
+def test_parse_url_list_keeps_commas_and_semicolons_inside_urls():
+    text = "https://x.org/docs;jsessionid=AB12?id=1,2, https://x.org/b,\nhttps://x.org/c"
+    assert parse_url_list(text) == [
+        "https://x.org/docs;jsessionid=AB12?id=1,2",
+        "https://x.org/b",
+        "https://x.org/c"
+    ]
+
+def test_parse_url_list_empty():
+    assert parse_url_list("") == []
+    assert parse_url_list("   \n ") == []
+
+def test_canonicalize_url_equivalent_forms():
+    expected = "http://example.com/a%2F/file.pdf?a=1&b=2"
+    assert canonicalize_url("HTTP://Example.COM:80/a%2f/file.pdf?b=2&a=1#page=3") == expected
+    assert canonicalize_url("http://example.com/a%2F/file.pdf?a=1&b=2") == expected
+
+def test_canonicalize_url_keeps_meaningful_parts():
+    assert canonicalize_url("https://example.com:8443") == "https://example.com:8443/"
+    assert canonicalize_url("https://user:pw@example.com/x") == "https://user:pw@example.com/x"
+    assert canonicalize_url("http://[::1]:8080/x") == "http://[::1]:8080/x"
@@ -0,0 +1,149 @@
+# tests/test_warmup.py
+import asyncio
+import socket
+from contextlib import asynccontextmanager
+import pytest
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from src.config import AppConfig
+from src.core.download_manager import DownloadManager
+from src.core.pipeline import PipelineSummary
+from src.core.sharding import merge_summaries
+from src.core.warmup import CachingResolver, ConnectionWarmer, WarmupReport, origin_of
+
+class FakeResolver(AbstractResolver):
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.calls.append(host)
+        await asyncio.sleep(self.delay)
+        if host.endswith(".invalid"):
+            raise OSError(f"cannot resolve {host}")
+        return [{"hostname": host, "host": "127.0.0.1", "port": port, "family": socket.AF_INET,
+                 "proto": 0, "flags": socket.AI_NUMERICHOST}]
+
+    async def close(self):
+        pass
+
+class TestCachingResolver:
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_query(self):
+        inner = FakeResolver(delay=0.01)
+        resolver = CachingResolver(resolver=inner)
+        results = await asyncio.gather(*(resolver.resolve("example.com", 80) for _ in range(5)))
+        assert inner.calls == ["example.com"]
+        assert all(result == results[0] for result in results)
+        await resolver.resolve("example.com", 80)
+        assert inner.calls == ["example.com"] and resolver.cached("example.com", 80, socket.AF_INET)
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_resolved_again(self):
+        inner = FakeResolver()
+        resolver = CachingResolver(ttl=0, resolver=inner)
+        await resolver.resolve("example.com", 80)
+        await resolver.resolve("example.com", 80)
+        assert inner.calls == ["example.com", "example.com"]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        inner = FakeResolver()
+        resolver = CachingResolver(resolver=inner)
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await resolver.resolve("missing.invalid", 80)
+        assert len(inner.calls) == 2
+
+class TestConnectionWarmer:
+    def test_origin_of(self):
+        assert origin_of("https://Example.com/a.pdf") == ("https", "example.com", 443)
+        assert origin_of("http://example.com:8080/a.pdf") == ("http", "example.com", 8080)
+        assert origin_of("ftp://example.com/a.pdf") is None
+
+    @pytest.mark.asyncio
+    async def test_resolves_hosts_once_and_opens_connections_per_host(self):
+        resolver = CachingResolver(resolver=FakeResolver())
+        opened = []
+
+        async def open_connection(url):
+            opened.append(url)
+
+        warmer = ConnectionWarmer(connections=2)
+        urls = [f"http://a.example/{i}.pdf" for i in range(5)] + ["http://b.example/1.pdf", "http://c.invalid/1.pdf"]
+        await warmer.warm(urls, open_connection, resolver)
+        await warmer.warm(urls, open_connection, resolver)  # hosts already warmed
+        assert opened == ["http://a.example/0.pdf", "http://a.example/1.pdf", "http://b.example/1.pdf"]
+        report = warmer.report
+        assert (report.hosts, report.resolved, report.connections, report.failed) == (3, 2, 3, 1)
+
+    @pytest.mark.asyncio
+    async def test_saving_is_counted_for_the_warmed_connections_only(self):
+        async def open_connection(url):
+            await asyncio.sleep(0.02)
+
+        warmer = ConnectionWarmer(connections=1)
+        await warmer.warm(["http://a.example/1.pdf"], open_connection)
+        warmer.record_first_byte("http://a.example/1.pdf", 0.005)
+        warmer.record_first_byte("http://a.example/2.pdf", 0.005)
+        warmer.record_first_byte("http://other.example/1.pdf", 0.005)
+        assert warmer.report.warm_downloads == 1
+        assert warmer.report.saved > 0.01
+        assert "saved over 1 downloads" in warmer.report.format()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        async def open_connection(url):
+            raise AssertionError("no connections expected")
+
+        warmer = ConnectionWarmer(connections=0)
+        await warmer.warm(["http://a.example/1.pdf"], open_connection)
+        assert warmer.report.hosts == 0
+
+@asynccontextmanager
+async def serve():
+    connections = set()
+
+    async def handle(request):
+        connections.add(request.transport.get_extra_info("peername"))
+        return web.Response(body=b"%PDF-" + bytes(1000), content_type="application/pdf")
+
+    app = web.Application()
+    app.router.add_route("*", "/files/{name}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}", connections
+    finally:
+        await runner.cleanup()
+
+class TestDownloadManagerWarmup:
+    @pytest.mark.asyncio
+    async def test_downloads_reuse_warmed_connections(self, tmp_path):
+        config = AppConfig(DEFAULT_DELAY_MIN=0, DEFAULT_DELAY_MAX=0, WARMUP_CONNECTIONS=2)
+        async with serve() as (server, connections), DownloadManager(config) as manager:
+            urls = [f"{server}/files/{i}.pdf" for i in range(4)]
+            paths = await manager.download_files(urls, tmp_path)
+            assert len(paths) == 4
+            assert len(connections) == 2  # the downloads went over the warmed connections
+            report = manager.warmer.report
+            assert (report.hosts, report.resolved, report.connections) == (1, 1, 2)
+            assert report.warm_downloads == 2
+            assert manager.metadata[urls[0]].size == 1005  # the warm-up HEAD doubles as metadata
+
+    @pytest.mark.asyncio
+    async def test_no_warmup(self, tmp_path):
+        config = AppConfig(DEFAULT_DELAY_MIN=0, DEFAULT_DELAY_MAX=0, WARMUP_CONNECTIONS=0)
+        async with serve() as (server, _), DownloadManager(config) as manager:
+            await manager.download_files([f"{server}/files/a.pdf"], tmp_path)
+            assert manager.warmer.report == WarmupReport()
+            assert not manager.metadata
+
+def test_merged_summaries_add_warmup_reports():
+    summaries = [PipelineSummary(warmup=WarmupReport(hosts=2, connections=4, saved=0.5)),
+                 PipelineSummary(warmup=WarmupReport(hosts=1, connections=2, saved=0.25)), PipelineSummary()]
+    merged = merge_summaries(summaries)
+    assert (merged.warmup.hosts, merged.warmup.connections, merged.warmup.saved) == (3, 6, 0.75)
+    assert "Warm-up: 3 hosts" in merged.format()
\ No newline at end of file
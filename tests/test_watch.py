@@ -0,0 +1,174 @@
+# tests/test_watch.py
+import asyncio
+import sqlite3
+from unittest.mock import AsyncMock, Mock
+import pytest
+from src.config import AppConfig
+from src.core.metadata import FileInfo, PageSnapshot
+from src.core.scraper_service import ScraperService
+from src.core.watch import SourceWatcher, WatchState, poll_delay
+
+PAGE = "http://test.com/docs/"
+
+@pytest.fixture
+def state(tmp_path):
+    with WatchState(tmp_path / "watch.db") as state:
+        yield state
+
+def _watcher(state, pages, sizes, fail=()):
+    """pages: successive fetch_if_changed results; sizes: file url -> size per HEAD request"""
+    scraper = Mock(fetch_if_changed=AsyncMock(side_effect=pages), take_file_info=Mock(return_value=None))
+    downloads = []
+
+    async def download_file(url, output_dir, replace=False):
+        if url in fail:
+            raise RuntimeError("connection reset")
+        downloads.append((url, replace))
+
+    async def prefetch_metadata(urls, refresh=False):
+        return {url: FileInfo(url, size=sizes[url]) for url in urls}
+
+    manager = Mock(download_file=download_file, prefetch_metadata=prefetch_metadata, close_archive=AsyncMock())
+    config = AppConfig(WATCH_INTERVAL=60, WATCH_JITTER=0)
+    return SourceWatcher(config, scraper, manager, state), scraper, downloads
+
+class TestSourceWatcher:
+    @pytest.mark.asyncio
+    async def test_only_new_or_changed_files_are_downloaded(self, state, tmp_path):
+        sizes = {PAGE + "a.pdf": 10, PAGE + "b.pdf": 20}
+        pages = [PageSnapshot([PAGE + "a.pdf", PAGE + "b.pdf"], '"v1"'), None,
+                 PageSnapshot([PAGE + "a.pdf", PAGE + "b.pdf", PAGE + "c.pdf"], '"v2"')]
+        watcher, scraper, downloads = _watcher(state, pages, sizes)
+
+        first = await watcher.poll(PAGE, [".pdf"], tmp_path)
+        assert first.new == [PAGE + "a.pdf", PAGE + "b.pdf"] and first.downloaded == 2
+
+        second = await watcher.poll(PAGE, [".pdf"], tmp_path)
+        assert second.unchanged and second.downloaded == 0
+        assert scraper.fetch_if_changed.call_args.args[2] == '"v1"'
+
+        sizes.update({PAGE + "b.pdf": 25, PAGE + "c.pdf": 5})
+        third = await watcher.poll(PAGE, [".pdf"], tmp_path)
+        assert third.new == [PAGE + "c.pdf"] and third.changed == [PAGE + "b.pdf"]
+        assert sorted(downloads[2:]) == [(PAGE + "b.pdf", True), (PAGE + "c.pdf", False)]
+        assert third.format() == f"{PAGE}: 1 new, 1 changed; 2 downloaded, 0 failed"
+
+    @pytest.mark.asyncio
+    async def test_failed_downloads_are_retried_on_next_poll(self, state, tmp_path):
+        fail = {PAGE + "a.pdf"}
+        watcher, _, downloads = _watcher(state, [PageSnapshot([PAGE + "a.pdf"]), None], {PAGE + "a.pdf": 1}, fail)
+        assert (await watcher.poll(PAGE, [".pdf"], tmp_path)).failed == 1
+        fail.clear()
+        result = await watcher.poll(PAGE, [".pdf"], tmp_path)
+        assert result.unchanged and result.downloaded == 1
+        assert downloads == [(PAGE + "a.pdf", False)]
+
+    @pytest.mark.asyncio
+    async def test_file_linked_from_two_sources(self, state, tmp_path):
+        other = "http://test.com/news/"
+        shared = PAGE + "a.pdf"
+        pages = [PageSnapshot([shared], '"v1"'), PageSnapshot([shared], '"n1"'),
+                 PageSnapshot([shared], '"v2"'), PageSnapshot([shared], '"n2"')]
+        watcher, _, downloads = _watcher(state, pages, {shared: 10})
+
+        assert (await watcher.poll(PAGE, [".pdf"], tmp_path)).new == [shared]
+        assert (await watcher.poll(other, [".pdf"], tmp_path)).new == [shared]
+        # Each source keeps its own record instead of taking it over from the other
+        again = [await watcher.poll(url, [".pdf"], tmp_path) for url in (PAGE, other)]
+        assert all(not result.new and not result.changed and not result.downloaded for result in again)
+        assert list(state.known_files(PAGE)) == list(state.known_files(other)) == [shared]
+        assert len(downloads) == 2
+
+    def test_state_keyed_on_url_is_migrated(self, tmp_path):
+        db = sqlite3.connect(str(tmp_path / "watch.db"))
+        db.executescript("""
+            CREATE TABLE files (url TEXT PRIMARY KEY, source TEXT NOT NULL, etag TEXT, last_modified TEXT,
+                                size INTEGER, downloaded INTEGER NOT NULL DEFAULT 0, replace INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX files_source ON files (source, downloaded);
+            INSERT INTO files (url, source, size, downloaded) VALUES ('http://test.com/docs/a.pdf', 'http://test.com/docs/', 10, 1);
+        """)
+        db.close()
+        with WatchState(tmp_path / "watch.db") as state:
+            assert state.known_files(PAGE) == {PAGE + "a.pdf": (None, None, 10)}
+            assert not state.pending_files(PAGE)
+            state.record_files("http://test.com/news/", [FileInfo(PAGE + "a.pdf", size=10)], replace=False)
+            assert state.known_files(PAGE) and state.pending_files("http://test.com/news/")
+
+    @pytest.mark.asyncio
+    async def test_state_survives_restart(self, tmp_path):
+        with WatchState(tmp_path / "watch.db") as state:
+            watcher, _, _ = _watcher(state, [PageSnapshot([PAGE + "a.pdf"], '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")],
+                                     {PAGE + "a.pdf": 1})
+            await watcher.poll(PAGE, [".pdf"], tmp_path)
+        with WatchState(tmp_path / "watch.db") as state:
+            source = state.source(PAGE)
+            assert (source.etag, source.last_modified) == ('"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+            assert source.next_poll == pytest.approx(source.last_poll + 60)
+            assert list(state.known_files(PAGE)) == [PAGE + "a.pdf"] and not state.pending_files(PAGE)
+
+    @pytest.mark.asyncio
+    async def test_run_polls_each_source_when_due(self, state, tmp_path):
+        watcher, scraper, _ = _watcher(state, [None] * 10, {})
+        watcher.config.WATCH_INTERVALS = {PAGE: 0.05}
+        results = []
+
+        async def on_result(result):
+            results.append(result.source)
+
+        task = asyncio.create_task(watcher.run([PAGE, "http://test.com/other/"], [".pdf"], tmp_path, on_result))
+        await asyncio.sleep(0.12)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert results.count("http://test.com/other/") == 1
+        assert results.count(PAGE) >= 2
+
+def test_poll_delay_jitter():
+    delays = [poll_delay(100, 0.2) for _ in range(200)]
+    assert all(80 <= delay <= 120 for delay in delays)
+    assert len(set(delays)) > 1
+    assert poll_delay(100, 0) == 100
+
+class Response:
+    charset = None
+
+    def __init__(self, body: bytes, status: int = 200, headers=None):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+        self.content_length = len(body)
+        self.content = Mock(iter_chunked=self.iter_chunked)
+
+    async def iter_chunked(self, size):
+        yield self.body
+
+    def raise_for_status(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __await__(self):
+        async def response():
+            return self
+        return response().__await__()
+
+class TestFetchIfChanged:
+    @pytest.mark.asyncio
+    async def test_conditional_request(self):
+        sent = []
+
+        def get(url, headers=None):
+            sent.append(headers)
+            if headers:
+                return Response(b"", 304)
+            return Response(b'<a href="a.pdf">a</a><a href="a.pdf">again</a>', headers={"ETag": '"v1"'})
+
+        service = ScraperService(AppConfig(), Mock())
+        service._session = Mock(closed=False, get=get)
+        page = await service.fetch_if_changed(PAGE, [".pdf"])
+        assert page.files == [PAGE + "a.pdf"] and page.etag == '"v1"'
+        assert await service.fetch_if_changed(PAGE, [".pdf"], '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT") is None
+        assert sent[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
\ No newline at end of file